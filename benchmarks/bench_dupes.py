@@ -0,0 +1,92 @@
+"""
+Benchmark for near-duplicate detection.
+
+Generates pages of random text, plants edited copies of some of them, saves the project
+through PageWriter into a throwaway database and reports how long fingerprinting and
+clustering take and how many planted duplicates were found.
+
+Usage:
+    python benchmarks/bench_dupes.py [--pages 100000] [--words 300] [--duplicates 0.05]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider import storage  # noqa: E402
+from spider.fingerprints import fingerprint_page  # noqa: E402
+from spider.schemas import PageData  # noqa: E402
+
+
+def build_pages(count, words, duplicate_share, rng):
+    vocabulary = [f"word{index}" for index in range(5000)]
+    texts = []
+    planted = {}
+    for index in range(count):
+        if texts and rng.random() < duplicate_share:
+            original = rng.randrange(len(texts))
+            text = list(texts[original])
+            # Edit a handful of words, as templated pages or light rewrites would.
+            for _ in range(max(1, words // 100)):
+                text[rng.randrange(len(text))] = rng.choice(vocabulary)
+            planted[index] = original
+        else:
+            text = [rng.choice(vocabulary) for _ in range(words)]
+        texts.append(text)
+
+    pages = [
+        PageData(
+            url=f"https://example.com/page/{index}",
+            title=f"Page {index}",
+            paragraphs=[' '.join(text[start:start + 50]) for start in range(0, len(text), 50)],
+        )
+        for index, text in enumerate(texts)
+    ]
+    return pages, planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection.")
+    parser.add_argument('--pages', type=int, default=100000, help="Number of pages in the project.")
+    parser.add_argument('--words', type=int, default=300, help="Words of body text per page.")
+    parser.add_argument('--duplicates', type=float, default=0.05, help="Share of pages that are edited copies.")
+    args = parser.parse_args()
+
+    pages, planted = build_pages(args.pages, args.words, args.duplicates, random.Random(42))
+
+    started = time.perf_counter()
+    for page_data in pages:
+        page_data.fingerprint = fingerprint_page(page_data)
+    elapsed = time.perf_counter() - started
+    print(f"Fingerprinted {len(pages)} pages in {elapsed:.1f}s ({elapsed / len(pages) * 1000:.2f} ms/page)")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage.DB_FILE = os.path.join(tmp_dir, 'dupes.db')
+        storage.create_tables()
+        with storage.PageWriter("bench") as writer:
+            for page_data in pages:
+                writer.write(page_data)
+
+        started = time.perf_counter()
+        clusters = storage.fetch_near_duplicates("bench")
+        elapsed = time.perf_counter() - started
+        print(f"Found {len(clusters)} clusters in {elapsed:.1f}s")
+
+    cluster_of = {}
+    for number, cluster in enumerate(clusters):
+        for page in cluster:
+            cluster_of[page['url']] = number
+    found = sum(
+        1 for copy, original in planted.items()
+        if cluster_of.get(pages[copy].url) is not None
+        and cluster_of.get(pages[copy].url) == cluster_of.get(pages[original].url)
+    )
+    print(f"Recovered {found} of {len(planted)} planted duplicates")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark for streaming project exports.
+
+Saves a synthetic project through PageWriter into a throwaway database, then exports it to
+JSON Lines and CSV files and reports rows/sec and how much the peak resident memory grew.
+
+Usage:
+    python benchmarks/bench_export.py [--pages 100000]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider import storage  # noqa: E402
+from spider.export import export_pages  # noqa: E402
+from bench_queries import build_page  # noqa: E402
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming project exports.")
+    parser.add_argument('--pages', type=int, default=100000, help="Number of pages in the project.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage.DB_FILE = os.path.join(tmp_dir, 'export.db')
+        storage.create_tables()
+        with storage.PageWriter("bench") as writer:
+            for index in range(args.pages):
+                writer.write(build_page(index, args.pages))
+
+        runs = (
+            ('pages.jsonl', 'jsonl', None, False),
+            ('pages.jsonl.gz', 'jsonl', None, True),
+            ('pages.csv', 'csv', ['url', 'title', 'meta_description', 'noindex', 'word_count', 'inlinks'], False),
+        )
+        for name, export_format, fields, compress in runs:
+            before = peak_rss_mb()
+            path = os.path.join(tmp_dir, name)
+            result = export_pages("bench", path, export_format, fields, compress)
+            print(
+                f"{name:15} {result['rows']} rows in {result['seconds']:5.1f}s "
+                f"({result['rows'] / result['seconds']:8,.0f} rows/sec), "
+                f"{os.path.getsize(path) / 1e6:7.1f} MB, peak RSS +{peak_rss_mb() - before:.1f} MB"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Microbenchmark for HTML extraction across parser backends.
+
+First checks that every installed backend extracts identical fields from each page of the
+fixture corpus in benchmarks/fixtures: hand-written pages with malformed and real-world
+markup (unclosed paragraphs and list items, table layouts, missing head and body, entities,
+comments). Then builds a corpus of large synthetic pages, checks them the same way and
+reports the average extraction time per page.
+
+Usage:
+    python benchmarks/bench_extractor.py [--pages 20] [--sections 400]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider.extractor import extract_page_fields  # noqa: E402
+from spider.parsers import available_parsers  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def build_page(index, sections):
+    """Build one large, well-formed HTML page with every kind of element the extractor reads."""
+    body = []
+    for section in range(sections):
+        level = section % 6 + 1
+        body.append(
+            f'<section><h{level}>Section {section} &amp; <!-- inline --> <em>more</em></h{level}>'
+            f'<p>Paragraph {section} of page {index} with <a href="/p{section}.html">an internal link</a> '
+            f'and <a href="https://example.org/{section}">an external one</a><!-- note -->, '
+            f'then text after a comment<?php echo {section}; ?> and a processing instruction.</p>'
+            f'<!-- comment {section} -->'
+            f'<img src="/img/{section}.png" alt="{"image " + str(section) if section % 3 else ""}">'
+            f'</section>'
+        )
+    return (
+        '<!DOCTYPE html><html lang="en"><head>'
+        f'<title> Page {index} </title>'
+        f'<meta name="description" content=" Description for page {index} ">'
+        '<meta name="robots" content="index, follow">'
+        f'<link rel="canonical" href="https://example.com/page/{index}">'
+        f'<link rel="alternate" hreflang="de" href="https://example.com/de/page/{index}">'
+        '<link rel="stylesheet" href="/static/site.css">'
+        '<script type="application/ld+json">{"@type": "WebPage", "name": "bench"}</script>'
+        '<script src="/static/app.js"></script>'
+        '<style>p { color: red; }</style>'
+        '</head><body>'
+        + ''.join(body)
+        + '<script>window.analytics = true;</script></body></html>'
+    )
+
+
+def serialize(fields):
+    return {
+        key: [image.model_dump() if hasattr(image, 'model_dump') else image.dict() for image in value]
+        if key == 'images' else value
+        for key, value in fields.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML extraction per parser backend.")
+    parser.add_argument('--pages', type=int, default=20, help="Number of pages in the corpus.")
+    parser.add_argument('--sections', type=int, default=400, help="Sections per page.")
+    args = parser.parse_args()
+
+    base_url = "https://example.com/page"
+    backends = available_parsers()
+
+    fixtures = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    for path in fixtures:
+        with open(path, encoding='utf-8') as file:
+            html = file.read()
+        reference = serialize(extract_page_fields(html, base_url, backends[0]))
+        for backend in backends[1:]:
+            results = serialize(extract_page_fields(html, base_url, backend))
+            if results != reference:
+                differing = ', '.join(key for key in reference if results[key] != reference[key])
+                print(f"{os.path.basename(path)}: {backend} MISMATCH with {backends[0]} in {differing}")
+                sys.exit(1)
+    print(f"Fixtures: {len(fixtures)} pages, outputs identical across {', '.join(backends)}")
+
+    corpus = [build_page(index, args.sections) for index in range(args.pages)]
+    print(f"Corpus: {args.pages} pages, {sum(len(page) for page in corpus) / args.pages / 1024:.0f} KiB each")
+
+    reference = None
+    for backend in backends:
+        started = time.perf_counter()
+        results = [serialize(extract_page_fields(page, base_url, backend)) for page in corpus]
+        elapsed = time.perf_counter() - started
+
+        if reference is None:
+            reference = results
+        elif results != reference:
+            print(f"{backend:12} MISMATCH: output differs from {backends[0]}")
+            sys.exit(1)
+
+        print(f"{backend:12} {elapsed / args.pages * 1000:8.2f} ms/page")
+
+    print(f"Outputs identical across {', '.join(backends)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark and check for crawls shared by several worker processes through the frontier.
+
+Serves a synthetic site (a sitemap index, child sitemaps and linked pages) from a local
+HTTP server that counts every GET, then starts one `seo crawl --worker` process with the
+sitemap index and more worker processes that join it, all against a throwaway database.
+Reports the crawl time, the pages saved and any URL that was fetched more than once.
+
+With --kill-after, the first worker is killed mid-crawl; the URLs it had leased are
+reclaimed by the other workers once its leases expire. URLs the killed worker had already
+fetched are then fetched again, so those duplicates are reported separately.
+
+Usage:
+    python benchmarks/bench_frontier.py [--pages 2000] [--workers 4] [--kill-after 5]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = (
+    "import sys; sys.path.insert(0, sys.argv[1]); sys.argv = ['seo'] + sys.argv[2:]; "
+    "from cli.commands import execute_command; execute_command()"
+)
+
+
+def serve(port, pages, sitemaps, latency):
+    base = f'http://127.0.0.1:{port}'
+    per_sitemap = -(-pages // sitemaps)
+    gets = Counter()
+    lock = threading.Lock()
+
+    def urlset(start):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + ''.join(f'<url><loc>{base}/page/{index}</loc></url>' for index in range(start, min(start + per_sitemap, pages)))
+            + '</urlset>'
+        )
+
+    index_xml = (
+        '<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<sitemap><loc>{base}/sitemap-{number}.xml</loc></sitemap>' for number in range(sitemaps))
+        + '</sitemapindex>'
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body):
+            path = self.path
+            if path == '/_stats':
+                with lock:
+                    body, content_type = json.dumps(gets), 'application/json'
+            elif path == '/sitemap_index.xml':
+                body, content_type = index_xml, 'application/xml'
+            elif path.startswith('/sitemap-'):
+                body, content_type = urlset(int(path[9:-4]) * per_sitemap), 'application/xml'
+            elif path.startswith('/page/'):
+                index = int(path[6:])
+                links = ''.join(f'<a href="/page/{(index * 7 + offset) % pages}">link</a>' for offset in range(5))
+                body = f'<html><head><title>Page {index}</title></head><body><h1>Page {index}</h1><p>{links}</p></body></html>'
+                content_type = 'text/html; charset=utf-8'
+            else:
+                body, content_type = '', 'text/plain'
+            if send_body and path != '/_stats':
+                with lock:
+                    gets[path] += 1
+                time.sleep(latency)
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass  # Clients drop keep-alive connections when a worker ends or is killed
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+def start_worker(home, log_path, project, args, extra):
+    command = [
+        sys.executable, '-c', WORKER, ROOT, 'crawl', *extra, '-s', project, '--worker',
+        '--delay', '0', '--render', 'never', '--concurrency', '8', '--per-host', '8',
+        '--parse-workers', '0', '--link-cache-ttl', '0', '--lease', str(args.lease),
+    ]
+    log = open(log_path, 'w')
+    return subprocess.Popen(command, env={**os.environ, 'HOME': home}, stdout=log, stderr=subprocess.STDOUT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a crawl shared by several worker processes.")
+    parser.add_argument('--pages', type=int, default=2000, help="Number of pages on the site.")
+    parser.add_argument('--sitemaps', type=int, default=20, help="Number of child sitemaps.")
+    parser.add_argument('--workers', type=int, default=4, help="Number of worker processes.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the server takes per GET.")
+    parser.add_argument('--lease', type=float, default=5.0, help="Lease duration passed to the workers.")
+    parser.add_argument('--kill-after', type=float, help="Kill the first worker after this many seconds.")
+    parser.add_argument('--port', type=int, default=8795, help="Port of the local server.")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, args.pages, args.sitemaps, args.latency), daemon=True
+    )
+    server.start()
+    time.sleep(1)
+
+    with tempfile.TemporaryDirectory() as home:
+        project = 'frontier-bench'
+        started = time.perf_counter()
+        first = start_worker(home, os.path.join(home, 'worker-0.log'), project, args,
+                             [f'http://127.0.0.1:{args.port}/sitemap_index.xml'])
+        time.sleep(1)
+        workers = [first] + [
+            start_worker(home, os.path.join(home, f'worker-{number}.log'), project, args, [])
+            for number in range(1, args.workers)
+        ]
+
+        if args.kill_after:
+            time.sleep(args.kill_after)
+            first.send_signal(signal.SIGKILL)
+            print(f"Killed worker 0 after {args.kill_after:g}s")
+        for worker in workers:
+            worker.wait()
+        elapsed = time.perf_counter() - started
+
+        gets = json.loads(urlopen(f'http://127.0.0.1:{args.port}/_stats').read())
+        conn = sqlite3.connect(os.path.join(home, '.seowayfinder_db', 'all_projects_pages.db'))
+        saved = conn.execute('SELECT COUNT(*), COUNT(DISTINCT url) FROM pages').fetchone()
+        states = dict(conn.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall())
+        conn.close()
+        for number in range(len(workers)):
+            with open(os.path.join(home, f'worker-{number}.log')) as log:
+                crawled = [line.strip() for line in log if line.startswith('Crawled ')]
+            print(f"worker {number}: {crawled[-1] if crawled else 'no summary (killed)'}")
+
+    server.terminate()
+    fetched = {path: count for path, count in gets.items() if path.startswith('/page/')}
+    duplicates = {path: count for path, count in fetched.items() if count > 1}
+    print(f"{args.workers} workers crawled {len(fetched)} of {args.pages} pages in {elapsed:.1f}s "
+          f"({len(fetched) / elapsed:.1f} pages/sec)")
+    print(f"Saved {saved[0]} pages ({saved[1]} distinct URLs); frontier: {states}")
+    print(f"Fetched more than once: {len(duplicates)} pages, "
+          f"{sum(1 for path, count in gets.items() if path.startswith('/sitemap') and count > 1)} sitemaps")
+
+
+if __name__ == '__main__':
+    main()
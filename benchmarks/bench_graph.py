@@ -0,0 +1,68 @@
+"""
+Benchmark for internal link graph analysis.
+
+Saves a synthetic site with a homepage, category pages and randomly cross-linked article
+pages through PageWriter into a throwaway database, then times analyze_link_graph.
+
+Usage:
+    python benchmarks/bench_graph.py [--pages 100000] [--links 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider import storage  # noqa: E402
+from spider.graph import analyze_link_graph  # noqa: E402
+from spider.schemas import PageData  # noqa: E402
+
+
+def build_pages(count, links_per_page, rng):
+    def url(index):
+        return "https://example.com/" if index == 0 else f"https://example.com/page/{index}"
+
+    categories = range(1, min(count, 101))
+    for index in range(count):
+        if index == 0:
+            links = [url(category) for category in categories]
+        elif index in categories:
+            links = [url(article) for article in range(index + 100, count, 100)]
+        else:
+            links = [url(rng.randrange(1, count)) for _ in range(links_per_page)]
+        # Leave every article ending in 0 unlinked so the run has orphans to find.
+        links = [link for link in links if index == 0 or not link.endswith('0')]
+        # Some links point at a section or carry a trailing slash; they still link to the page.
+        links = [link + ('', '#section', '/')[position % 3] for position, link in enumerate(links)]
+        yield PageData(url=url(index), links=links, internal_links=links)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark internal link graph analysis.")
+    parser.add_argument('--pages', type=int, default=100000, help="Number of pages in the project.")
+    parser.add_argument('--links', type=int, default=5, help="Internal links per article page.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage.DB_FILE = os.path.join(tmp_dir, 'graph.db')
+        storage.create_tables()
+        with storage.PageWriter("bench") as writer:
+            for page_data in build_pages(args.pages, args.links, random.Random(42)):
+                writer.write(page_data)
+
+        started = time.perf_counter()
+        summary = analyze_link_graph("bench")
+        elapsed = time.perf_counter() - started
+        print(
+            f"Analyzed {summary['links']} links between {summary['pages']} pages in {elapsed:.2f}s: "
+            f"{summary['orphans']} orphans, {summary['unreachable']} unreachable"
+        )
+        for page in storage.fetch_page_graph("bench", limit=3):
+            print(f"  {page['pagerank']:.6f}  depth {page['click_depth']}  {page['inlinks']} inlinks  {page['url']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark for crawl throughput with different numbers of extraction processes.
+
+Serves a synthetic site of large pages and a sitemap from a local HTTP server in its own
+process, then crawls it with each --parse-workers value and reports pages/sec. The server
+answers every other path with an empty 200, so link checks stay local and cheap.
+
+Usage:
+    python benchmarks/bench_parse_workers.py [--pages 400] [--sections 400] [--workers 0,1,2,4,8]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider.engine import crawl_urls  # noqa: E402
+from spider.schemas import CrawlOptions  # noqa: E402
+from bench_extractor import build_page  # noqa: E402
+
+
+def serve(port, pages, sections):
+    sitemap = (
+        '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<url><loc>http://127.0.0.1:{port}/page/{index}</loc></url>' for index in range(pages))
+        + '</urlset>'
+    ).encode('utf-8')
+    # External links in the corpus point at the local server too, so no check leaves the machine.
+    bodies = [
+        build_page(index, sections).replace('https://example.org/', f'http://127.0.0.1:{port}/ext/').encode('utf-8')
+        for index in range(pages)
+    ]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep connections alive, as real servers do
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body):
+            if self.path == '/sitemap.xml':
+                body, content_type = sitemap, 'application/xml'
+            elif self.path.startswith('/page/'):
+                body, content_type = bodies[int(self.path.rsplit('/', 1)[1])], 'text/html; charset=utf-8'
+            else:
+                body, content_type = b'', 'text/plain'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+    class Server(ThreadingHTTPServer):
+        def handle_error(self, request, client_address):
+            pass  # Clients drop keep-alive connections when a crawl ends
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawl throughput per number of parse workers.")
+    parser.add_argument('--pages', type=int, default=400, help="Number of pages on the site.")
+    parser.add_argument('--sections', type=int, default=400, help="Sections per page.")
+    parser.add_argument('--workers', type=str, default='0,1,2,4,8', help="Comma-separated parse worker counts.")
+    parser.add_argument('--port', type=int, default=8799, help="Port of the local server.")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, args=(args.port, args.pages, args.sections), daemon=True)
+    server.start()
+    time.sleep(2)
+    print(f"{os.cpu_count()} CPU cores, {args.pages} pages of {args.sections} sections")
+
+    try:
+        for workers in (int(value) for value in args.workers.split(',')):
+            options = CrawlOptions(
+                concurrency=32, per_host=32, delay=0, link_concurrency=32, link_per_host=32,
+                render='never', parse_workers=workers,
+            )
+            started = time.perf_counter()
+            pages = crawl_urls([f'http://127.0.0.1:{args.port}/sitemap.xml'], {}, options)
+            elapsed = time.perf_counter() - started
+            print(f"parse workers {workers}: {pages} pages in {elapsed:.1f}s ({pages / elapsed:.1f} pages/sec)",
+                  file=sys.stderr)
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
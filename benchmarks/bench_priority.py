@@ -0,0 +1,149 @@
+"""
+Benchmark for crawls that stop early, ordered by URL priority.
+
+Serves a synthetic site whose sitemaps list most pages with a low <priority> and an old
+<lastmod>, and a small share of important pages (priority 1.0, changed today) at the end of
+the last sitemap, the worst place for a crawl in document order. The site is crawled with a
+--max-pages budget, once in a single process and once saved to a project through the
+frontier. Reports how many of the important pages each crawl fetched within its budget, and
+how many a crawl in document order would have reached with the same budget.
+
+Usage:
+    python benchmarks/bench_priority.py [--pages 5000] [--important 0.05] [--budget 0.1]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_resume import crawl  # noqa: E402
+
+
+def important_pages(pages, important):
+    """Return the indexes of the important pages: the last `important` share of the site."""
+    return set(range(pages - max(1, round(pages * important)), pages))
+
+
+def serve(port, pages, sitemaps, latency, important):
+    base = f'http://127.0.0.1:{port}'
+    per_sitemap = -(-pages // sitemaps)
+    top = important_pages(pages, important)
+    today = date.today().isoformat()
+    gets = Counter()
+    lock = threading.Lock()
+
+    def urlset(start):
+        entries = []
+        for index in range(start, min(start + per_sitemap, pages)):
+            priority, lastmod = ('1.0', today) if index in top else ('0.3', '2020-01-01')
+            entries.append(f'<url><loc>{base}/shop/catalog/item/{index}</loc>'
+                           f'<lastmod>{lastmod}</lastmod><priority>{priority}</priority></url>')
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + ''.join(entries) + '</urlset>'
+        )
+
+    index_xml = (
+        '<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<sitemap><loc>{base}/sitemap-{number}.xml</loc></sitemap>' for number in range(sitemaps))
+        + '</sitemapindex>'
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _respond(self, send_body):
+            path = self.path
+            if path == '/_stats':
+                with lock:
+                    body, content_type = json.dumps(gets), 'application/json'
+                    gets.clear()
+            elif path == '/sitemap_index.xml':
+                body, content_type = index_xml, 'application/xml'
+            elif path.startswith('/sitemap-'):
+                body, content_type = urlset(int(path[9:-4]) * per_sitemap), 'application/xml'
+            elif path.startswith('/shop/catalog/item/'):
+                index = int(path.rsplit('/', 1)[1])
+                body = f'<html><head><title>Item {index}</title></head><body><h1>Item {index}</h1></body></html>'
+                content_type = 'text/html; charset=utf-8'
+            else:
+                body, content_type = '', 'text/plain'
+            if send_body and path.startswith('/shop/'):
+                with lock:
+                    gets[path] += 1
+                time.sleep(latency)
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def do_GET(self):
+            self._respond(True)
+
+        def do_HEAD(self):
+            self._respond(False)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark which pages a crawl with a page budget reaches.")
+    parser.add_argument('--pages', type=int, default=5000, help="Number of pages on the site.")
+    parser.add_argument('--sitemaps', type=int, default=20, help="Number of child sitemaps.")
+    parser.add_argument('--important', type=float, default=0.05, help="Share of important pages.")
+    parser.add_argument('--budget', type=float, default=0.1, help="Share of the site the crawl may fetch.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the server takes per GET.")
+    parser.add_argument('--port', type=int, default=8798, help="Port of the local server.")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, args.pages, args.sitemaps, args.latency, args.important), daemon=True
+    )
+    server.start()
+    time.sleep(1)
+    sitemap = f'http://127.0.0.1:{args.port}/sitemap_index.xml'
+    top = important_pages(args.pages, args.important)
+    max_pages = max(1, round(args.pages * args.budget))
+
+    def stats():
+        return json.loads(urlopen(f'http://127.0.0.1:{args.port}/_stats').read())
+
+    print(f"{args.pages} pages, {len(top)} important ones listed last; budget of {max_pages} pages")
+    print(f"In document order: {len(top & set(range(max_pages)))} of {len(top)} important pages reached")
+    with tempfile.TemporaryDirectory() as home:
+        stats()
+        for name, extra in (('single process', []), ('frontier', ['-s', 'priority-bench'])):
+            started = time.perf_counter()
+            crawl(home, os.path.join(home, f'{name}.log'), sitemap, '--max-pages', str(max_pages), *extra).wait()
+            elapsed = time.perf_counter() - started
+            fetched = {int(path.rsplit('/', 1)[1]) for path in stats()}
+            print(f"{name:14}: {len(fetched)} pages in {elapsed:.1f}s, "
+                  f"{len(top & fetched)} of {len(top)} important pages reached")
+
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
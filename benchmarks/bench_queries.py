@@ -0,0 +1,78 @@
+"""
+Benchmark for the indexed page detail queries.
+
+Saves a synthetic project through PageWriter into a throwaway database, then times the
+inlink, broken link, heading and image lookups and the full-text search in spider.storage.
+
+Usage:
+    python benchmarks/bench_queries.py [--pages 100000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider import storage  # noqa: E402
+from spider.schemas import PageData, Image  # noqa: E402
+
+
+WORDS = ("crawl", "sitemap", "canonical", "render", "schema", "anchor", "redirect", "index", "robots", "snippet")
+
+
+def build_page(index, pages):
+    links = [f"https://example.com/page/{(index * 7 + offset) % pages}" for offset in range(20)]
+    return PageData(
+        url=f"https://example.com/page/{index}",
+        title=f"Page {index}",
+        headings={'h1': [f"Heading {index % (pages // 10 or 1)}"], 'h2': ["Section A", "Section B"]},
+        links=links + ["https://example.com/missing"],
+        internal_links=links,
+        non_200_links=["https://example.com/missing"] if index % 50 == 0 else [],
+        images=[Image(src=f"https://example.com/img/{index % 100}.png", alt="")],
+        paragraphs=[
+            f"Paragraph {n} of page {index} about {WORDS[(index + n) % len(WORDS)]} "
+            f"and {WORDS[(index * n) % len(WORDS)]} topic{index % 997}."
+            for n in range(10)
+        ],
+        slug=f"/page/{index}",
+    )
+
+
+def timed(label, query, *args):
+    started = time.perf_counter()
+    rows = query(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:26} {elapsed * 1000:8.2f} ms ({len(rows)} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed page detail queries.")
+    parser.add_argument('--pages', type=int, default=100000, help="Number of pages in the project.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage.DB_FILE = os.path.join(tmp_dir, 'queries.db')
+        storage.create_tables()
+
+        started = time.perf_counter()
+        with storage.PageWriter("bench") as writer:
+            for index in range(args.pages):
+                writer.write(build_page(index, args.pages))
+        print(f"Saved {writer.rows_written} pages in {time.perf_counter() - started:.1f}s")
+
+        timed("fetch_inlinks", storage.fetch_inlinks, "bench", "https://example.com/page/42")
+        timed("fetch_inlinks (broken)", storage.fetch_inlinks, "bench", "https://example.com/missing", True)
+        timed("fetch_outlinks", storage.fetch_outlinks, 42)
+        timed("fetch_broken_links", storage.fetch_broken_links, "bench")
+        timed("fetch_pages_by_heading", storage.fetch_pages_by_heading, "bench", "Heading 7")
+        timed("fetch_pages_by_image", storage.fetch_pages_by_image, "bench", "https://example.com/img/3.png")
+        timed("search_pages (rare)", lambda: storage.search_pages("bench", "topic42")['results'])
+        timed("search_pages (common)", lambda: storage.search_pages("bench", "canonical robots")['results'])
+        timed("search_pages (phrase)", lambda: storage.search_pages("bench", '"about sitemap"')['results'])
+
+
+if __name__ == '__main__':
+    main()
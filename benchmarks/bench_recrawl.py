@@ -0,0 +1,174 @@
+"""
+Benchmark for incremental recrawls.
+
+Serves a synthetic site whose pages send ETag and Last-Modified headers and answer
+conditional GETs with 304 Not Modified. The site is crawled once into a throwaway
+database, then a share of its pages (5% by default) is changed and the site is crawled
+again. Reports both crawl times, how the second crawl's requests were answered and whether
+the project holds exactly one row per URL.
+
+With --lastmod, the sitemaps list a <lastmod> for every page, so unchanged pages aren't
+requested at all. With --no-validators, the server sends neither header and unchanged pages
+are recognized by their body hash instead.
+
+Usage:
+    python benchmarks/bench_recrawl.py [--pages 5000] [--changed 0.05] [--lastmod] [--no-validators]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_resume import crawl  # noqa: E402
+
+
+def serve(port, pages, sitemaps, latency, changed_every, generation, lastmod, validators):
+    base = f'http://127.0.0.1:{port}'
+    per_sitemap = -(-pages // sitemaps)
+    responses = Counter()
+    lock = threading.Lock()
+
+    def revision(index):
+        return generation.value if index % changed_every == 0 else 0
+
+    def urlset(start):
+        entries = []
+        for index in range(start, min(start + per_sitemap, pages)):
+            modified = f'<lastmod>2026-01-{revision(index) + 1:02d}</lastmod>' if lastmod else ''
+            entries.append(f'<url><loc>{base}/page/{index}</loc>{modified}</url>')
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + ''.join(entries) + '</urlset>'
+        )
+
+    index_xml = (
+        '<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<sitemap><loc>{base}/sitemap-{number}.xml</loc></sitemap>' for number in range(sitemaps))
+        + '</sitemapindex>'
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type, headers=()):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command == 'GET':
+                self.wfile.write(body)
+
+        def _respond(self):
+            path = self.path
+            if path == '/_stats':
+                with lock:
+                    body = json.dumps(responses)
+                    responses.clear()
+                return self._send(200, body, 'application/json')
+            if path == '/sitemap_index.xml':
+                return self._send(200, index_xml, 'application/xml')
+            if path.startswith('/sitemap-'):
+                return self._send(200, urlset(int(path[9:-4]) * per_sitemap), 'application/xml')
+            if not path.startswith('/page/'):
+                return self._send(404, '', 'text/plain')
+
+            index = int(path[6:])
+            rev = revision(index)
+            etag = f'"{index}-{rev}"'
+            headers = [('ETag', etag), ('Last-Modified', f'Thu, {rev + 1:02d} Jan 2026 00:00:00 GMT')] \
+                if validators else []
+            if self.command == 'GET':
+                time.sleep(latency)
+            if validators and self.headers.get('If-None-Match') == etag:
+                with lock:
+                    responses[f'{self.command} 304'] += 1
+                return self._send(304, '', 'text/html; charset=utf-8', headers)
+            with lock:
+                responses[f'{self.command} 200'] += 1
+            links = ''.join(f'<a href="/page/{(index * 7 + offset) % pages}">link</a>' for offset in range(5))
+            paragraphs = ''.join(f'<p>Paragraph {number} of page {index}, revision {rev}.</p>' for number in range(20))
+            body = (
+                f'<html><head><title>Page {index}</title><meta name="description" content="Page {index}"></head>'
+                f'<body><h1>Page {index}</h1>{paragraphs}<p>{links}</p></body></html>'
+            )
+            return self._send(200, body, 'text/html; charset=utf-8', headers)
+
+        def do_GET(self):
+            self._respond()
+
+        def do_HEAD(self):
+            self._respond()
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark an incremental recrawl of a mostly static site.")
+    parser.add_argument('--pages', type=int, default=5000, help="Number of pages on the site.")
+    parser.add_argument('--sitemaps', type=int, default=20, help="Number of child sitemaps.")
+    parser.add_argument('--changed', type=float, default=0.05, help="Share of pages changed before the recrawl.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the server takes per GET.")
+    parser.add_argument('--lastmod', action='store_true', help="List a <lastmod> for every page in the sitemaps.")
+    parser.add_argument('--no-validators', action='store_true', help="Send no ETag or Last-Modified headers.")
+    parser.add_argument('--port', type=int, default=8797, help="Port of the local server.")
+    args = parser.parse_args()
+
+    generation = multiprocessing.Value('i', 0)
+    server = multiprocessing.Process(target=serve, daemon=True, args=(
+        args.port, args.pages, args.sitemaps, args.latency, max(1, round(1 / args.changed)) if args.changed else
+        args.pages + 1, generation, args.lastmod, not args.no_validators,
+    ))
+    server.start()
+    time.sleep(1)
+    sitemap = f'http://127.0.0.1:{args.port}/sitemap_index.xml'
+
+    def stats():
+        return json.loads(urlopen(f'http://127.0.0.1:{args.port}/_stats').read())
+
+    with tempfile.TemporaryDirectory() as home:
+        stats()
+        timings = []
+        for run in ('first crawl', 'recrawl'):
+            started = time.perf_counter()
+            crawl(home, os.path.join(home, f'{run}.log'), sitemap, '-s', 'recrawl-bench').wait()
+            elapsed = time.perf_counter() - started
+            timings.append(elapsed)
+            print(f"{run:11}: {elapsed:6.1f}s, page requests: {dict(sorted(stats().items()))}")
+            with open(os.path.join(home, f'{run}.log')) as log:
+                print('             ' + next((line.strip() for line in log if line.startswith('Saved ')), ''))
+            generation.value = 1
+
+        conn = sqlite3.connect(os.path.join(home, '.seowayfinder_db', 'all_projects_pages.db'))
+        rows, urls = conn.execute('SELECT COUNT(*), COUNT(DISTINCT url) FROM pages').fetchone()
+        changed = conn.execute("SELECT COUNT(*) FROM pages WHERE paragraphs LIKE '%revision 1.%'").fetchone()[0]
+        conn.close()
+
+    server.terminate()
+    print(f"Recrawl took {timings[1] / timings[0]:.0%} of the first crawl; {rows} rows for {urls} URLs, "
+          f"{changed} pages hold the changed content")
+
+
+if __name__ == '__main__':
+    main()
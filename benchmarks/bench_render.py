@@ -0,0 +1,139 @@
+"""
+Benchmark for render profiles: resource blocking and the wait strategy.
+
+Serves a synthetic marketing page from a local HTTP server: a hero video, large images, web
+fonts, a third-party analytics script (served from 'localhost' rather than 127.0.0.1, so it
+is a different host) and a long-polling request that never lets the network go idle. Its
+headline is inserted by JavaScript shortly after load. Each page is rendered with every
+profile, and the benchmark reports the time and bytes received per page, and whether the
+rendered HTML holds the client-side headline.
+
+Needs Playwright's Chromium (`playwright install chromium`).
+
+Usage:
+    python benchmarks/bench_render.py [--pages 10] [--images 20] [--budget 15]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider.browser_pool import BrowserPool  # noqa: E402
+from spider.schemas import RenderProfile  # noqa: E402
+
+HEADLINE = 'Rendered on the client'
+
+
+def build_page(port, index, images):
+    third_party = f'http://localhost:{port}'
+    return (
+        '<!DOCTYPE html><html><head>'
+        f'<title>Landing page {index}</title>'
+        '<style>@font-face { font-family: Brand; src: url(/font/brand.woff2); } body { font-family: Brand; }</style>'
+        f'<script async src="{third_party}/analytics.js"></script>'
+        '</head><body><main id="app"></main>'
+        '<video autoplay muted src="/media/hero.mp4"></video>'
+        + ''.join(f'<img src="/img/{index}-{image}.jpg" alt="">' for image in range(images))
+        + '<script>'
+        f'setTimeout(() => {{ document.getElementById("app").innerHTML = "<h1>{HEADLINE}</h1>"; }}, 300);'
+        'fetch("/poll");'
+        '</script></body></html>'
+    )
+
+
+def serve(port, images, image_bytes, poll_seconds):
+    assets = {
+        '/font/brand.woff2': (b'\0' * 80_000, 'font/woff2'),
+        '/media/hero.mp4': (b'\0' * 2_000_000, 'video/mp4'),
+        '/analytics.js': (b'/* analytics */' + b' ' * 100_000, 'application/javascript'),
+    }
+    image = b'\xff' * image_bytes
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path
+            if path == '/poll':
+                # A long-polling request: it holds the connection open, so the network never goes idle.
+                time.sleep(poll_seconds)
+                body, content_type = b'{}', 'application/json'
+            elif path.startswith('/page/'):
+                body = build_page(port, path.rsplit('/', 1)[1], images).encode('utf-8')
+                content_type = 'text/html; charset=utf-8'
+            elif path.startswith('/img/'):
+                body, content_type = image, 'image/jpeg'
+            elif path in assets:
+                body, content_type = assets[path]
+            else:
+                body, content_type = b'', 'text/plain'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+async def render_all(urls, profile):
+    async with BrowserPool(browsers=1, pages_per_browser=1, profile=profile) as pool:
+        started = time.perf_counter()
+        pages = [await pool.render(url) for url in urls]
+        elapsed = time.perf_counter() - started
+        return elapsed, pool.bytes_received, pool.budget_exceeded, sum(HEADLINE in html for html in pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark render time and bytes received per render profile.")
+    parser.add_argument('--pages', type=int, default=10, help="Number of pages to render with each profile.")
+    parser.add_argument('--images', type=int, default=20, help="Images per page.")
+    parser.add_argument('--image-bytes', type=int, default=150_000, help="Size of each image.")
+    parser.add_argument('--budget', type=float, default=15.0, help="Render budget in seconds.")
+    parser.add_argument('--port', type=int, default=8799, help="Port of the local server.")
+    args = parser.parse_args()
+
+    # 'localhost' serves the analytics script; block it like the built-in analytics hosts.
+    blocking = {'block_hosts': ['localhost'], 'budget': args.budget}
+    profiles = (
+        ('networkidle, nothing blocked', RenderProfile(
+            wait='networkidle', block_resources=[], default_blocklist=False, budget=args.budget,
+        )),
+        ('load, blocking', RenderProfile(wait='load', **blocking)),
+        ('stable, blocking (default)', RenderProfile(**blocking)),
+        ('selector, blocking', RenderProfile(wait='domcontentloaded', wait_for='#app h1', **blocking)),
+    )
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, args.images, args.image_bytes, args.budget * 2), daemon=True,
+    )
+    server.start()
+    time.sleep(1)
+
+    urls = [f'http://127.0.0.1:{args.port}/page/{index}' for index in range(args.pages)]
+    print(f"{args.pages} pages, each with {args.images} images of {args.image_bytes // 1000} KB, a 2 MB video, "
+          f"a web font, an analytics script and a long-polling request")
+    for name, profile in profiles:
+        elapsed, received, over_budget, with_headline = asyncio.run(render_all(urls, profile))
+        print(f"{name:30}: {elapsed / args.pages:5.2f}s and {received / args.pages / 1024:6.0f} KB per page, "
+              f"{over_budget} over budget, {with_headline}/{args.pages} with the client-side headline")
+
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
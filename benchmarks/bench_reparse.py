@@ -0,0 +1,80 @@
+"""
+Benchmark for `seo reparse`: extracting a project's pages again from the response cache.
+
+Fills a throwaway database and response cache with a project of synthetic pages, as a
+saved crawl would leave them, then reparses the project with each number of worker
+processes and reports pages/sec, the time a 50,000 page project would take at that rate and
+how much disk the compressed cache uses. Nothing goes over the network.
+
+Usage:
+    python benchmarks/bench_reparse.py [--pages 2000] [--sections 60] [--workers 1,2,4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# The database and the response cache live in the home directory; use a throwaway one.
+os.environ['HOME'] = tempfile.mkdtemp(prefix='bench-reparse-')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider.extractor import build_page_data  # noqa: E402
+from spider.reparse import reparse_project  # noqa: E402
+from spider.response_cache import RESPONSE_CACHE_DIR, ResponseCache  # noqa: E402
+from spider.schemas import FetchResult  # noqa: E402
+from spider.storage import PageWriter, create_tables, start_frontier  # noqa: E402
+from bench_extractor import build_page  # noqa: E402
+
+PROJECT = 'bench-reparse'
+
+
+def fill_project(pages, sections):
+    """Save every page to the project and its response to the cache, as one crawl run would."""
+    started = start_frontier(PROJECT, 'https://example.com/sitemap.xml')
+    cache = ResponseCache(started['project_id'], started['run_id'])
+    raw_bytes = 0
+    with PageWriter(PROJECT) as writer:
+        for index in range(pages):
+            url = f'https://example.com/page/{index}'
+            body = build_page(index, sections).encode('utf-8')
+            raw_bytes += len(body)
+            cache.store(FetchResult(
+                url=url, final_url=url, status=200, body=body,
+                headers={'Content-Type': 'text/html; charset=utf-8', 'ETag': f'"{index}"'},
+            ))
+            writer.write(build_page_data(body.decode('utf-8'), url, url))
+    cache.close()
+    return raw_bytes
+
+
+def disk_usage(root):
+    return sum(entry.stat().st_size for directory in os.scandir(root) for entry in os.scandir(directory.path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reparsing a project from the response cache.")
+    parser.add_argument('--pages', type=int, default=2000, help="Number of pages in the project.")
+    parser.add_argument('--sections', type=int, default=60, help="Sections per page.")
+    parser.add_argument('--workers', type=str, default='1,2,4', help="Comma-separated worker process counts.")
+    parser.add_argument('--parser', type=str, default='html.parser', help="HTML parser backend.")
+    args = parser.parse_args()
+
+    create_tables()
+    print(f"Saving {args.pages} pages of {args.sections} sections and caching their responses...")
+    raw_bytes = fill_project(args.pages, args.sections)
+    cached_bytes = disk_usage(RESPONSE_CACHE_DIR)
+    print(f"Response cache: {cached_bytes / 1e6:.1f} MB for {raw_bytes / 1e6:.1f} MB of HTML "
+          f"({cached_bytes / raw_bytes:.0%})")
+
+    for workers in (int(value) for value in args.workers.split(',')):
+        started = time.perf_counter()
+        summary = reparse_project(PROJECT, workers=workers, parser=args.parser)
+        elapsed = time.perf_counter() - started
+        rate = summary['saved'] / elapsed
+        print(f"{workers} workers: {summary['saved']} pages in {elapsed:.1f}s ({rate:.0f} pages/sec), "
+              f"50,000 pages in about {50000 / rate / 60:.1f} minutes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark and check for resuming interrupted crawl runs.
+
+Serves the synthetic site of bench_frontier.py, crawls it once from scratch, then crawls it
+again in a fresh database and stops that crawl once a share of the pages (90% by default) is
+saved, with Ctrl-C or, with --kill, SIGKILL. The stopped run is continued with
+`seo crawl --resume <run-id>`. Reports how long the resume took compared with the full crawl
+and how many pages were fetched again.
+
+Usage:
+    python benchmarks/bench_resume.py [--pages 2000] [--stop-at 0.9] [--kill]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.request import urlopen
+
+from bench_frontier import WORKER, ROOT, serve
+
+CRAWL_OPTIONS = ['--delay', '0', '--render', 'never', '--concurrency', '8', '--per-host', '8', '--parse-workers', '0']
+
+
+def crawl(home, log_path, *args):
+    command = [sys.executable, '-c', WORKER, ROOT, 'crawl', *args, *CRAWL_OPTIONS]
+    log = open(log_path, 'w')
+    return subprocess.Popen(command, env={**os.environ, 'HOME': home}, stdout=log, stderr=subprocess.STDOUT)
+
+
+def fetch_gets(port):
+    gets = json.loads(urlopen(f'http://127.0.0.1:{port}/_stats').read())
+    return Counter({path: count for path, count in gets.items() if path.startswith('/page/')})
+
+
+def saved_pages(home):
+    path = os.path.join(home, '.seowayfinder_db', 'all_projects_pages.db')
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(path, timeout=60)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resuming an interrupted crawl run.")
+    parser.add_argument('--pages', type=int, default=2000, help="Number of pages on the site.")
+    parser.add_argument('--sitemaps', type=int, default=20, help="Number of child sitemaps.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the server takes per GET.")
+    parser.add_argument('--stop-at', type=float, default=0.9, help="Share of pages saved before the crawl is stopped.")
+    parser.add_argument('--kill', action='store_true', help="Stop the crawl with SIGKILL instead of Ctrl-C.")
+    parser.add_argument('--port', type=int, default=8796, help="Port of the local server.")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.port, args.pages, args.sitemaps, args.latency), daemon=True
+    )
+    server.start()
+    time.sleep(1)
+    sitemap = f'http://127.0.0.1:{args.port}/sitemap_index.xml'
+
+    with tempfile.TemporaryDirectory() as fresh_home, tempfile.TemporaryDirectory() as home:
+        started = time.perf_counter()
+        crawl(fresh_home, os.path.join(fresh_home, 'fresh.log'), sitemap, '-s', 'resume-bench').wait()
+        fresh_seconds = time.perf_counter() - started
+        fresh_gets = fetch_gets(args.port)
+
+        started = time.perf_counter()
+        first = crawl(home, os.path.join(home, 'first.log'), sitemap, '-s', 'resume-bench')
+        while first.poll() is None and saved_pages(home) < args.pages * args.stop_at:
+            time.sleep(0.05)
+        first.send_signal(signal.SIGKILL if args.kill else signal.SIGINT)
+        first.wait()
+        first_seconds = time.perf_counter() - started
+        first_gets = fetch_gets(args.port) - fresh_gets
+        saved_before = saved_pages(home)
+
+        conn = sqlite3.connect(os.path.join(home, '.seowayfinder_db', 'all_projects_pages.db'))
+        run_id, status = conn.execute('SELECT id, status FROM crawl_runs ORDER BY id DESC LIMIT 1').fetchone()
+        conn.close()
+
+        started = time.perf_counter()
+        crawl(home, os.path.join(home, 'resume.log'), '--resume', str(run_id)).wait()
+        resume_seconds = time.perf_counter() - started
+        resume_gets = fetch_gets(args.port) - fresh_gets - first_gets
+
+        conn = sqlite3.connect(os.path.join(home, '.seowayfinder_db', 'all_projects_pages.db'))
+        saved = conn.execute('SELECT COUNT(*), COUNT(DISTINCT url) FROM pages').fetchone()
+        final_status = conn.execute('SELECT status FROM crawl_runs WHERE id = ?', (run_id,)).fetchone()[0]
+        conn.close()
+
+    server.terminate()
+    refetched = sum(1 for path in resume_gets if path in first_gets)
+    print(f"Fresh crawl: {len(fresh_gets)} pages in {fresh_seconds:.1f}s")
+    print(f"Run {run_id} stopped with {'SIGKILL' if args.kill else 'Ctrl-C'} after {first_seconds:.1f}s "
+          f"with {saved_before} pages saved (status: {status})")
+    print(f"Resumed run {run_id}: {len(resume_gets)} pages fetched in {resume_seconds:.1f}s "
+          f"({resume_seconds / fresh_seconds:.0%} of the fresh crawl), {refetched} of them fetched before")
+    print(f"Saved {saved[0]} pages ({saved[1]} distinct URLs); run status: {final_status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark for saving crawl results to SQLite.
+
+Writes the same synthetic pages with the per-page save_page_data path and with the
+batched PageWriter into throwaway databases and reports rows/sec for each.
+
+Usage:
+    python benchmarks/bench_storage.py [--pages 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spider import storage  # noqa: E402
+from spider.schemas import PageData, Image  # noqa: E402
+
+
+def build_pages(count):
+    return [
+        PageData(
+            url=f"https://example.com/page/{index}",
+            title=f"Page {index}",
+            meta_description=f"Description for page {index}",
+            headings={'h1': [f"Heading {index}"], 'h2': ["Section A", "Section B"]},
+            links=[f"https://example.com/page/{target}" for target in range(index, index + 20)],
+            internal_links=[f"https://example.com/page/{target}" for target in range(index, index + 20)],
+            images=[Image(src=f"https://example.com/img/{index}.png", alt="")],
+            paragraphs=[f"Paragraph {n} of page {index}." for n in range(10)],
+            slug=f"/page/{index}",
+        )
+        for index in range(count)
+    ]
+
+
+def run(label, db_file, write_pages, pages):
+    storage.DB_FILE = db_file
+    storage.create_tables()
+    started = time.perf_counter()
+    write_pages(pages)
+    elapsed = time.perf_counter() - started
+    print(f"{label:22} {len(pages) / elapsed:10.0f} rows/sec ({elapsed:.2f}s)")
+
+
+def save_one_by_one(pages):
+    for page_data in pages:
+        storage.save_page_data("bench", page_data)
+
+
+def save_batched(pages):
+    with storage.PageWriter("bench") as writer:
+        for page_data in pages:
+            writer.write(page_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite page writes.")
+    parser.add_argument('--pages', type=int, default=2000, help="Number of pages to write.")
+    args = parser.parse_args()
+
+    pages = build_pages(args.pages)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        run("save_page_data", os.path.join(tmp_dir, 'single.db'), save_one_by_one, pages)
+        run("PageWriter (batched)", os.path.join(tmp_dir, 'batched.db'), save_batched, pages)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark for robots.txt handling and the adaptive per-host rate.
+
+Serves a synthetic site from a host with a limited capacity: responses slow down once more
+than --capacity requests are in flight, and beyond --hard-limit the server answers
+429 Too Many Requests with a Retry-After header. Its robots.txt disallows /private/, which
+a share of the sitemap's pages live under. That rule comes last, after --robots-padding
+other rules, and the file is sent chunked in 8 KB pieces, so it is only honored if the whole
+file is read. The site is crawled with the old fixed rate (2 requests per host, 1s apart),
+with an aggressive fixed rate and with the adaptive rate. Reports each crawl's time, how
+many 429s it caused and whether any disallowed page was fetched.
+
+Usage:
+    python benchmarks/bench_throttle.py [--pages 300] [--capacity 4] [--hard-limit 6]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import urlopen
+
+from bench_frontier import WORKER, ROOT
+
+RATES = (
+    ('fixed, 2 per host 1s apart', ['--fixed-rate', '--per-host', '2', '--delay', '1']),
+    ('fixed, 16 per host', ['--fixed-rate', '--per-host', '16', '--delay', '0']),
+    ('adaptive (default)', ['--per-host', '16']),
+)
+
+
+def serve(port, pages, latency, capacity, hard_limit, private_every, robots_padding):
+    base = f'http://127.0.0.1:{port}'
+    counts = Counter()
+    lock = threading.Lock()
+    in_flight = [0]
+
+    def page_path(index):
+        return f'/private/{index}' if index % private_every == 0 else f'/page/{index}'
+
+    sitemap = (
+        '<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + ''.join(f'<url><loc>{base}{page_path(index)}</loc></url>' for index in range(pages))
+        + '</urlset>'
+    )
+    robots = (
+        'User-agent: *\nAllow: /page/\n'
+        + ''.join(f'Disallow: /archive/{index}/\n' for index in range(robots_padding))
+        + 'Disallow: /private/\n'
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, content_type, headers=()):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command == 'GET':
+                self.wfile.write(body)
+
+        def _send_chunked(self, body, content_type, chunk_size=8 * 1024):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for offset in range(0, len(body), chunk_size):
+                chunk = body[offset:offset + chunk_size]
+                self.wfile.write(f'{len(chunk):x}\r\n'.encode('ascii') + chunk + b'\r\n')
+                self.wfile.flush()
+                # Let each chunk reach the client on its own.
+                time.sleep(0.01)
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _respond(self):
+            path = self.path
+            if path == '/_stats':
+                with lock:
+                    body = json.dumps(counts)
+                    counts.clear()
+                return self._send(200, body, 'application/json')
+            if path == '/robots.txt':
+                return self._send_chunked(robots, 'text/plain')
+            if path == '/sitemap.xml':
+                return self._send(200, sitemap, 'application/xml')
+            if not path.startswith(('/page/', '/private/')) or self.command != 'GET':
+                return self._send(404, '', 'text/plain')
+
+            with lock:
+                in_flight[0] += 1
+                load = in_flight[0]
+            try:
+                if load > hard_limit:
+                    with lock:
+                        counts['429'] += 1
+                    return self._send(429, '', 'text/plain', [('Retry-After', '1')])
+                # Past its capacity the host slows down for every request in flight.
+                time.sleep(latency * max(1, load - capacity + 1))
+                with lock:
+                    counts['private' if path.startswith('/private/') else 'pages'] += 1
+                return self._send(200, f'<html><head><title>{path}</title></head><body><h1>{path}</h1></body></html>',
+                                  'text/html; charset=utf-8')
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        def do_GET(self):
+            self._respond()
+
+        def do_HEAD(self):
+            self._respond()
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def handle_error(self, request, client_address):
+            pass
+
+    Server(('127.0.0.1', port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the adaptive per-host rate and robots.txt handling.")
+    parser.add_argument('--pages', type=int, default=300, help="Number of pages in the sitemap.")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds the server takes per GET within capacity.")
+    parser.add_argument('--capacity', type=int, default=4, help="Requests in flight the server handles at full speed.")
+    parser.add_argument('--hard-limit', type=int, default=6, help="Requests in flight beyond which it answers 429.")
+    parser.add_argument('--private-every', type=int, default=10, help="Every Nth page is under /private/.")
+    parser.add_argument('--robots-padding', type=int, default=2000,
+                        help="Rules in robots.txt before the one disallowing /private/.")
+    parser.add_argument('--port', type=int, default=8799, help="Port of the local server.")
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=serve, daemon=True, args=(
+        args.port, args.pages, args.latency, args.capacity, args.hard_limit, args.private_every, args.robots_padding,
+    ))
+    server.start()
+    time.sleep(1)
+
+    def stats():
+        return json.loads(urlopen(f'http://127.0.0.1:{args.port}/_stats').read())
+
+    allowed = sum(1 for index in range(args.pages) if index % args.private_every)
+    print(f"{args.pages} pages, {allowed} allowed by robots.txt; full speed up to {args.capacity} "
+          f"requests in flight, 429 beyond {args.hard_limit}")
+    with tempfile.TemporaryDirectory() as home:
+        stats()
+        for name, rate in RATES:
+            command = [
+                sys.executable, '-c', WORKER, ROOT, 'crawl', f'http://127.0.0.1:{args.port}/sitemap.xml',
+                '--render', 'never', '--parse-workers', '0', '--concurrency', '16', *rate,
+            ]
+            log_path = os.path.join(home, 'crawl.log')
+            started = time.perf_counter()
+            with open(log_path, 'w') as log:
+                subprocess.run(command, env={**os.environ, 'HOME': home}, stdout=log, stderr=subprocess.STDOUT)
+            elapsed = time.perf_counter() - started
+            counts = stats()
+            with open(log_path) as log:
+                notes = [line.strip() for line in log if line.startswith(('Rate for ', 'Read '))]
+            print(f"{name:27}: {elapsed:5.1f}s, {counts.get('pages', 0)} pages fetched "
+                  f"({counts.get('pages', 0) / elapsed:.1f}/s), {counts.get('429', 0)} 429s, "
+                  f"{counts.get('private', 0)} disallowed pages fetched")
+            for line in notes:
+                print(f"{'':29}{line}")
+
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
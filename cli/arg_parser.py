@@ -1,5 +1,10 @@
 import argparse
-from spider.utils import get_default_db_location
+import os
+from spider.parsers import PARSER_BACKENDS
+from spider.export import EXPORT_FORMATS
+from spider.storage import EXPORT_FIELDS
+from spider.frontier import DEFAULT_LEASE_SECONDS
+from spider.render_profile import RENDER_WAITS
 
 
 def create_parser():
@@ -33,10 +38,9 @@ def create_parser():
     parser_crawl.add_argument(
         '-o', '--output',
         type=str,
-        default=get_default_db_location(),
         help=(
-            "Specify the output file path where the crawl results will be saved. "
-            "Defaults to a file called 'output.txt' on your desktop."
+            "Also write every crawled page to this file as it is crawled, as CSV if the name ends in .csv "
+            "and as JSON Lines otherwise. A name ending in .gz is gzip-compressed."
         )
     )
     parser_crawl.add_argument(
@@ -44,6 +48,274 @@ def create_parser():
         type=str,
         help="Save the crawl results to the database under a project name (www.example.com)."
     )
+    parser_crawl.add_argument(
+        '--resume',
+        type=int,
+        metavar='RUN_ID',
+        help=(
+            "Continue an interrupted crawl run from its last checkpoint without fetching its "
+            "finished URLs again. Run 'seo runs' to list crawl runs and their ids."
+        )
+    )
+    parser_crawl.add_argument(
+        '--full',
+        action='store_true',
+        help=(
+            "Fetch, render and extract every page again. By default pages the project already has are "
+            "only fetched if their sitemap lastmod changed, with a conditional request, and are skipped "
+            "when the server reports them not modified or their HTML is the same."
+        )
+    )
+    parser_crawl.add_argument(
+        '--no-response-cache',
+        action='store_true',
+        help=(
+            "Don't keep the fetched and rendered HTML of a saved crawl's pages on disk. By default "
+            "it is kept compressed, so 'seo reparse' can extract the pages again without crawling."
+        )
+    )
+    parser_crawl.add_argument(
+        '--include',
+        action='append',
+        metavar='PATTERN',
+        help=(
+            "Only crawl page URLs matching this regular expression; sitemaps are still read. "
+            "Can be given several times."
+        )
+    )
+    parser_crawl.add_argument(
+        '--exclude',
+        action='append',
+        metavar='PATTERN',
+        help="Don't crawl page or sitemap URLs matching this regular expression. Can be given several times."
+    )
+    parser_crawl.add_argument(
+        '--prefer',
+        action='append',
+        metavar='PATTERN',
+        help=(
+            "Crawl page URLs matching this regular expression before all others. Other pages are "
+            "crawled by sitemap priority, lastmod recency and URL depth. Can be given several times."
+        )
+    )
+    parser_crawl.add_argument(
+        '--max-pages',
+        type=int,
+        help="Stop the crawl after fetching this many pages, the highest value pages first."
+    )
+    parser_crawl.add_argument(
+        '--time-budget',
+        type=str,
+        help=(
+            "Stop fetching pages after this long (e.g. '90s', '30m', '2h'), the highest value "
+            "pages first. Pages already fetched are still saved."
+        )
+    )
+    parser_crawl.add_argument(
+        '--worker',
+        action='store_true',
+        help=(
+            "Crawl as one of several workers sharing the project's (-s) crawl through the database. "
+            "With a URL or sitemap, starts a crawl or adds to the one in progress; without, joins it."
+        )
+    )
+    parser_crawl.add_argument(
+        '--worker-id',
+        type=str,
+        help="Name of this worker in the shared crawl. Defaults to the host name and process id."
+    )
+    parser_crawl.add_argument(
+        '--lease',
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=(
+            "Seconds a worker holds the URLs it claimed without renewing them. URLs of a worker "
+            f"that stopped are reclaimed after this long. Defaults to {DEFAULT_LEASE_SECONDS:g}."
+        )
+    )
+    parser_crawl.add_argument(
+        '--concurrency',
+        type=int,
+        default=5,
+        help="Maximum number of URLs fetched at the same time across all hosts. Defaults to 5."
+    )
+    parser_crawl.add_argument(
+        '--per-host',
+        type=int,
+        default=8,
+        help=(
+            "Maximum number of simultaneous requests to a single host. Each host starts at 2 and "
+            "goes up to this while it keeps responding as fast as usual. Defaults to 8."
+        )
+    )
+    parser_crawl.add_argument(
+        '--delay',
+        type=float,
+        default=1.0,
+        help=(
+            "Seconds to wait after each request before reusing a per-host slot, to start with. "
+            "The delay shrinks while a host responds steadily and grows when it slows down or "
+            "answers 429/503. Defaults to 1.0."
+        )
+    )
+    parser_crawl.add_argument(
+        '--min-delay',
+        type=float,
+        default=0.0,
+        help="Shortest delay after each request that a host's rate may reach. Defaults to 0."
+    )
+    parser_crawl.add_argument(
+        '--fixed-rate',
+        action='store_true',
+        help=(
+            "Keep --per-host and --delay fixed instead of adapting them to each host. Retry-After "
+            "and robots.txt Crawl-delay are still honored."
+        )
+    )
+    parser_crawl.add_argument(
+        '--ignore-robots',
+        action='store_true',
+        help="Crawl pages robots.txt disallows and ignore its Crawl-delay, e.g. to audit your own staging site."
+    )
+    parser_crawl.add_argument(
+        '--browsers',
+        type=int,
+        default=1,
+        help="Number of headless browsers kept open for rendering JavaScript. Defaults to 1."
+    )
+    parser_crawl.add_argument(
+        '--pages-per-browser',
+        type=int,
+        default=4,
+        help="Maximum number of pages each browser renders at the same time. Defaults to 4."
+    )
+    parser_crawl.add_argument(
+        '--recycle-after',
+        type=int,
+        default=50,
+        help="Replace a browser page after this many navigations to cap memory use. Defaults to 50."
+    )
+    parser_crawl.add_argument(
+        '--render',
+        choices=['never', 'auto', 'always'],
+        default='auto',
+        help=(
+            "When to render pages with JavaScript. 'auto' uses the static HTML unless a page "
+            "or its host looks JavaScript-dependent. Defaults to 'auto'."
+        )
+    )
+    parser_crawl.add_argument(
+        '--render-wait',
+        choices=RENDER_WAITS,
+        default='stable',
+        help=(
+            "When a rendered page is done: on the domcontentloaded, load or networkidle event, or "
+            "'stable' once its DOM stopped changing for --stable-ms after domcontentloaded. "
+            "Defaults to 'stable'."
+        )
+    )
+    parser_crawl.add_argument(
+        '--render-wait-for',
+        type=str,
+        metavar='SELECTOR',
+        help="Also wait until this CSS selector is in a rendered page, e.g. '#product-list li'."
+    )
+    parser_crawl.add_argument(
+        '--stable-ms',
+        type=int,
+        default=500,
+        help="Milliseconds without DOM changes after which --render-wait stable counts a page as done. Defaults to 500."
+    )
+    parser_crawl.add_argument(
+        '--render-budget',
+        type=str,
+        default='15s',
+        help=(
+            "Longest time a page may take to render, e.g. '10s'. When it runs out, the HTML "
+            "rendered so far is used. Defaults to 15s."
+        )
+    )
+    parser_crawl.add_argument(
+        '--block-resources',
+        type=str,
+        default='image,media,font',
+        help=(
+            "Comma separated resource types rendered pages don't load, or 'none'. Any of "
+            "stylesheet, image, media, font, script, xhr, fetch, ... Defaults to 'image,media,font'."
+        )
+    )
+    parser_crawl.add_argument(
+        '--block-host',
+        action='append',
+        metavar='HOST',
+        help=(
+            "Don't send rendered pages' requests to this host or its subdomains, e.g. a chat "
+            "widget. Adds to the built-in list of analytics and ad hosts. Can be given several times."
+        )
+    )
+    parser_crawl.add_argument(
+        '--no-host-blocklist',
+        action='store_true',
+        help="Let rendered pages load analytics and ad hosts; only --block-host hosts are blocked."
+    )
+    parser_crawl.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default='html.parser',
+        help=(
+            "HTML parser backend used for extraction. 'lxml' and 'selectolax' are faster "
+            "but need their packages installed. Defaults to 'html.parser'."
+        )
+    )
+    parser_crawl.add_argument(
+        '--parse-workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help=(
+            "Number of processes that parse and extract pages in parallel. 0 extracts in the "
+            "crawl process. Defaults to the number of CPU cores."
+        )
+    )
+    parser_crawl.add_argument(
+        '--link-concurrency',
+        type=int,
+        default=20,
+        help="Maximum number of open connections used for checking links. Defaults to 20."
+    )
+    parser_crawl.add_argument(
+        '--link-per-host',
+        type=int,
+        default=4,
+        help="Maximum number of open connections per host used for checking links. Defaults to 4."
+    )
+    parser_crawl.add_argument(
+        '--link-cache-ttl',
+        type=str,
+        default=None,
+        help=(
+            "How long link check results are reused across crawls. Either one duration for all "
+            "statuses (e.g. '12h', 0 disables the cache) or per status class overrides such as "
+            "'2xx=14d,5xx=30m'. Defaults to 2xx=7d,3xx=3d,4xx=1d,5xx=1h,error=15m."
+        )
+    )
+
+    # Crawl runs command
+    parser_runs = subparsers.add_parser(
+        'runs',
+        help='List recent crawl runs with their ids, status and progress, e.g. to resume an interrupted crawl.'
+    )
+    parser_runs.add_argument(
+        'project_name',
+        type=str,
+        nargs='?',
+        help="The name of the project to list runs of. If omitted, runs of every project are listed."
+    )
+    parser_runs.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help="The number of runs to show (default: 20)."
+    )
 
     # List command
     parser_list = subparsers.add_parser(
@@ -65,6 +337,38 @@ def create_parser():
         help="The name of the project to fetch data for."
     )
 
+    # Export project command
+    parser_export = subparsers.add_parser(
+        'export',
+        help='Export the pages of a project from the database to a JSON Lines or CSV file.'
+    )
+    parser_export.add_argument(
+        'project_name',
+        type=str,
+        help="The name of the project to export."
+    )
+    parser_export.add_argument(
+        '-o', '--output',
+        type=str,
+        default='-',
+        help="The file to write. Defaults to standard output."
+    )
+    parser_export.add_argument(
+        '--format',
+        choices=EXPORT_FORMATS,
+        help="The output format. Defaults to csv for .csv files and jsonl otherwise."
+    )
+    parser_export.add_argument(
+        '--fields',
+        type=str,
+        help=f"Comma-separated fields to export, in order. Defaults to all of: {', '.join(EXPORT_FIELDS)}."
+    )
+    parser_export.add_argument(
+        '--gzip',
+        action='store_true',
+        help="Gzip the output. Implied when the output file name ends in .gz."
+    )
+
     # Remove project command
     parser_rm = subparsers.add_parser(
         'rm',
@@ -82,6 +386,128 @@ def create_parser():
         help="If provided, all projects and data will be removed from the database."
     )
 
+    # Full-text search command
+    parser_search = subparsers.add_parser(
+        'search',
+        help='Full-text search the titles, meta descriptions, headings and paragraphs of a project.'
+    )
+    parser_search.add_argument(
+        'project_name',
+        type=str,
+        help="The name of the project to search."
+    )
+    parser_search.add_argument(
+        'query',
+        type=str,
+        help='The words to search for. Supports "exact phrases", OR, NOT and prefix* queries.'
+    )
+    parser_search.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help="The number of results to show (default: 20)."
+    )
+    parser_search.add_argument(
+        '--page',
+        type=int,
+        default=1,
+        help="The page of results to show (default: 1)."
+    )
+
+    # Duplicate content command
+    parser_dupes = subparsers.add_parser(
+        'dupes',
+        help='Find near-duplicate pages, duplicate titles, meta descriptions and H1s, and thin pages in a project.'
+    )
+    parser_dupes.add_argument(
+        'project_name',
+        type=str,
+        help="The name of the project to audit."
+    )
+    parser_dupes.add_argument(
+        '--threshold',
+        type=float,
+        default=0.8,
+        help="The minimum share of overlapping text for two pages to count as near duplicates (default: 0.8)."
+    )
+    parser_dupes.add_argument(
+        '--min-words',
+        type=int,
+        default=20,
+        help="Ignore pages with fewer body text words than this when looking for near duplicates (default: 20)."
+    )
+    parser_dupes.add_argument(
+        '--thin',
+        type=int,
+        default=200,
+        help="Report pages with fewer body text words than this as thin (default: 200)."
+    )
+
+    # Link graph command
+    parser_graph = subparsers.add_parser(
+        'graph',
+        help='Analyze the internal link graph of a project: PageRank, click depth, inlinks and orphan pages.'
+    )
+    parser_graph.add_argument(
+        'project_name',
+        type=str,
+        help="The name of the project to analyze."
+    )
+    parser_graph.add_argument(
+        '--start',
+        type=str,
+        help="The URL click depth is measured from. Defaults to the homepage."
+    )
+
+    # Reparse command
+    parser_reparse = subparsers.add_parser(
+        'reparse',
+        help=(
+            "Extract a project's pages again from the responses its crawls cached on disk, "
+            "without any network access, e.g. after an extraction rule changed."
+        )
+    )
+    parser_reparse.add_argument(
+        'project_name',
+        type=str,
+        help="The name of the project to reparse."
+    )
+    parser_reparse.add_argument(
+        '--run',
+        type=int,
+        metavar='RUN_ID',
+        help="Reparse the pages as crawl run RUN_ID left them instead of as last fetched."
+    )
+    parser_reparse.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of processes that extract pages in parallel. Defaults to the number of CPU cores."
+    )
+    parser_reparse.add_argument(
+        '--parser',
+        choices=PARSER_BACKENDS,
+        default='html.parser',
+        help="HTML parser backend used for extraction. Defaults to 'html.parser'."
+    )
+
+    # Project stats command
+    parser_stats = subparsers.add_parser(
+        'stats',
+        help='Show the stored summary totals of projects and check them against their pages.'
+    )
+    parser_stats.add_argument(
+        'project_name',
+        type=str,
+        nargs='?',
+        help="The name of the project to check. If omitted, every project is checked."
+    )
+    parser_stats.add_argument(
+        '--rebuild',
+        action='store_true',
+        help="Recompute the stored totals from scratch from the saved pages."
+    )
+
     # Start Flask web dashboard command
     parser_dash = subparsers.add_parser('dash', help='Start the Flask dashboard for viewing project reports.')
 
@@ -1,11 +1,30 @@
+import itertools
 import json
 import os
 import subprocess
-from spider.utils import fetch_urls_from_clipboard, save_json_to_file
-from spider.extractor import collect_and_process_sitemaps, extract_and_parse_page_data
-from spider.storage import save_page_data, fetch_all_project_names, fetch_pages_by_project, clear_all_data, remove_project_by_name
+import sys
+import time
+from spider.utils import fetch_urls_from_clipboard
+from spider.engine import crawl_urls, resolve_crawl_seeds
+from spider.schemas import CrawlOptions, RenderProfile, PageData
+from spider.link_cache import LinkStatusCache, parse_link_cache_ttl, parse_duration
+from spider.scheduler import compile_patterns
+from spider.storage import create_tables, PageWriter, fetch_all_project_names, iter_project_pages, clear_all_data, remove_project_by_name, \
+    fetch_project_summaries, check_project_stats, PROJECT_STATS_COLUMNS, search_pages, fetch_near_duplicates, \
+    fetch_exact_duplicates, fetch_thin_pages, fetch_pages_by_ids, DUPLICATE_FIELDS, fetch_page_graph, fetch_crawl_run, \
+    fetch_crawl_runs
+from spider.graph import analyze_link_graph
+from spider.export import ExportWriter, export_pages, guess_export_format
+from spider.frontier import Frontier
+from spider.response_cache import ResponseCache, prune_blobs
+from spider.reparse import reparse_project
+from spider.render_profile import parse_resource_types
 from .arg_parser import create_parser
 
+# The PageData fields `crawl --output` writes for each page, in model order.
+CRAWL_OUTPUT_EXCLUDE = {'fingerprint', 'version'}
+CRAWL_OUTPUT_FIELDS = list(PageData().dict(exclude=CRAWL_OUTPUT_EXCLUDE))
+
 
 def handle_crawl_command(args):
     """
@@ -14,6 +33,17 @@ def handle_crawl_command(args):
     This function is responsible for crawling a sitemap or URLs provided via input or clipboard.
     If no input is provided, it automatically grabs URLs from the clipboard.
 
+    A crawl saved to a project (-s) is a crawl run with an id. Its frontier is checkpointed in
+    the database as it goes, so an interrupted run can be continued with --resume. With
+    --worker, the run is shared with other worker processes: the input (if any) starts a
+    run or is added to the one in progress, and without input the worker joins it.
+
+    URLs are crawled highest value first (see spider.scheduler). A saved crawl stopped by
+    --max-pages or --time-budget can be continued with --resume like an interrupted one.
+
+    Unless --no-response-cache is given, a saved crawl keeps the HTML of the pages it fetches
+    in the response cache, for 'seo reparse'.
+
     Args:
         args (Namespace): Parsed command-line arguments.
 
@@ -22,41 +52,223 @@ def handle_crawl_command(args):
     """
     checked_links = dict()
 
+    try:
+        link_cache = LinkStatusCache(parse_link_cache_ttl(args.link_cache_ttl))
+    except ValueError as e:
+        print(f"Error: Invalid --link-cache-ttl value: {e}")
+        return
+
+    try:
+        time_budget = parse_duration(args.time_budget) if args.time_budget else None
+    except ValueError as e:
+        print(f"Error: Invalid --time-budget value: {e}")
+        return
+
+    try:
+        for patterns in (args.include, args.exclude, args.prefer):
+            compile_patterns(patterns)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
+    try:
+        render_budget = parse_duration(args.render_budget)
+        if render_budget <= 0:
+            raise ValueError("the budget must be more than 0 seconds")
+    except ValueError as e:
+        print(f"Error: Invalid --render-budget value: {e}")
+        return
+
+    try:
+        block_resources = parse_resource_types(args.block_resources)
+    except ValueError as e:
+        print(f"Error: Invalid --block-resources value: {e}")
+        return
+
+    render_profile = RenderProfile(
+        wait=args.render_wait,
+        wait_for=args.render_wait_for,
+        stable_ms=max(args.stable_ms, 0),
+        budget=render_budget,
+        block_resources=block_resources,
+        block_hosts=args.block_host or [],
+        default_blocklist=not args.no_host_blocklist,
+    )
+
+    project_name = args.save if args.save else None
+    if args.resume is not None:
+        if args.input:
+            print("Error: --resume continues a run from its checkpoint and takes no URL or sitemap.")
+            return
+        create_tables()
+        run = fetch_crawl_run(args.resume)
+        if run is None:
+            print(f"Error: No crawl run {args.resume} found. Run 'seo runs' to list crawl runs.")
+            return
+        if project_name and project_name != run['project_name']:
+            print(f"Error: Run {args.resume} belongs to project '{run['project_name']}', not '{project_name}'.")
+            return
+        project_name = run['project_name']
+    elif args.worker and not project_name:
+        print("Error: --worker needs a project name (-s) to share the crawl through.")
+        return
+
     if args.input:
         page_urls = [args.input]
+    elif args.resume is not None or args.worker:
+        page_urls = []
     else:
         page_urls = fetch_urls_from_clipboard()
 
-    if not page_urls:
+    if not page_urls and not (args.resume is not None or args.worker):
         print("No valid URLs provided or found in clipboard.")
         return
 
-    project_name = args.save if args.save else None
+    create_tables()
 
+    frontier = None
     if project_name:
+        frontier = Frontier(project_name, args.worker_id, args.lease)
+        try:
+            if args.resume is not None:
+                frontier.resume(args.resume)
+                # Links checked before the interruption aren't checked again, whatever their cache TTL.
+                checked_links.update(frontier.checked_links())
+            else:
+                started = frontier.start(' '.join(page_urls) or None, join=args.worker)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
         print(f"Saving results under project name: {project_name}")
+        counts = frontier.counts()
+        progress = f"{counts['queued'] + counts['leased']} queued, {counts['done']} done"
+        if args.resume is not None:
+            print(f"Resuming crawl run {frontier.run_id} of '{project_name}' ({progress}, "
+                  f"{len(checked_links)} links already checked)")
+        elif frontier.run_id is None:
+            print(f"No crawl of project '{project_name}' is in progress. Pass a URL or sitemap to start one.")
+            return
+        elif started['joined']:
+            print(f"Worker {frontier.worker_id} joining crawl run {frontier.run_id} of '{project_name}' ({progress})")
+        else:
+            if started['abandoned_run_id'] is not None:
+                print(f"Discarding the checkpoint of unfinished crawl run {started['abandoned_run_id']} "
+                      f"of '{project_name}'")
+            print(f"Started crawl run {frontier.run_id} of '{project_name}'. "
+                  f"If it is interrupted, continue it with 'seo crawl --resume {frontier.run_id}'.")
     else:
         print("No project name provided. Results will not be saved to the database.")
 
-    all_page_data = {}
+    options = CrawlOptions(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        delay=args.delay,
+        min_delay=args.min_delay,
+        adaptive=not args.fixed_rate,
+        respect_robots=not args.ignore_robots,
+        link_concurrency=args.link_concurrency,
+        link_per_host=args.link_per_host,
+        browsers=args.browsers,
+        pages_per_browser=args.pages_per_browser,
+        recycle_after=args.recycle_after,
+        render=args.render,
+        render_profile=render_profile,
+        parser=args.parser,
+        parse_workers=max(args.parse_workers, 0),
+        incremental=not args.full,
+        include=args.include or [],
+        exclude=args.exclude or [],
+        prefer=args.prefer or [],
+        max_pages=args.max_pages,
+        time_budget=time_budget,
+    )
+
+    seed_urls = itertools.chain.from_iterable(resolve_crawl_seeds(page_url) for page_url in page_urls)
+
+    # Pages are saved as soon as they are extracted, and marked done in the frontier in the
+    # same transaction, so an interrupted crawl keeps its progress.
+    writer = PageWriter(project_name, frontier=frontier) if project_name else None
+    response_cache = ResponseCache(frontier.project_id, frontier.run_id) \
+        if frontier is not None and not args.no_response_cache else None
+    try:
+        output = ExportWriter(
+            args.output, guess_export_format(args.output), CRAWL_OUTPUT_FIELDS, compress=args.output.endswith('.gz')
+        ) if args.output else None
+    except OSError as e:
+        print(f"Error: Could not open output file: {e}")
+        return
 
-    for page_url in page_urls:
-        if page_url.endswith('.xml'):
-            sitemap_data = collect_and_process_sitemaps(page_url, checked_links)
-            if sitemap_data:
-                all_page_data.update(sitemap_data)
-                if project_name:
-                    for url, page_data in sitemap_data.items():
-                        save_page_data(project_name, page_data)
-        else:
-            page_data = extract_and_parse_page_data(page_url, checked_links)
-            if page_data:
-                all_page_data[page_url] = page_data
-                if project_name:
-                    save_page_data(project_name, page_data)
+    def on_page(page_data):
+        if writer:
+            writer.write(page_data)
+        if output:
+            output.write(page_data.dict(exclude=CRAWL_OUTPUT_EXCLUDE))
 
-    # if args.output:
-    #     save_json_to_file(all_page_data, args.output)
+    if writer:
+        writer.start()
+    interrupted = False
+    try:
+        crawl_urls(seed_urls, checked_links, options, link_cache, on_page=on_page, frontier=frontier,
+                   on_unchanged=writer.touch if writer else None, response_cache=response_cache)
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        if writer:
+            writer.close()
+            unchanged = f" ({writer.rows_touched} more were unchanged)" if writer.rows_touched else ""
+            print(f"Saved {writer.rows_written} pages to project '{project_name}'{unchanged}")
+        if response_cache:
+            response_cache.close()
+        if output:
+            output.close()
+            print(f"Wrote {output.rows_written} pages to {args.output}")
+        link_cache.report()
+        if frontier is not None:
+            frontier.end_run(interrupted)
+
+    if not interrupted and frontier is not None and (options.max_pages or options.time_budget):
+        counts = frontier.counts()
+        if counts['queued'] or counts['leased']:
+            print(f"Crawl budget spent with {counts['queued'] + counts['leased']} URLs left. "
+                  f"Continue it with 'seo crawl --resume {frontier.run_id}'.")
+
+    if interrupted:
+        if frontier is not None:
+            print(f"Crawl interrupted. Continue it with 'seo crawl --resume {frontier.run_id}'.")
+    elif args.worker:
+        counts = frontier.counts()
+        print(f"Frontier of '{project_name}': {counts['done']} done, {counts['failed']} failed")
+        print(f"Run 'seo graph {project_name}' once every worker has finished to analyze internal links.")
+    elif writer:
+        print_graph_summary(project_name, analyze_link_graph(project_name))
+
+
+def handle_runs_command(args):
+    """
+    Handle the 'runs' command.
+
+    Lists the most recent crawl runs of a project, or of every project, with their status and
+    the progress recorded at their last checkpoint.
+    """
+    create_tables()
+    runs = fetch_crawl_runs(args.project_name, limit=args.limit)
+    if not runs:
+        print("No crawl runs found.")
+        return
+
+    def when(timestamp):
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp)) if timestamp else '-'
+
+    print(f"{'Run':>5}  {'Project':30}  {'Status':11}  {'Started':16}  {'Checkpoint':16}  {'Pages':>7}  {'Failed':>6}")
+    for run in runs:
+        print(
+            f"{run['id']:>5}  {run['project_name'][:30]:30}  {run['status']:11}  {when(run['started_at']):16}  "
+            f"{when(run['checkpoint_at']):16}  {run['pages_done']:>7}  {run['urls_failed']:>6}"
+        )
+    resumable = [run['id'] for run in runs if run['status'] == 'interrupted']
+    if resumable:
+        print(f"\nContinue an interrupted run with 'seo crawl --resume {resumable[0]}'.")
 
 
 def handle_list_command():
@@ -92,23 +304,57 @@ def handle_clear_command():
 
 def handle_get_command(project_name):
     """
-    Handle the 'get' command to fetch project data from the database.
+    Handle the 'get' command to print a project's pages from the database.
+
+    Pages are streamed from the database and printed one at a time as JSON.
 
     Args:
         project_name (str): The name of the project to fetch data for.
+    """
+    create_tables()
+    if project_name not in fetch_all_project_names():
+        print(f"No data found for project '{project_name}'.")
+        return
 
-    Returns:
-        pages (list): A list of pages for the project or an empty list if not found.
+    print(f"Pages for project '{project_name}':")
+    for page in iter_project_pages(project_name):
+        print(json.dumps(page, indent=4, ensure_ascii=False))
+
+
+def handle_export_command(args):
     """
-    if not project_name:
-        return None, "Please provide a project name."
+    Handle the 'export' command.
 
-    pages = fetch_pages_by_project(project_name)
+    Streams the pages of a project into a JSON Lines or CSV file, or to standard output,
+    and reports how many rows were written and how fast.
+    """
+    create_tables()
+    if args.project_name not in fetch_all_project_names():
+        print(f"Error: Project '{args.project_name}' not found.", file=sys.stderr)
+        return
 
-    if not pages:
-        return None, f"No data found for project '{project_name}'."
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()] if args.fields else None
+    export_format = args.format or guess_export_format(args.output)
+    compress = args.gzip or args.output.endswith('.gz')
+    try:
+        result = export_pages(args.project_name, args.output, export_format, fields, compress)
+    except BrokenPipeError:
+        # The reader of standard output went away, e.g. `seo export ... | head`. Point stdout at
+        # devnull so flushing it at exit doesn't raise again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return
 
-    return pages
+    rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+    destination = 'standard output' if args.output == '-' else args.output
+    # Progress goes to stderr so it never mixes with an export written to stdout.
+    print(
+        f"Exported {result['rows']} pages of '{args.project_name}' to {destination} "
+        f"in {result['seconds']:.1f}s ({rate:,.0f} rows/sec)",
+        file=sys.stderr
+    )
 
 
 def handle_rm_command(args):
@@ -130,9 +376,183 @@ def handle_rm_command(args):
             print(f"Project '{args.project_name}' has been removed.")
         else:
             print(f"Error: Project '{args.project_name}' not found.")
+            return
     else:
         print("Error: You must specify a project name or use the --all flag.")
+        return
+    print_pruned_blobs()
+
+
+def print_pruned_blobs():
+    """Delete the cached responses no project refers to any more and report the space freed."""
+    try:
+        deleted, freed = prune_blobs()
+    except OSError as e:
+        print(f"Error pruning the response cache: {e}")
+        return
+    if deleted:
+        print(f"Deleted {deleted} cached responses ({freed / 1e6:.1f} MB) no project refers to any more.")
+
 
+def handle_reparse_command(args):
+    """
+    Handle the 'reparse' command.
+
+    Extracts every saved page of a project again from the response cache, on one process per
+    core and without network access, then analyzes the project's link graph again since the
+    extracted links may have changed.
+    """
+    create_tables()
+    summary = reparse_project(args.project_name, args.run, max(args.workers, 1), args.parser)
+    if summary is None:
+        print(f"Error: Project '{args.project_name}' not found.")
+        return
+
+    rate = summary['pages'] / summary['seconds'] if summary['seconds'] else 0.0
+    print(f"Reparsed {summary['pages']} pages of '{args.project_name}' in {summary['seconds']:.1f}s "
+          f"({rate:.2f} pages/sec), saved {summary['saved']}")
+    if summary['failed']:
+        print(f"{summary['failed']} pages could not be reparsed and were left as they were.")
+    if summary['uncached']:
+        print(f"{summary['uncached']} pages have no cached response and were left as they were. "
+              f"Crawl them again with --full to cache them.")
+    if summary['unchecked_links']:
+        print(f"{summary['unchecked_links']} links were never checked and are not reported as broken "
+              f"until the next crawl.")
+    if summary['saved']:
+        print_graph_summary(args.project_name, analyze_link_graph(args.project_name))
+
+
+def handle_search_command(args):
+    """
+    Handle the 'search' command.
+
+    Prints the best matching pages of a project with their matched terms highlighted.
+    """
+    create_tables()
+    page = max(args.page, 1)
+    marks = ('\033[1m', '\033[0m') if sys.stdout.isatty() else ('[', ']')
+    found = search_pages(args.project_name, args.query, limit=args.limit, offset=(page - 1) * args.limit, marks=marks)
+
+    if not found['total']:
+        print(f"No pages in project '{args.project_name}' match '{args.query}'.")
+        return
+
+    first = (page - 1) * args.limit + 1
+    print(f"Showing {first}-{first + len(found['results']) - 1} of {found['total']} pages matching '{args.query}':")
+    for result in found['results']:
+        print(f"\n{result['title'] or '(no title)'}")
+        print(f"  {result['url']}")
+        print(f"  {' '.join(result['snippet'].split())}")
+
+
+def handle_dupes_command(args):
+    """
+    Handle the 'dupes' command.
+
+    Prints clusters of near-duplicate pages, groups of pages sharing a title, meta description,
+    H1 or body text, and the thinnest pages of a project.
+    """
+    create_tables()
+    if args.project_name not in fetch_all_project_names():
+        print(f"Error: Project '{args.project_name}' not found.")
+        return
+
+    clusters = fetch_near_duplicates(args.project_name, args.threshold, args.min_words)
+    print(f"{len(clusters)} clusters of near-duplicate pages ({sum(len(cluster) for cluster in clusters)} pages):")
+    for cluster in clusters:
+        print(f"\n  {len(cluster)} pages:")
+        for page in cluster:
+            print(f"    {page['similarity']:.0%}  {page['url']} ({page['word_count']} words)")
+
+    for field, (_, _, label) in DUPLICATE_FIELDS.items():
+        groups = fetch_exact_duplicates(args.project_name, field)
+        if not groups:
+            continue
+        print(f"\nDuplicate {label}:")
+        pages = fetch_pages_by_ids(page_id for group in groups for page_id in group['page_ids'])
+        for group in groups:
+            print(f"\n  {group['pages']} pages share: {group['sample']}")
+            for page_id in group['page_ids'][:10]:
+                print(f"    {pages[page_id]['url']}")
+            if group['pages'] > 10:
+                print(f"    ... and {group['pages'] - 10} more")
+
+    thin = fetch_thin_pages(args.project_name, args.thin, limit=20)
+    print(f"\n{thin['total']} pages have fewer than {args.thin} words of body text.")
+    for page in thin['pages']:
+        print(f"  {page['word_count']:5} words  {page['url']}")
+
+
+def handle_graph_command(args):
+    """
+    Handle the 'graph' command.
+
+    Computes and stores the link graph metrics of a project's pages, then prints the pages with
+    the highest PageRank, the deepest pages and the orphan pages.
+    """
+    create_tables()
+    summary = analyze_link_graph(args.project_name, args.start)
+    if summary is None:
+        print(f"Error: Project '{args.project_name}' not found.")
+        return
+    print_graph_summary(args.project_name, summary)
+
+    sections = (
+        ("Highest PageRank", {'order_by': 'pagerank'}),
+        ("Deepest pages", {'order_by': 'click_depth'}),
+        ("Orphan pages", {'order_by': 'pagerank', 'orphans_only': True}),
+    )
+    for heading, query in sections:
+        pages = fetch_page_graph(args.project_name, limit=10, **query)
+        if not pages:
+            continue
+        print(f"\n{heading}:")
+        for page in pages:
+            depth = page['click_depth'] if page['click_depth'] is not None else 'unreachable'
+            print(f"  {page['pagerank']:.6f}  depth {depth}  {page['inlinks']} inlinks  {page['url']}")
+
+
+def print_graph_summary(project_name, summary):
+    print(
+        f"Analyzed {summary['links']} internal links between {summary['pages']} pages of '{project_name}' "
+        f"in {summary['seconds']:.2f}s"
+    )
+    if summary['start_url']:
+        print(f"Click depth measured from {summary['start_url']}; {summary['unreachable']} pages are unreachable.")
+    print(f"{summary['orphans']} orphan pages have no internal links pointing to them.")
+
+
+def handle_stats_command(args):
+    """
+    Handle the 'stats' command.
+
+    Prints the stored summary totals of one or every project, recomputes them from the saved
+    pages and reports any total that has drifted. With --rebuild the stored totals are replaced.
+    """
+    create_tables()
+    mismatches = check_project_stats(args.project_name, rebuild=args.rebuild)
+    if mismatches is None:
+        print(f"Error: Project '{args.project_name}' not found.")
+        return
+
+    for summary in fetch_project_summaries():
+        if args.project_name and summary['project_name'] != args.project_name:
+            continue
+        print(f"{summary['project_name']}:")
+        for column in PROJECT_STATS_COLUMNS:
+            print(f"  {column.replace('_', ' ')}: {summary[column]}")
+
+    if not mismatches:
+        print("Project stats are consistent with the saved pages.")
+        return
+    for project_name, differences in mismatches.items():
+        for column, (stored, computed) in differences.items():
+            print(f"Project '{project_name}' {column}: stored {stored}, computed {computed}")
+    if args.rebuild:
+        print("Rebuilt project stats from the saved pages.")
+    else:
+        print("Run 'seo stats --rebuild' to rebuild them from the saved pages.")
 
 
 def handle_dash_command():
@@ -156,7 +576,7 @@ def execute_command():
     Execute the appropriate command based on user input (CLI context).
 
     This function parses the command-line arguments and executes the corresponding
-    command (crawl, get, list, rm). If no valid command is provided, it displays help.
+    command (crawl, runs, get, export, list, rm, search, dupes, graph, reparse, stats, dash). If no valid command is provided, it displays help.
 
     Args:
         None
@@ -172,17 +592,26 @@ def execute_command():
         return
     elif args.command == 'crawl':
         handle_crawl_command(args)
+    elif args.command == 'runs':
+        handle_runs_command(args)
     elif args.command == "get":
-        project_name = args.project_name
-        pages = handle_get_command(project_name)
-        if pages:
-            print(f"Pages for project '{project_name}':")
-            for page in pages:
-                print(json.dumps(page, indent=4))
+        handle_get_command(args.project_name)
+    elif args.command == 'export':
+        handle_export_command(args)
     elif args.command == 'list':
         handle_list_command()
     elif args.command == 'rm':
         handle_rm_command(args)
+    elif args.command == 'search':
+        handle_search_command(args)
+    elif args.command == 'dupes':
+        handle_dupes_command(args)
+    elif args.command == 'graph':
+        handle_graph_command(args)
+    elif args.command == 'reparse':
+        handle_reparse_command(args)
+    elif args.command == 'stats':
+        handle_stats_command(args)
     elif args.command == 'dash':
         handle_dash_command()
 
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+from playwright.async_api import async_playwright
+from .render_profile import RequestBlocker, render_page
+from .schemas import RenderProfile
+
+
+class _PageSlot:
+    """A reusable browser context and page bound to one browser in the pool."""
+
+    def __init__(self, browser_index):
+        self.browser_index = browser_index
+        self.context = None
+        self.page = None
+        self.navigations = 0
+        self.bytes_received = 0
+        self.requests_blocked = 0
+
+    def count_bytes(self, event):
+        self.bytes_received += event.get('encodedDataLength', 0)
+
+
+class BrowserPool:
+    """
+    A long-lived pool of headless Chromium browsers shared by a crawl session.
+
+    The pool launches `browsers` browsers, each serving at most `pages_per_browser`
+    concurrent pages. Every page lives in its own browser context and is recycled
+    after `recycle_after` navigations to keep Chromium's memory in check. Browsers are
+    launched lazily on first use, so crawls that never render pay no startup cost.
+
+    Pages are rendered following a RenderProfile: every context aborts the requests its
+    RequestBlocker rules out (images, media, fonts and analytics hosts by default), and
+    `render` waits for each page as the profile asks, within its render budget. The pool
+    counts the time, bytes received and requests blocked of every render for `report`.
+    """
+
+    def __init__(self, browsers=1, pages_per_browser=4, recycle_after=50, profile=None):
+        self.browsers_count = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.profile = profile or RenderProfile()
+        self.blocker = RequestBlocker(self.profile)
+        self.renders = 0
+        self.render_seconds = 0.0
+        self.bytes_received = 0
+        self.requests_blocked = 0
+        self.budget_exceeded = 0
+        self._playwright = None
+        self._browsers = []
+        self._slots = None
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _start(self):
+        async with self._start_lock:
+            if self._slots is not None:
+                return
+            print(f"Launching {self.browsers_count} browser(s) with {self.pages_per_browser} page(s) each")
+            self._playwright = await async_playwright().start()
+            self._browsers = [
+                await self._playwright.chromium.launch(headless=True) for _ in range(self.browsers_count)
+            ]
+            slots = asyncio.Queue()
+            for _ in range(self.pages_per_browser):
+                for browser_index in range(self.browsers_count):
+                    slots.put_nowait(_PageSlot(browser_index))
+            self._slots = slots
+
+    async def _browser(self, browser_index):
+        browser = self._browsers[browser_index]
+        if not browser.is_connected():
+            print(f"Browser {browser_index} disconnected, relaunching it")
+            browser = await self._playwright.chromium.launch(headless=True)
+            self._browsers[browser_index] = browser
+        return browser
+
+    async def _reset_slot(self, slot):
+        if slot.context is not None:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                print(f"Error closing browser context: {e}")
+        slot.context = None
+        slot.page = None
+        slot.navigations = 0
+        slot.bytes_received = 0
+        slot.requests_blocked = 0
+
+    async def _route(self, slot, route):
+        request = route.request
+        try:
+            if self.blocker.blocks(request.url, request.resource_type):
+                slot.requests_blocked += 1
+                await route.abort('blockedbyclient')
+            else:
+                await route.continue_()
+        except Exception:
+            pass  # The page navigated away or closed while the request was intercepted
+
+    async def _open_slot(self, slot):
+        browser = await self._browser(slot.browser_index)
+        slot.context = await browser.new_context()
+        if self.blocker.active:
+            await slot.context.route('**/*', partial(self._route, slot))
+        slot.page = await slot.context.new_page()
+        try:
+            # Bytes as received over the network, headers and compression included.
+            session = await slot.context.new_cdp_session(slot.page)
+            await session.send('Network.enable')
+            session.on('Network.loadingFinished', slot.count_bytes)
+        except Exception as e:
+            print(f"Not counting the bytes received by rendered pages: {e}")
+
+    @asynccontextmanager
+    async def _slot(self):
+        if self._slots is None:
+            await self._start()
+
+        slot = await self._slots.get()
+        try:
+            if slot.page is None or slot.page.is_closed():
+                await self._reset_slot(slot)
+                await self._open_slot(slot)
+
+            try:
+                yield slot
+            except Exception:
+                await self._reset_slot(slot)
+                raise
+
+            slot.navigations += 1
+            if slot.navigations >= self.recycle_after:
+                await self._reset_slot(slot)
+        finally:
+            self._slots.put_nowait(slot)
+
+    async def render(self, url):
+        """
+        Render a URL in a pooled page following the pool's RenderProfile.
+
+        Returns:
+            str: The rendered HTML, as far as the page got within the render budget.
+        """
+        started = time.monotonic()
+        async with self._slot() as slot:
+            bytes_before, blocked_before = slot.bytes_received, slot.requests_blocked
+            html, timed_out = await render_page(slot.page, url, self.profile)
+            received = slot.bytes_received - bytes_before
+            blocked = slot.requests_blocked - blocked_before
+        elapsed = time.monotonic() - started
+
+        self.renders += 1
+        self.render_seconds += elapsed
+        self.bytes_received += received
+        self.requests_blocked += blocked
+        self.budget_exceeded += timed_out
+        budget = f", stopped by the {self.profile.budget:g}s render budget" if timed_out else ""
+        print(f"Rendered {url} in {elapsed:.1f}s: {received / 1024:.0f} KB received, "
+              f"{blocked} requests blocked{budget}")
+        return html
+
+    def report(self):
+        if not self.renders:
+            return
+        print(
+            f"Rendered {self.renders} pages in {self.render_seconds / self.renders:.1f}s each on average, "
+            f"{self.bytes_received / self.renders / 1024:.0f} KB received and "
+            f"{self.requests_blocked / self.renders:.1f} requests blocked per page"
+        )
+        if self.budget_exceeded:
+            print(f"{self.budget_exceeded} pages ran out of the {self.profile.budget:g}s render budget "
+                  f"and were extracted as far as they had rendered")
+
+    async def close(self):
+        """Close every context and browser in the pool and stop Playwright."""
+        if self._slots is not None:
+            while not self._slots.empty():
+                await self._reset_slot(self._slots.get_nowait())
+            self._slots = None
+
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        self._browsers = []
+
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
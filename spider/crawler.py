@@ -1,56 +1,70 @@
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+import hashlib
 import time
-import requests
+from urllib.parse import urlparse
+import aiohttp
 import asyncio
-from playwright.async_api import async_playwright
+from .browser_pool import BrowserPool
+from .robots import USER_AGENT
+from .schemas import FetchResult, PageVersion
 
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Referer': 'http://google.com/'
+}
 
-def fetch_sitemap_content(sitemap_url):
-    """
-    Fetch and parse the content of a sitemap URL.
 
-    Depending on the content type (XML or HTML), this function will use the appropriate
-    parser (XML for sitemaps, HTML for individual web pages) to process the URL content.
+def get_base_url(url):
+    """
+    Strip the query string and fragment from a URL so it can be used to resolve relative links.
 
     Args:
-        sitemap_url (str): The URL of the sitemap or page to fetch and parse.
+        url (str): The URL of a fetched page.
 
     Returns:
-        bs4.BeautifulSoup: A BeautifulSoup object representing the parsed content, and the base URL (str).
-        If the content could not be fetched, returns (None, sitemap_url).
+        str: The scheme, host and path of the URL.
     """
-    try:
-        html = asyncio.run(fetch_url_content(sitemap_url))
-        if not html:
-            print(f"Failed to fetch or empty content for: {sitemap_url}")
-            return None, sitemap_url
+    parsed_url = urlparse(url)
+    return f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
 
-        if is_xml_content(html, sitemap_url):
-            soup_obj = BeautifulSoup(html, "xml")
-        else:
-            soup_obj = BeautifulSoup(html, "html.parser")
 
-        parsed_url = urlparse(sitemap_url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+def hash_body(body):
+    """Return a short hash of a response body, used to tell whether a page changed between crawls."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
 
-        print(f"Successfully crawled URL: {base_url}")
-        return soup_obj, base_url
 
-    except Exception as e:
-        print(f"Error crawling URL {sitemap_url}: {e}")
-        return None, sitemap_url
+def conditional_headers(previous):
+    """
+    Build the headers of a conditional GET from a page's previous version.
 
+    Pages that were rendered in a browser are always fetched in full: their static HTML
+    can stay the same while the content scripts load changes.
 
-def is_xml_content(content, url):
+    Args:
+        previous (PageVersion): The version of the page saved by the previous crawl, or None.
+
+    Returns:
+        dict: If-None-Match and If-Modified-Since headers, empty if there is nothing to validate.
+    """
+    if previous is None or previous.rendered:
+        return {}
+    headers = {}
+    if previous.etag:
+        headers['If-None-Match'] = previous.etag
+    if previous.last_modified:
+        headers['If-Modified-Since'] = previous.last_modified
+    return headers
+
+
+def is_xml_content(content, url, content_type=None):
     """
     Determine whether the fetched content is XML or HTML.
 
-    This function checks if the URL or content indicates XML format.
+    This function checks if the URL, the Content-Type header or the content indicates XML format.
 
     Args:
         content (str): The raw content fetched from the URL.
         url (str): The URL from which the content was fetched.
+        content_type (str, optional): The Content-Type header of the response, if known.
 
     Returns:
         bool: True if the content is XML, otherwise False.
@@ -58,57 +72,124 @@ def is_xml_content(content, url):
     if url.endswith('.xml'):
         return True
 
+    if content_type:
+        mime_type = content_type.split(';')[0].strip().lower()
+        if mime_type in ('application/xml', 'text/xml') or (mime_type.endswith('+xml') and 'xhtml' not in mime_type):
+            return True
+
     if content.lstrip().startswith('<?xml') or content.lstrip().startswith('<sitemapindex'):
         return True
 
     return False
 
 
-async def fetch_url_content(url):
+async def fetch_url(url, session=None, browser_pool=None, render_policy=None, previous: PageVersion = None):
     """
-    Fetch the raw content of a URL.
+    Fetch a URL once and, for HTML pages that need it, render it in a browser.
 
-    For XML content, this function makes an HTTP GET request.
-    For HTML content, it uses Playwright to render JavaScript and fetch the fully rendered content.
+    The static response is fetched with a single HTTP GET. XML content is returned as-is;
+    HTML content is additionally rendered with Playwright when the render policy asks for it,
+    so JavaScript-generated markup is available. Everything is returned in one FetchResult, so callers can detect the content
+    type, parse and extract without fetching the URL again.
+    Given the page's previous version, the request is conditional, and a page that is not
+    modified (HTTP 304) or whose static body hashes the same is returned with `unchanged` set,
+    before anything is rendered.
+    Politeness delays are applied by the caller (see spider.engine), so this coroutine never blocks the event loop.
 
     Args:
         url (str): The URL to fetch the content from.
+        session (aiohttp.ClientSession, optional): A shared HTTP session. When omitted, a
+            single-use session is opened for this URL.
+        browser_pool (BrowserPool, optional): A shared pool to render with. When omitted, a
+            single-use pool is started for this URL and closed afterwards.
+        render_policy (RenderPolicy, optional): Decides whether HTML pages are rendered.
+            When omitted, every HTML page is rendered.
+        previous (PageVersion, optional): The version of the page saved by the previous crawl.
 
     Returns:
-        str: The raw or fully rendered content of the URL as a string. If fetching fails, returns None.
+        FetchResult: The fetched response, or None if the request failed.
     """
-    time.sleep(1)  # Sleep to respect the server and avoid getting an IP ban.
+    if session is None:
+        async with aiohttp.ClientSession(headers=DEFAULT_HEADERS) as single_use_session:
+            return await fetch_url(url, single_use_session, browser_pool, render_policy, previous)
+
     try:
         print(f"Making request to: {url}")
-        headers = {
-            'User-Agent': 'Mozilla/5.0',
-            'Referer': 'http://google.com/'
-        }
+        headers = conditional_headers(previous)
+        started = time.monotonic()
+        async with session.get(url, headers=headers or None, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            body = await response.read()
+            try:
+                encoding = response.get_encoding()
+            except RuntimeError:
+                encoding = 'utf-8'
+            result = FetchResult(
+                url=url,
+                final_url=str(response.url),
+                status=response.status,
+                headers=dict(response.headers),
+                body=body,
+                encoding=encoding,
+                elapsed=time.monotonic() - started,
+            )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Failed to fetch URL: {e}")
+        return None
 
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+    if result.status == 304 and headers:
+        print(f"Not modified since the last crawl: {url}")
+        result.unchanged = True
+        return result
 
-        if is_xml_content(response.text, url):
-            print(f"Successfully fetched XML content for: {url}")
-            return response.text
+    if not result.ok:
+        print(f"Failed to fetch URL {url}: HTTP {result.status}")
+        return result
 
-        print(f"Fetching JavaScript-rendered content for: {url}")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+    if is_xml_content(result.text, url, result.content_type):
+        print(f"Successfully fetched XML content for: {url}")
+        return result
 
-            await page.goto(url)
-            await page.wait_for_load_state('networkidle')
-            content = await page.content()
+    if previous is not None and not previous.rendered and previous.body_hash == hash_body(result.body):
+        print(f"Unchanged since the last crawl: {url}")
+        result.unchanged = True
+        return result
 
-            await browser.close()
+    if render_policy is not None and not await asyncio.to_thread(render_policy.should_render, result):
+        print(f"Successfully fetched static HTML content for: {url}")
+        return result
 
+    try:
+        print(f"Fetching JavaScript-rendered content for: {url}")
+        if browser_pool is None:
+            async with BrowserPool(browsers=1, pages_per_browser=1) as single_use_pool:
+                result.rendered = await render_url_content(url, single_use_pool)
+        else:
+            result.rendered = await render_url_content(url, browser_pool)
         print(f"Successfully fetched rendered HTML content for: {url}")
-        return content
-
-    except requests.RequestException as e:
-        print(f"Failed to fetch URL with requests: {e}")
-        return None
+        if render_policy is not None:
+            await asyncio.to_thread(render_policy.record, result)
     except Exception as e:
-        print(f"Error with Playwright fetching content: {e}")
-        return None
+        # The static response is still a page; keep it rather than losing the URL.
+        print(f"Error with Playwright fetching content, using static HTML for {url}: {e}")
+        result.rendered = None
+        if render_policy is not None:
+            await asyncio.to_thread(render_policy.record_failure, result)
+
+    return result
+
+
+async def render_url_content(url, browser_pool):
+    """
+    Render a URL in a pooled Playwright page and return the resulting HTML.
+
+    How long the page is waited for, and which of its requests are blocked, follows the
+    pool's RenderProfile.
+
+    Args:
+        url (str): The URL to render.
+        browser_pool (BrowserPool): The pool to borrow a page from.
+
+    Returns:
+        str: The rendered HTML content of the page.
+    """
+    return await browser_pool.render(url)
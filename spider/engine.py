@@ -0,0 +1,608 @@
+import asyncio
+import aiohttp
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from urllib.parse import urlparse
+from .schemas import CrawlOptions, FetchResult, SitemapEntry, PageVersion
+from .browser_pool import BrowserPool
+from .render_policy import RenderPolicy
+from .link_checker import LinkChecker
+from .scheduler import CrawlScheduler, ScoredQueue
+from .robots import RobotsCache
+from .throttle import HostLimiter, THROTTLE_STATUSES
+from .crawler import DEFAULT_HEADERS, fetch_url, is_xml_content, get_base_url, hash_body
+from .extractor import build_page_data, extract_page_fields, extract_packed_page, unpack_page_data
+from .sitemaps import guess_sitemap_entry, iter_sitemap_bytes, iter_sitemap_file, stream_sitemap_entries
+
+
+class CrawlEngine:
+    """
+    Crawls page and sitemap URLs as a streaming pipeline on a single event loop.
+
+    Every stage is a pool of workers connected to the next stage by a queue:
+
+    - discover: sitemap workers stream sitemaps and push their entries into the fetch queue.
+    - fetch: `options.concurrency` workers fetch (and, when needed, render) page URLs at a
+      rate adapted to each host, up to `options.per_host` requests at a time (see
+      HostLimiter). Pages the server throttled (429/503) are retried later. Page URLs wait in a heap and are
+      fetched highest score first (see CrawlScheduler), so sitemaps are read ahead of the
+      fetchers and the pages that matter most are fetched first wherever they are listed.
+    - extract: workers hand each page's raw body to a pool of `options.parse_workers`
+      processes for parsing and extraction, so extraction is not limited to one core. With
+      no parse workers, pages are extracted on threads of the crawl process instead.
+    - check links: workers check the links of each extracted page. Extraction never waits
+      on the network, and link checks never wait on extraction.
+    - persist: one worker hands each finished page to `on_page` and drops it.
+
+    The fetch, extract, link and persist queues are bounded, so a slow stage pauses the stages
+    before it instead of letting pages pile up in memory. A page is released as soon as it
+    has been persisted, which keeps memory flat regardless of site size.
+
+    URLs are filtered by the include and exclude patterns of the options before they are
+    queued, and unless `options.respect_robots` is off, page URLs the host's robots.txt
+    disallows are dropped as well. With `options.max_pages` or `options.time_budget`, the crawl stops fetching pages
+    once it has fetched that many or the time is up; pages already fetched are finished.
+
+    Rendering goes through one BrowserPool, which follows `options.render_profile`, static
+    fetches through one HTTP session and link checks through one LinkChecker, all of which
+    live for the duration of the crawl. Each URL is fetched once and the resulting
+    FetchResult is handed straight to the next stage.
+
+    Given a Frontier, the engine is one worker of a crawl shared by several processes:
+    discovered URLs are added to the frontier in the database instead of the local queues,
+    a puller leases batches of URLs from it whenever the fetch queue has room, a heartbeat
+    keeps those leases alive and checkpoints the crawl run, and each URL is marked done or
+    failed once it is finished. URLs are claimed highest score first, and a crawl that
+    stops early leaves the URLs it didn't finish queued for a resumed run. Pages are marked done once `on_page` returns, or when they
+    are saved if a PageWriter was given the frontier. The crawl ends when no worker has any
+    URL queued or leased.
+
+    With a frontier and `options.incremental`, pages the project already has are recrawled
+    incrementally. A page whose sitemap <lastmod> is the same as at its last crawl isn't
+    fetched at all. Other pages are fetched with a conditional GET, and a page that is not
+    modified or whose body hashes the same is neither rendered nor extracted. Unchanged pages
+    are handed to `on_unchanged` with their updated PageVersion instead of to `on_page`.
+
+    Given a ResponseCache, the body (and rendered HTML) of every page fetched in full is stored
+    in it before extraction, so the page can be extracted again later without fetching it.
+    """
+
+    SITEMAP_WORKERS = 4
+    QUEUED_PAGES = 100_000  # Page URLs held in the fetch heap before sitemap streaming waits
+    THROTTLED_RETRIES = 3  # Times a page the server throttled is queued again
+    FRONTIER_BATCH = 500  # Discovered URLs buffered before they are written to the frontier
+    FRONTIER_POLL_SECONDS = 0.5  # Wait between frontier polls when there is nothing to claim
+
+    def __init__(self, checked_links, options=None, link_cache=None, on_page=None, frontier=None, on_unchanged=None,
+                 response_cache=None):
+        self.checked_links = checked_links
+        self.link_cache = link_cache
+        self.on_page = on_page
+        self.on_unchanged = on_unchanged
+        self.response_cache = response_cache
+        self.options = options or CrawlOptions()
+        self.scheduler = CrawlScheduler(self.options.include, self.options.exclude, self.options.prefer)
+        self.host_limiter = HostLimiter(
+            self.options.per_host, self.options.delay, self.options.min_delay, self.options.adaptive
+        )
+        self.robots = None
+        self.render_policy = RenderPolicy(self.options.render, parser=self.options.parser)
+        self.seen = set()
+        self.pages_crawled = 0
+        self.pages_unchanged = 0
+        self.pages_fetched = 0
+        self.urls_excluded = 0
+        self.urls_disallowed = 0
+        self.stop_reason = None
+        self.sitemap_queue = None
+        self.fetch_queue = None
+        self.extract_queue = None
+        self.link_queue = None
+        self.persist_queue = None
+        self.parse_pool = None
+        self.browser_pool = None
+        self.session = None
+        self.link_checker = None
+        self.frontier = frontier
+        self._discovered = []
+        self._finished = {True: [], False: []}
+        self._previous = {}  # Saved PageVersion of each claimed page, until it is fetched
+        self._throttled = {}  # Times each page was throttled by its server so far
+        self._retries = set()  # Tasks queueing throttled pages again
+        self._frontier_wakeup = None
+        self._pending = 0
+        self._idle = None
+
+    def _task_added(self):
+        self._pending += 1
+        self._idle.clear()
+
+    def _task_finished(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self._idle.set()
+        elif self._pending == 1 and self._frontier_wakeup is not None:
+            # Only the frontier puller is left; let it check whether the crawl is over.
+            self._frontier_wakeup.set()
+
+    async def _put(self, stage_queue, item):
+        # Count the item before it is queued so the crawl never looks idle while work is in flight.
+        self._task_added()
+        await stage_queue.put(item)
+
+    async def enqueue(self, entry):
+        """
+        Adds a page or sitemap to the crawl unless it has already been queued.
+
+        Waits while the fetch queue is full, which slows sitemap streaming down to the
+        speed the fetchers can keep up with. With a frontier, the entry is buffered and
+        written to the frontier with its score, and the frontier ignores URLs any worker has
+        already queued. Entries the include and exclude patterns rule out, and pages
+        robots.txt disallows, are dropped.
+
+        Args:
+            entry (SitemapEntry or str): The entry to crawl. Plain URLs are classified by their path.
+        """
+        if isinstance(entry, str):
+            entry = guess_sitemap_entry(entry)
+        if not self.scheduler.allows(entry):
+            self.urls_excluded += 1
+            return
+        if entry.kind == 'page' and self.robots is not None and not await self.robots.is_allowed(entry.loc):
+            self.urls_disallowed += 1
+            return
+        if self.frontier is not None:
+            self._discovered.append((entry.loc, entry.kind, entry.lastmod, self.scheduler.score(entry)))
+            if len(self._discovered) >= self.FRONTIER_BATCH:
+                await self._sync_frontier()
+            self._frontier_wakeup.set()
+            return
+        if self.stop_reason is not None:
+            return
+        if entry.loc in self.seen:
+            print(f"Skipping already processed sitemap or page: {entry.loc}")
+            return
+        self.seen.add(entry.loc)
+        if entry.kind == 'sitemap':
+            await self._put(self.sitemap_queue, entry)
+        else:
+            await self._put(self.fetch_queue, entry)
+
+    async def run(self, seeds):
+        """
+        Crawls the seeds and everything reachable through their sitemaps.
+
+        Args:
+            seeds (iterable): SitemapEntry objects or page/sitemap URLs to start from.
+
+        Returns:
+            int: The number of pages crawled and handed to `on_page`.
+        """
+        concurrency = self.options.concurrency
+        self.sitemap_queue = asyncio.Queue()
+        if self.frontier is not None:
+            # The frontier hands out URLs highest score first; keep just enough to feed the fetchers.
+            self.fetch_queue = asyncio.Queue(maxsize=concurrency * 2)
+        else:
+            self.fetch_queue = ScoredQueue(self.scheduler.score, maxsize=self.QUEUED_PAGES)
+        parse_workers = self.options.parse_workers
+        # Keep a page queued for every parse process while it works on another, so none sits idle.
+        extract_workers = parse_workers * 2 if parse_workers > 0 else concurrency
+        self.extract_queue = asyncio.Queue(maxsize=extract_workers)
+        self.link_queue = asyncio.Queue(maxsize=concurrency)
+        self.persist_queue = asyncio.Queue(maxsize=concurrency)
+        self._idle = asyncio.Event()
+        self._frontier_wakeup = asyncio.Event()
+
+        started = time.monotonic()
+        with self._parse_pool(parse_workers) as self.parse_pool:
+            async with BrowserPool(
+                browsers=self.options.browsers,
+                pages_per_browser=self.options.pages_per_browser,
+                recycle_after=self.options.recycle_after,
+                profile=self.options.render_profile,
+            ) as self.browser_pool, aiohttp.ClientSession(
+                headers=DEFAULT_HEADERS,
+                # Per-host limits are enforced by HostLimiter; sitemap streams need their own connections.
+                connector=aiohttp.TCPConnector(limit=concurrency + self.SITEMAP_WORKERS),
+            ) as self.session, LinkChecker(
+                concurrency=self.options.link_concurrency,
+                per_host=self.options.link_per_host,
+                link_cache=self.link_cache,
+            ) as self.link_checker:
+                self.robots = RobotsCache(self.session) if self.options.respect_robots else None
+                self._task_added()
+                workers = [asyncio.create_task(self._seed(seeds))]
+                workers += [self._start_stage(self.sitemap_queue, self._discover) for _ in range(self.SITEMAP_WORKERS)]
+                workers += [self._start_stage(self.fetch_queue, self._fetch) for _ in range(concurrency)]
+                workers += [self._start_stage(self.extract_queue, self._extract) for _ in range(extract_workers)]
+                workers += [self._start_stage(self.link_queue, self._check_links) for _ in range(concurrency)]
+                workers.append(self._start_stage(self.persist_queue, self._persist))
+                if self.frontier is not None:
+                    self._task_added()
+                    workers.append(asyncio.create_task(self._pull_frontier()))
+                    workers.append(asyncio.create_task(self._heartbeat()))
+                if self.options.time_budget:
+                    workers.append(asyncio.create_task(self._stop_after(self.options.time_budget)))
+
+                try:
+                    await self._idle.wait()
+                finally:
+                    for worker in workers + list(self._retries):
+                        worker.cancel()
+                    await asyncio.gather(*workers, *self._retries, return_exceptions=True)
+                    if self.frontier is not None:
+                        # Record what was finished and hand back anything leased but not
+                        # finished, e.g. when the crawl is interrupted.
+                        self._flush_frontier()
+                        self.frontier.release()
+
+        elapsed = time.monotonic() - started
+        rate = (self.pages_crawled + self.pages_unchanged) / elapsed if elapsed else 0.0
+        unchanged = f", {self.pages_unchanged} more unchanged since the last crawl" if self.pages_unchanged else ""
+        print(f"Crawled {self.pages_crawled} pages in {elapsed:.1f}s ({rate:.2f} pages/sec){unchanged}")
+        if self.urls_excluded:
+            print(f"Skipped {self.urls_excluded} URLs ruled out by the include and exclude patterns")
+        if self.urls_disallowed:
+            print(f"Skipped {self.urls_disallowed} URLs disallowed by robots.txt")
+        self.host_limiter.report()
+        self.browser_pool.report()
+        if self.stop_reason is not None:
+            print(f"Stopped early: {self.stop_reason}")
+        self.link_checker.report()
+        return self.pages_crawled
+
+    @staticmethod
+    def _parse_pool(workers):
+        if workers <= 0:
+            return nullcontext()
+        # Spawned rather than forked: the crawl process has an event loop, open sockets and threads.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        # Start the processes and their imports now, while the first sitemaps and pages are fetched.
+        for _ in range(workers):
+            pool.submit(extract_page_fields, '', '')
+        return pool
+
+    async def _seed(self, seeds):
+        try:
+            for entry in seeds:
+                if self.stop_reason is not None:
+                    break
+                await self.enqueue(entry)
+        except Exception as e:
+            print(f"Error reading crawl seeds: {e}")
+        finally:
+            self._task_finished()
+
+    def _start_stage(self, stage_queue, handler):
+        async def work():
+            while True:
+                item = await stage_queue.get()
+                try:
+                    await handler(item)
+                except Exception as e:
+                    url = getattr(item, 'url', None) or getattr(item, 'loc', item)
+                    print(f"Error processing {url}: {e}")
+                    self._finish(url, ok=False)
+                finally:
+                    stage_queue.task_done()
+                    self._task_finished()
+
+        return asyncio.create_task(work())
+
+    async def _discover(self, item):
+        """Stream a sitemap, or parse one that was already fetched, into the frontier."""
+        if self.stop_reason is not None:
+            return
+        if isinstance(item, FetchResult):
+            url = item.url
+            entries = iter_sitemap_bytes(item.body)
+        else:
+            url = item.loc
+            print(f"Processing sitemap: {url}")
+            entries = None
+
+        counts = {'page': 0, 'sitemap': 0}
+        if entries is not None:
+            for entry in entries:
+                if self.stop_reason is not None:
+                    break
+                counts[entry.kind] += 1
+                await self.enqueue(entry)
+        else:
+            async for entry in stream_sitemap_entries(url, self.session):
+                if self.stop_reason is not None:
+                    break
+                counts[entry.kind] += 1
+                await self.enqueue(entry)
+        if self.stop_reason is not None:
+            # Not marked done, so a resumed run reads the sitemap again.
+            return
+        print(f"Found {counts['page']} page URLs and {counts['sitemap']} nested sitemaps in {url}")
+        self._finish(url)
+
+    async def _fetch(self, entry):
+        url = entry.loc
+        previous = self._previous.pop(url, None)
+        if self.stop_reason is not None:
+            # Left unfinished: a frontier URL is released back to the queue when the crawl ends.
+            return
+        if previous is not None and entry.lastmod and entry.lastmod == previous.lastmod:
+            print(f"Unchanged since the last crawl according to its sitemap: {url}")
+            await self._unchanged(entry, previous)
+            return
+
+        crawl_delay = (await self.robots.rules(url)).crawl_delay if self.robots is not None else None
+        print(f"Processing sitemap or page: {url}")
+        async with self.host_limiter.slot(url, crawl_delay) as slot:
+            if self.stop_reason is not None:
+                # The crawl stopped while this fetch waited for its host.
+                slot.used = False
+                return
+            self.pages_fetched += 1
+            if self.options.max_pages and self.pages_fetched >= self.options.max_pages:
+                self._stop(f"fetched the limit of {self.options.max_pages} pages")
+            result = slot.result = await fetch_url(url, self.session, self.browser_pool, self.render_policy, previous)
+
+        if result is not None and result.status in THROTTLE_STATUSES:
+            attempts = self._throttled.get(url, 0) + 1
+            if attempts <= self.THROTTLED_RETRIES:
+                self._throttled[url] = attempts
+                print(f"Throttled by the server (HTTP {result.status}), retrying later: {url}")
+                self._retry(entry, previous)
+                return
+            self._throttled.pop(url, None)
+
+        if result is not None and result.unchanged:
+            await self._unchanged(entry, previous, result)
+            return
+
+        if not result or not result.ok or not result.content:
+            print(f"No content found for: {url}")
+            self._finish(url, ok=False)
+            return
+
+        if is_xml_content(result.text, url, result.content_type):
+            print(f"Detected XML content for URL: {url}")
+            await self._put(self.sitemap_queue, result)
+            return
+
+        result.lastmod = entry.lastmod
+        await self._put(self.extract_queue, result)
+
+    async def _unchanged(self, entry, previous, result=None):
+        self.pages_unchanged += 1
+        version = PageVersion(
+            etag=(result and result.header('ETag')) or previous.etag,
+            last_modified=(result and result.header('Last-Modified')) or previous.last_modified,
+            lastmod=entry.lastmod or previous.lastmod,
+            body_hash=previous.body_hash,
+            rendered=previous.rendered,
+            crawled_at=time.time(),
+        )
+        if result is not None and result.ok and result.body:
+            # The body hashed the same: this run has the page too, stored under the same blob.
+            result.lastmod = version.lastmod
+            await self._cache_response(result)
+        if self.on_unchanged is not None:
+            await asyncio.to_thread(self.on_unchanged, entry.loc, version)
+        if getattr(self.frontier, 'writer', None) is None:
+            self._finish(entry.loc)
+
+    async def _cache_response(self, result):
+        if self.response_cache is None:
+            return
+        try:
+            await asyncio.to_thread(self.response_cache.store, result)
+        except Exception as e:
+            # The page itself is still crawled; it just can't be reparsed from the cache.
+            print(f"Error caching the response of {result.url}: {e}")
+
+    async def _extract(self, result):
+        await self._cache_response(result)
+        base_url = get_base_url(result.final_url or result.url)
+        page_data = None
+        if self.parse_pool is not None:
+            try:
+                packed = await asyncio.get_running_loop().run_in_executor(
+                    self.parse_pool, extract_packed_page,
+                    None if result.rendered is not None else result.body, result.encoding, result.rendered,
+                    result.url, base_url, self.options.parser,
+                )
+                page_data = unpack_page_data(packed)
+            except BrokenProcessPool:
+                if self.parse_pool is not None:
+                    print("Extraction processes stopped unexpectedly, extracting in the crawl process instead")
+                    self.parse_pool = None
+        if page_data is None:
+            page_data = await asyncio.to_thread(
+                build_page_data, result.content, result.url, base_url, self.options.parser
+            )
+        page_data.version = PageVersion(
+            etag=result.header('ETag'),
+            last_modified=result.header('Last-Modified'),
+            lastmod=result.lastmod,
+            body_hash=hash_body(result.body),
+            rendered=result.rendered is not None,
+            crawled_at=time.time(),
+        )
+        await self._put(self.link_queue, page_data)
+
+    async def _check_links(self, page_data):
+        page_data.non_200_links = await self.link_checker.validate(page_data.links, self.checked_links)
+        await self._put(self.persist_queue, page_data)
+
+    async def _persist(self, page_data):
+        self.pages_crawled += 1
+        if self.on_page is not None:
+            await asyncio.to_thread(self.on_page, page_data)
+        if getattr(self.frontier, 'writer', None) is None:
+            self._finish(page_data.url)
+
+    def _retry(self, entry, previous):
+        """Queue a page again without waiting for room in the fetch queue, which the fetchers may be waiting on."""
+        if previous is not None:
+            self._previous[entry.loc] = previous
+        self._task_added()
+        task = asyncio.create_task(self.fetch_queue.put(entry))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    def _stop(self, reason):
+        """Stop fetching new pages. Pages already fetched go through the remaining stages."""
+        if self.stop_reason is None:
+            self.stop_reason = reason
+            print(f"Stopping the crawl: {reason}")
+            if self._frontier_wakeup is not None:
+                self._frontier_wakeup.set()
+
+    async def _stop_after(self, seconds):
+        await asyncio.sleep(seconds)
+        self._stop(f"the time budget of {seconds:g}s ran out")
+
+    def _finish(self, url, ok=True):
+        """Record that a frontier URL is done (or failed); written with the next frontier sync."""
+        if self.frontier is not None:
+            self._finished[ok].append(url)
+
+    async def _sync_frontier(self):
+        """Write discovered URLs, then finished URLs, to the frontier."""
+        discovered, self._discovered = self._discovered, []
+        finished, self._finished = self._finished, {True: [], False: []}
+        # Discovered URLs go first, so a sitemap is never marked done before its entries are queued.
+        if discovered:
+            await asyncio.to_thread(self.frontier.add, discovered)
+        for ok, urls in finished.items():
+            if urls:
+                await asyncio.to_thread(self.frontier.finish, urls, ok)
+
+    def _flush_frontier(self):
+        discovered, self._discovered = self._discovered, []
+        finished, self._finished = self._finished, {True: [], False: []}
+        self.frontier.add(discovered)
+        for ok, urls in finished.items():
+            self.frontier.finish(urls, ok)
+
+    async def _pull_frontier(self):
+        """
+        Lease URLs from the frontier into the local queues until the shared crawl is finished.
+
+        The puller counts as pending work, so the engine stays busy while other workers may
+        still add URLs. It stops once nothing is pending locally and no worker has a URL
+        queued or leased, or when the crawl stops early.
+        """
+        try:
+            while self.stop_reason is None:
+                self._frontier_wakeup.clear()
+                await self._sync_frontier()
+                # A batch the size of the fetch queue; queueing it waits while the queue is full, so
+                # this worker holds at most two batches of leases and claims the next one as soon as
+                # the fetchers have taken the previous one.
+                limit = self.fetch_queue.maxsize
+                claimed = await asyncio.to_thread(self.frontier.claim, limit)
+                if claimed and self.options.incremental:
+                    page_urls = [url for url, kind, _ in claimed if kind == 'page']
+                    self._previous.update(await asyncio.to_thread(self.frontier.page_versions, page_urls))
+                for url, kind, lastmod in claimed:
+                    entry = SitemapEntry(loc=url, kind=kind, lastmod=lastmod)
+                    await self._put(self.sitemap_queue if kind == 'sitemap' else self.fetch_queue, entry)
+                if len(claimed) == limit:
+                    continue
+
+                if not claimed and self._pending == 1 and not self._discovered \
+                        and not any(self._finished.values()):
+                    if await asyncio.to_thread(self.frontier.is_finished):
+                        return
+                    if self.frontier.writer is not None:
+                        # Nothing is in flight here; the last pages may only be waiting for the writer.
+                        await asyncio.to_thread(self.frontier.writer.flush)
+                # Poll again soon, or as soon as this worker discovers new URLs.
+                try:
+                    await asyncio.wait_for(self._frontier_wakeup.wait(), self.FRONTIER_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._task_finished()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.frontier.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.frontier.heartbeat)
+            except Exception as e:
+                print(f"Error renewing frontier leases or checkpointing the crawl run: {e}")
+
+
+def resolve_crawl_seeds(crawl_input):
+    """
+    Turns a crawl input into the entries the engine should start from.
+
+    Args:
+        crawl_input (str): A page URL, a sitemap URL, or a path to a local (optionally gzipped) sitemap file.
+
+    Returns:
+        iterable: SitemapEntry objects. Local sitemap files are streamed into their page and nested sitemap entries.
+    """
+    if urlparse(crawl_input).scheme in ['http', 'https']:
+        return [guess_sitemap_entry(crawl_input)]
+
+    if os.path.isfile(crawl_input):
+        return iter_sitemap_file(crawl_input)
+
+    print(f"Invalid URL or file path: {crawl_input}")
+    return []
+
+
+def crawl_urls(seed_urls, checked_links, options=None, link_cache=None, on_page=None, frontier=None,
+               on_unchanged=None, response_cache=None):
+    """
+    Runs a concurrent crawl over the seed URLs on one event loop.
+
+    Args:
+        seed_urls (iterable): SitemapEntry objects or page/sitemap URLs to start from.
+        checked_links (dict): A dictionary used to track and avoid rechecking the status of links.
+        options (CrawlOptions, optional): Concurrency and politeness settings for the crawl.
+        link_cache (LinkStatusCache, optional): The cross-run cache of link check results.
+        on_page (callable, optional): Called from a worker thread with each PageData as soon as
+            it is extracted, e.g. PageWriter.write. Pages are not kept after this call.
+        frontier (Frontier, optional): A started frontier shared with other crawl workers. The
+            seeds are added to it and the crawl runs until the frontier is exhausted.
+        on_unchanged (callable, optional): Called from a worker thread with the URL and updated
+            PageVersion of each page an incremental recrawl found unchanged, e.g. PageWriter.touch.
+        response_cache (ResponseCache, optional): Where to keep the body of every page fetched,
+            so it can be reparsed later.
+
+    Returns:
+        int: The number of pages crawled.
+    """
+    engine = CrawlEngine(checked_links, options, link_cache, on_page, frontier, on_unchanged, response_cache)
+    return asyncio.run(engine.run(seed_urls))
+
+
+def collect_and_process_sitemaps(sitemap_input, checked_links, options=None, link_cache=None):
+    """
+    Collects and processes URLs from a given sitemap or local file, then crawls the URLs to extract SEO data.
+
+    Nested sitemaps and page URLs are crawled concurrently by a CrawlEngine, skipping URLs that were already processed.
+    Every page is kept in memory, so prefer crawl_urls with an on_page callback for large sites.
+
+    Args:
+        sitemap_input (str): The URL or path to the sitemap file to process.
+        checked_links (dict): A dictionary used to track and avoid rechecking the status of links.
+        options (CrawlOptions, optional): Concurrency and politeness settings for the crawl.
+        link_cache (LinkStatusCache, optional): The cross-run cache of link check results.
+
+    Returns:
+        dict: A dictionary where the keys are page URLs and the values are the parsed data.
+    """
+    all_pages_data = {}
+
+    def collect(page_data):
+        all_pages_data[page_data.url] = page_data
+
+    crawl_urls(resolve_crawl_seeds(sitemap_input), checked_links, options, link_cache, collect)
+    return all_pages_data
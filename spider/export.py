@@ -0,0 +1,152 @@
+import csv
+import gzip
+import io
+import json
+import json.encoder
+import sys
+import time
+from .storage import iter_project_pages, check_export_fields, EXPORT_FIELDS, JSON_PAGE_COLUMNS
+
+EXPORT_FORMATS = ('jsonl', 'csv')
+_encode_string = json.encoder.encode_basestring  # The C string encoder json.dumps uses with ensure_ascii=False
+GZIP_LEVEL = 6  # zlib's default; level 9 is several times slower for a few percent smaller files
+
+
+def guess_export_format(path):
+    """Return the export format implied by a file name, e.g. 'pages.csv.gz' -> 'csv', defaulting to 'jsonl'."""
+    name = (path or '').lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return 'csv' if name.endswith('.csv') else 'jsonl'
+
+
+class ExportWriter:
+    """
+    Writes rows to a JSON Lines or CSV file one at a time, optionally gzip-compressed.
+
+    Each row is encoded and written as soon as it is handed over, so the size of an export
+    never affects memory use. In CSV files, list and dictionary values are written as JSON.
+    Values of `raw_fields` are already JSON text, as stored in the database, and are written
+    without being decoded and encoded again.
+
+    Usage:
+        with ExportWriter('pages.jsonl.gz', compress=True) as writer:
+            writer.write(row)
+    """
+
+    def __init__(self, path, format='jsonl', fields=None, compress=False, raw_fields=()):
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{format}', expected one of {', '.join(EXPORT_FORMATS)}")
+        if format == 'csv' and not fields:
+            raise ValueError("CSV exports need a list of fields")
+
+        self.path = path
+        self.format = format
+        self.fields = list(fields) if fields else None
+        self.raw_fields = frozenset(raw_fields)
+        self._json_keys = {}
+        self.rows_written = 0
+        to_stdout = path in (None, '-')
+        if compress:
+            binary = gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb', compresslevel=GZIP_LEVEL) if to_stdout \
+                else gzip.open(path, 'wb', compresslevel=GZIP_LEVEL)
+            self._file = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+        elif to_stdout:
+            self._file = sys.stdout
+        else:
+            self._file = open(path, 'w', encoding='utf-8', newline='')
+
+        if format == 'csv':
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, row: dict):
+        if self.format == 'jsonl':
+            self._file.write(self._json_line(row))
+        else:
+            self._csv.writerow([self._csv_value(row.get(field)) for field in self.fields])
+        self.rows_written += 1
+
+    def close(self):
+        if self._file is sys.stdout:
+            self._file.flush()
+        elif self._file is not None:
+            # Closing the wrapper also writes the gzip trailer; stdout itself stays open.
+            self._file.close()
+        self._file = None
+
+    def _json_line(self, row):
+        if self.fields:
+            row = {field: row.get(field) for field in self.fields}
+        if not self.raw_fields:
+            return json.dumps(row, ensure_ascii=False, default=str) + '\n'
+        members = []
+        for field, value in row.items():
+            key = self._json_keys.get(field)
+            if key is None:
+                key = self._json_keys[field] = json.dumps(field) + ': '
+            if field in self.raw_fields and value is not None:
+                members.append(key + value)
+            else:
+                members.append(key + self._json_value(value))
+        return '{' + ', '.join(members) + '}\n'
+
+    @staticmethod
+    def _json_value(value):
+        # Scalars are encoded directly; json.dumps costs more per call than the encoding itself.
+        if value is None:
+            return 'null'
+        if value is True or value is False:
+            return 'true' if value else 'false'
+        if isinstance(value, str):
+            return _encode_string(value)
+        if isinstance(value, int):
+            return int.__repr__(value)
+        return json.dumps(value, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, (list, dict)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+
+def export_pages(project_name, path, format='jsonl', fields=None, compress=False, chunk_size=1000):
+    """
+    Stream every page of a project from the database into a JSON Lines or CSV file.
+
+    Rows are read in chunks of `chunk_size` from a single cursor and written as they arrive, so
+    a project of any size is exported in constant memory. JSON columns are copied into the
+    output as stored rather than decoded and encoded again.
+
+    Args:
+        project_name (str): The project to export.
+        path (str): The file to write, or '-' for standard output.
+        format (str): One of EXPORT_FORMATS.
+        fields (list, optional): The EXPORT_FIELDS to include, in order. Defaults to all of them.
+        compress (bool): Gzip the output.
+        chunk_size (int): The number of rows fetched from SQLite at a time.
+
+    Returns:
+        dict: The number of rows written and the elapsed seconds.
+
+    Raises:
+        ValueError: If a field isn't one of EXPORT_FIELDS, before the file is opened.
+    """
+    fields = list(fields or EXPORT_FIELDS)
+    # Checked up front: the rows are only read once the writer has opened, and truncated, the file.
+    check_export_fields(fields)
+    started = time.monotonic()
+    rows = iter_project_pages(project_name, fields, chunk_size, decode_json=False)
+    with ExportWriter(path, format, fields, compress, raw_fields=JSON_PAGE_COLUMNS) as writer:
+        for row in rows:
+            writer.write(row)
+    return {'rows': writer.rows_written, 'seconds': time.monotonic() - started}
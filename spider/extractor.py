@@ -1,174 +1,193 @@
-import xml.etree.ElementTree as ET
-import json
 import asyncio
-import os
+import json
 from urllib.parse import urljoin, urlparse
-from xml.etree.ElementTree import ParseError
-from .schemas import PageData, Image
-from .utils import validate_link_statuses, read_xml_file
-from .crawler import fetch_sitemap_content, fetch_url_content, is_xml_content
+from .schemas import PageData, Image, Fingerprint
+from .link_checker import validate_link_statuses
+from .crawler import fetch_url, get_base_url
+from .parsers import iter_html_events, TEXT, END
+from .fingerprints import fingerprint_page, pack_signature, unpack_signature
 
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Text inside these elements is code or markup, not page copy.
+NON_TEXT_TAGS = ('script', 'style', 'template')
 
-def collect_and_process_sitemaps(sitemap_input, checked_links):
-    """
-    Collects and processes URLs from a given sitemap or local file, then crawls the URLs to extract SEO data.
 
-    If the input is a valid URL, it fetches the sitemap or page content, determines whether it is an XML sitemap
-    or an HTML page, and processes the links or data accordingly. It will skip already processed URLs and handle nested sitemaps.
+def extract_and_parse_page_data(page_url, checked_links, parser='html.parser', link_cache=None) -> PageData:
+    """
+    Crawls and parses an HTML page to extract SEO-relevant data such as meta descriptions, headings, links, and images.
 
     Args:
-        sitemap_input (str): The URL or path to the sitemap file to process.
+        page_url (str): The URL of the page to crawl and extract data from.
         checked_links (dict): A dictionary used to track and avoid rechecking the status of links.
+        parser (str): The HTML parser backend to extract with.
+        link_cache (LinkStatusCache, optional): The cross-run cache of link check results.
 
     Returns:
-        dict: A dictionary where the keys are page URLs and the values are the parsed data.
+        PageData: An object containing the extracted page data.
     """
-    processed_sitemaps = set()
-    all_pages_data = {}
-
-    def process_sitemap(sitemap_url):
-        """
-        Processes an individual sitemap URL or page URL by fetching its content and parsing it.
-
-        Args:
-            sitemap_url (str): The URL to process.
-        """
-        print(f"Processing sitemap or page: {sitemap_url}")
-        if sitemap_url in processed_sitemaps:
-            print(f"Skipping already processed sitemap or page: {sitemap_url}")
-            return
-        processed_sitemaps.add(sitemap_url)
-
-        content = asyncio.run(fetch_url_content(sitemap_url))
-        if not content:
-            print(f"No content found for: {sitemap_url}")
-            return
-
-        if is_xml_content(content, sitemap_url):
-            print(f"Detected XML content for URL: {sitemap_url}")
-            sitemap_urls, page_urls = extract_urls_from_xml_sitemap(content)
-
-            print(f"Found {len(page_urls)} page URLs and {len(sitemap_urls)} nested sitemaps in {sitemap_url}")
-
-            for page_url in page_urls:
-                print(f"Processing page URL: {page_url}")
-                page_data = extract_and_parse_page_data(page_url, checked_links)
-                if page_data:
-                    all_pages_data[page_url] = page_data
-
-            for nested_sitemap_url in sitemap_urls:
-                print(f"Processing nested sitemap: {nested_sitemap_url}")
-                process_sitemap(nested_sitemap_url)
+    try:
+        result = asyncio.run(fetch_url(page_url))
+    except Exception as e:
+        print(f"Error crawling URL {page_url}: {e}")
+        return None
 
-        else:
-            print(f"Detected HTML content for URL: {sitemap_url}")
-            page_data = extract_and_parse_page_data(sitemap_url, checked_links)
-            if page_data:
-                all_pages_data[sitemap_url] = page_data
-
-    if urlparse(sitemap_input).scheme in ['http', 'https']:
-        process_sitemap(sitemap_input)
-    elif os.path.isfile(sitemap_input):
-        xml_content = read_xml_file(sitemap_input)
-        if xml_content:
-            sitemap_urls, page_urls = extract_urls_from_xml_sitemap(xml_content)
-            for page_url in page_urls:
-                page_data = extract_and_parse_page_data(page_url, checked_links)
-                if page_data:
-                    all_pages_data[page_url] = page_data
-            for loc in sitemap_urls:
-                process_sitemap(loc)
-    else:
-        print("Invalid URL or file path")
+    if not result or not result.ok or not result.content:
+        print(f"Failed to fetch or empty content for: {page_url}")
+        return None
 
-    return all_pages_data
+    base_url = get_base_url(result.final_url or page_url)
+    print(f"Successfully crawled URL: {base_url}")
+    page_data = build_page_data(result.content, page_url, base_url, parser)
+    page_data.non_200_links = validate_link_statuses(page_data.links, checked_links, link_cache)
+    return page_data
 
 
-def extract_urls_from_xml_sitemap(xml_content):
+def extract_page_fields(html, base_url, parser='html.parser'):
     """
-    Extracts page and sitemap URLs from an XML sitemap.
+    Extracts every HTML-derived PageData field in a single walk over the document.
 
-    Parses the given XML sitemap content and extracts URLs from both <sitemap> and <url> tags.
+    Headings, paragraphs and the title collect their text while the walk is inside them,
+    so no element is visited twice regardless of how many fields it contributes to.
 
     Args:
-        xml_content (str): The XML content of the sitemap.
+        html (str): The HTML of the page.
+        base_url (str): The URL used to resolve relative links on the page.
+        parser (str): The HTML parser backend to walk the document with.
 
     Returns:
-        tuple: Two lists, one for sitemap URLs and one for page URLs.
+        dict: The title, meta description, robots, canonical, headings, hreflang, structured data,
+        links, images, paragraphs, scripts and stylesheets of the page.
     """
-    try:
-        root = ET.fromstring(xml_content)
-    except ParseError as e:
-        print(f"Failed to parse XML: {e}")
-        return [], []
-
-    namespace = {'ns': root.tag.split('}')[0].strip('{')}
-
-    sitemap_urls = []
-    page_urls = []
-
-    sitemap_elements = root.findall('.//ns:sitemap/ns:loc', namespace)
-    for elem in sitemap_elements:
-        if elem.text:
-            sitemap_urls.append(elem.text.strip())
-
-    url_elements = root.findall('.//ns:url/ns:loc', namespace)
-    for elem in url_elements:
-        if elem.text:
-            page_urls.append(elem.text.strip())
+    fields = {
+        'title': None,
+        'meta_description': None,
+        'robots': None,
+        'canonical': None,
+        'headings': {tag: [] for tag in HEADING_TAGS},
+        'hreflang': {},
+        'structured_data': [],
+        'links': [],
+        'images': [],
+        'paragraphs': [],
+        'scripts': [],
+        'stylesheets': [],
+    }
 
-    return sitemap_urls, page_urls
+    # One entry per open element: (tag, text collector or None).
+    open_elements = []
+    collectors = []
+    non_text_depth = 0
+
+    for event, tag, value in iter_html_events(html, parser):
+        if event == TEXT:
+            if non_text_depth:
+                for collector in collectors:
+                    if collector[0] == 'ld+json':
+                        collector[1].append(value)
+            else:
+                for collector in collectors:
+                    collector[1].append(value)
+            continue
+
+        if event == END:
+            _, collector = open_elements.pop()
+            if tag in NON_TEXT_TAGS:
+                non_text_depth -= 1
+            if collector is not None:
+                collectors = [open_collector for open_collector in collectors if open_collector is not collector]
+                _finish_collector(collector, fields)
+            continue
+
+        attrs = value
+        collector = None
+
+        if tag in HEADING_TAGS or tag == 'p':
+            collector = (tag, [])
+        elif tag == 'title':
+            if fields['title'] is None:
+                collector = ('title', [])
+        elif tag == 'a':
+            if 'href' in attrs:
+                fields['links'].append(urljoin(base_url, attrs['href']))
+        elif tag == 'img':
+            if attrs.get('src'):
+                fields['images'].append(
+                    Image(src=urljoin(base_url, attrs['src']), alt=attrs.get('alt', "").strip())
+                )
+        elif tag == 'meta':
+            name = attrs.get('name')
+            if name == 'description' and fields['meta_description'] is None:
+                fields['meta_description'] = attrs.get('content', "").strip()
+            elif name == 'robots' and fields['robots'] is None:
+                fields['robots'] = attrs.get('content', "").strip()
+        elif tag == 'link':
+            rel = attrs.get('rel', '').split()
+            href = attrs.get('href')
+            if 'canonical' in rel and fields['canonical'] is None:
+                fields['canonical'] = (href or "").strip()
+            if 'alternate' in rel and 'hreflang' in attrs and href is not None:
+                fields['hreflang'][attrs['hreflang']] = href
+            if 'stylesheet' in rel and href is not None:
+                fields['stylesheets'].append(urljoin(base_url, href))
+        elif tag == 'script':
+            if 'src' in attrs:
+                fields['scripts'].append(urljoin(base_url, attrs['src']))
+            if attrs.get('type') == 'application/ld+json':
+                collector = ('ld+json', [])
+
+        if tag in NON_TEXT_TAGS:
+            non_text_depth += 1
+        if collector is not None:
+            collectors.append(collector)
+        open_elements.append((tag, collector))
+
+    for field in ('title', 'meta_description', 'robots', 'canonical'):
+        if fields[field] is None:
+            fields[field] = ""
+
+    return fields
+
+
+def _finish_collector(collector, fields):
+    kind, strings = collector
+    if kind == 'title':
+        fields['title'] = ''.join(strings).strip()
+    elif kind == 'p':
+        fields['paragraphs'].append(''.join(text.strip() for text in strings))
+    elif kind == 'ld+json':
+        script_text = ''.join(strings).strip()
+        if script_text:
+            try:
+                fields['structured_data'].append(json.loads(script_text))
+            except ValueError as e:
+                print(f"Skipping invalid structured data: {e}")
+    else:
+        fields['headings'][kind].append(''.join(text.strip() for text in strings))
 
 
-def extract_and_parse_page_data(page_url, checked_links) -> PageData:
+def build_page_data(html, page_url, base_url, parser='html.parser') -> PageData:
     """
-    Crawls and parses an HTML page to extract SEO-relevant data such as meta descriptions, headings, links, and images.
+    Extracts SEO-relevant data from the HTML of a page.
+
+    This step does no network I/O: non_200_links is left empty for the caller to fill in
+    after checking the page's links.
 
     Args:
-        page_url (str): The URL of the page to crawl and extract data from.
-        checked_links (dict): A dictionary used to track and avoid rechecking the status of links.
+        html (str): The HTML of the page.
+        page_url (str): The URL of the page the HTML was fetched from.
+        base_url (str): The URL used to resolve relative links on the page.
+        parser (str): The HTML parser backend to extract with.
 
     Returns:
         PageData: An object containing the extracted page data.
     """
-    raw_page_data, base_url = fetch_sitemap_content(page_url)
-    if not raw_page_data:
-        return None
-
-    title = raw_page_data.title.string.strip() if raw_page_data.title else ""
-
-    meta_description_tag = raw_page_data.find('meta', attrs={'name': 'description'})
-    meta_description = meta_description_tag.get('content', "").strip() if meta_description_tag else ""
-
-    noindex = False
-    robots_tag = raw_page_data.find('meta', attrs={'name': 'robots'})
-    if robots_tag and 'noindex' in robots_tag.get('content', '').lower():
-        noindex = True
-
-    headings = {
-        'h1': [h1.get_text(strip=True) for h1 in raw_page_data.find_all('h1')],
-        'h2': [h2.get_text(strip=True) for h2 in raw_page_data.find_all('h2')],
-        'h3': [h3.get_text(strip=True) for h3 in raw_page_data.find_all('h3')],
-        'h4': [h4.get_text(strip=True) for h4 in raw_page_data.find_all('h4')],
-        'h5': [h5.get_text(strip=True) for h5 in raw_page_data.find_all('h5')],
-        'h6': [h6.get_text(strip=True) for h6 in raw_page_data.find_all('h6')],
-    }
-
-    hreflangs = [link.get('href') for link in raw_page_data.find_all('link', rel='alternate', hreflang=True)]
-
-    structured_data = [
-        json.loads(script.string.strip()) for script in raw_page_data.find_all('script', type='application/ld+json') if
-        script.string
-    ]
-
-    robots = robots_tag.get('content', "").strip() if robots_tag else ""
+    fields = extract_page_fields(html, base_url, parser)
 
-    canonical_tag = raw_page_data.find('link', rel='canonical')
-    canonical = canonical_tag.get('href', "").strip() if canonical_tag else ""
+    robots = fields['robots']
+    noindex = 'noindex' in robots.lower()
 
-    links = [urljoin(base_url, a.get('href', '')) for a in raw_page_data.find_all('a', href=True)]
-
-    non_200_links = validate_link_statuses(links, checked_links)
+    links = fields['links']
 
     parsed_base_url = urlparse(base_url)
     internal_links = []
@@ -180,19 +199,10 @@ def extract_and_parse_page_data(page_url, checked_links) -> PageData:
         else:
             external_links.append(href)
 
-    images = [
-        Image(src=urljoin(base_url, img.get('src', '')), alt=img.get('alt', "").strip()) for img in
-        raw_page_data.find_all('img') if img.get('src')
-    ]
-
+    images = fields['images']
     missing_alt_images = [img.src for img in images if not img.alt]
 
-    paragraphs = [p.get_text(strip=True) for p in raw_page_data.find_all('p')]
-
-    scripts = [urljoin(base_url, script.get('src', '')) for script in raw_page_data.find_all('script', src=True)]
-    stylesheets = [urljoin(base_url, link.get('href', '')) for link in raw_page_data.find_all('link', rel='stylesheet', href=True)]
-
-    parsed_url = urlparse(base_url)
+    parsed_url = urlparse(page_url)
     slug = '/' + parsed_url.path.lstrip('/')
 
     url_parts = {
@@ -201,25 +211,89 @@ def extract_and_parse_page_data(page_url, checked_links) -> PageData:
         'fragment': parsed_url.fragment,
     }
 
-    return PageData(
+    page_data = PageData(
         url=page_url,
-        title=title,
-        meta_description=meta_description,
-        headings=headings,
+        title=fields['title'],
+        meta_description=fields['meta_description'],
+        headings=fields['headings'],
         links=links,
         images=images,
-        paragraphs=paragraphs,
-        scripts=scripts,
-        stylesheets=stylesheets,
+        paragraphs=fields['paragraphs'],
+        scripts=fields['scripts'],
+        stylesheets=fields['stylesheets'],
         slug=slug,
         url_parts=url_parts,
-        canonical=canonical,
+        canonical=fields['canonical'],
         robots=robots,
-        structured_data=structured_data,
-        hreflangs=hreflangs,
+        structured_data=fields['structured_data'],
+        hreflang=fields['hreflang'],
         internal_links=internal_links,
         external_links=external_links,
         noindex=noindex,
-        non_200_links=non_200_links,
         missing_alt_images=missing_alt_images
     )
+    page_data.fingerprint = fingerprint_page(page_data)
+    return page_data
+
+
+def _model_fields(model):
+    # model_fields on pydantic 2, __fields__ on pydantic 1.
+    return getattr(model, 'model_fields', None) or model.__fields__
+
+
+# PageData fields sent from extraction processes as plain values; images and the fingerprint are packed separately.
+_PACKED_FIELDS = tuple(field for field in _model_fields(PageData) if field not in ('images', 'fingerprint', 'version'))
+_PACKED_FINGERPRINT_FIELDS = tuple(field for field in _model_fields(Fingerprint) if field != 'minhash')
+
+
+def pack_page_data(page_data: PageData) -> tuple:
+    """
+    Pack a PageData object into plain tuples, lists and strings for sending between processes.
+
+    This pickles smaller and faster than the model itself; unpack_page_data reverses it.
+    """
+    fingerprint = page_data.fingerprint
+    return (
+        tuple(getattr(page_data, field) for field in _PACKED_FIELDS),
+        [(image.src, image.alt) for image in page_data.images],
+        None if fingerprint is None else (
+            tuple(getattr(fingerprint, field) for field in _PACKED_FINGERPRINT_FIELDS),
+            pack_signature(fingerprint.minhash),
+        ),
+    )
+
+
+def unpack_page_data(packed: tuple) -> PageData:
+    """Rebuild a PageData object packed by pack_page_data."""
+    values, images, fingerprint = packed
+    fields = dict(zip(_PACKED_FIELDS, values))
+    fields['images'] = [{'src': src, 'alt': alt} for src, alt in images]
+    if fingerprint is not None:
+        fingerprint_values, minhash = fingerprint
+        fields['fingerprint'] = {
+            **dict(zip(_PACKED_FINGERPRINT_FIELDS, fingerprint_values)),
+            'minhash': list(unpack_signature(minhash)),
+        }
+    return PageData(**fields)
+
+
+def extract_packed_page(body, encoding, rendered, page_url, base_url, parser='html.parser') -> tuple:
+    """
+    Decode and extract a fetched page, returning it packed by pack_page_data.
+
+    This is the entry point of the extraction process pool: it takes the raw response body
+    (or the rendered HTML) rather than a decoded string, so decoding happens in the worker too.
+
+    Args:
+        body (bytes): The raw response body.
+        encoding (str): The character encoding of the body.
+        rendered (str, optional): Browser-rendered HTML, used instead of the body when present.
+        page_url (str): The URL of the page the HTML was fetched from.
+        base_url (str): The URL used to resolve relative links on the page.
+        parser (str): The HTML parser backend to extract with.
+
+    Returns:
+        tuple: The packed PageData.
+    """
+    html = rendered if rendered is not None else body.decode(encoding or 'utf-8', errors='replace')
+    return pack_page_data(build_page_data(html, page_url, base_url, parser))
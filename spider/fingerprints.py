@@ -0,0 +1,179 @@
+import hashlib
+import re
+import zlib
+from array import array
+from collections import defaultdict
+from .schemas import Fingerprint, PageData
+
+WORD_PATTERN = re.compile(r'\w+')
+
+SHINGLE_SIZE = 5  # Words per shingle
+MINHASH_SIZE = 64  # Values in a MinHash signature
+LSH_BANDS = 16  # Signature bands hashed into LSH buckets; MINHASH_SIZE must be a multiple of it
+DEFAULT_DUPLICATE_THRESHOLD = 0.8  # Minimum estimated Jaccard similarity of near-duplicate pages
+
+_BUCKET_BITS = 6  # log2(MINHASH_SIZE)
+_VALUE_BITS = 32 - _BUCKET_BITS
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+
+
+def normalize_words(text):
+    """Lowercase text and split it into words, dropping punctuation and whitespace."""
+    return WORD_PATTERN.findall(text.lower())
+
+
+def text_hash(text):
+    """
+    Hash text after normalizing case, punctuation and whitespace.
+
+    Returns:
+        str: A 16 character hex digest, or None if the text has no words.
+    """
+    words = normalize_words(text or '')
+    if not words:
+        return None
+    return hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def shingle_hashes(words):
+    """Return the distinct 32-bit hashes of the SHINGLE_SIZE-word shingles of a text."""
+    if len(words) < SHINGLE_SIZE:
+        shingles = [' '.join(words)] if words else []
+    else:
+        shingles = (' '.join(words[index:index + SHINGLE_SIZE]) for index in range(len(words) - SHINGLE_SIZE + 1))
+    # crc32 is fast but mixes poorly; a multiplicative step spreads its bits before bucketing.
+    return {(zlib.crc32(shingle.encode('utf-8')) * 0x9E3779B1) & 0xFFFFFFFF for shingle in shingles}
+
+
+def minhash_signature(hashes):
+    """
+    Compute a MinHash signature of a set of shingle hashes with one-permutation hashing.
+
+    Each hash is assigned to one of MINHASH_SIZE buckets by its top bits and each bucket keeps
+    its smallest remaining value, so a signature costs a single pass over the shingles instead
+    of one pass per permutation. Empty buckets borrow the value of the next non-empty bucket,
+    offset by their distance, so short texts still produce comparable signatures.
+
+    Args:
+        hashes (set): 32-bit shingle hashes, as returned by shingle_hashes.
+
+    Returns:
+        list: MINHASH_SIZE integers, or an empty list if there are no hashes.
+    """
+    if not hashes:
+        return []
+
+    empty = _VALUE_MASK + 1
+    signature = [empty] * MINHASH_SIZE
+    for value in hashes:
+        bucket = value >> _VALUE_BITS
+        value &= _VALUE_MASK
+        if value < signature[bucket]:
+            signature[bucket] = value
+
+    for bucket in range(MINHASH_SIZE):
+        if signature[bucket] == empty:
+            distance = 1
+            while signature[(bucket + distance) % MINHASH_SIZE] > _VALUE_MASK:
+                distance += 1
+            signature[bucket] = signature[(bucket + distance) % MINHASH_SIZE] + (distance << _VALUE_BITS)
+    return signature
+
+
+def fingerprint_page(page_data: PageData) -> Fingerprint:
+    """
+    Compute the duplicate-detection fingerprints of a page.
+
+    The body text is the page's paragraphs. Titles, meta descriptions and H1s get exact hashes;
+    the body text gets an exact hash and a MinHash signature of its word shingles.
+
+    Args:
+        page_data (PageData): The extracted page.
+
+    Returns:
+        Fingerprint: The page's fingerprints.
+    """
+    words = normalize_words(' '.join(page_data.paragraphs))
+    h1s = page_data.headings.get('h1') or ['']
+    return Fingerprint(
+        word_count=len(words),
+        content_hash=hashlib.blake2b(' '.join(words).encode('utf-8'), digest_size=8).hexdigest() if words else None,
+        title_hash=text_hash(page_data.title),
+        meta_description_hash=text_hash(page_data.meta_description),
+        h1_hash=text_hash(h1s[0]),
+        minhash=minhash_signature(shingle_hashes(words)),
+    )
+
+
+def pack_signature(signature):
+    """Pack a MinHash signature into bytes for storage."""
+    return array('I', signature).tobytes()
+
+
+def unpack_signature(blob):
+    """Unpack a MinHash signature packed by pack_signature."""
+    signature = array('I')
+    signature.frombytes(blob)
+    return signature
+
+
+def signature_similarity(first, second):
+    """Estimate the Jaccard similarity of two texts from their MinHash signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / MINHASH_SIZE
+
+
+def find_near_duplicates(signatures, threshold=DEFAULT_DUPLICATE_THRESHOLD):
+    """
+    Group pages with near-identical body text using locality-sensitive hashing.
+
+    Each signature is split into LSH_BANDS bands and pages sharing a band land in the same
+    bucket. Only pages in a common bucket are compared, each against the first page of the
+    bucket, so the work grows linearly with the number of pages rather than with every pair.
+
+    Args:
+        signatures (iterable): (page id, signature) pairs.
+        threshold (float): The minimum estimated Jaccard similarity of pages in a cluster.
+
+    Returns:
+        list: Clusters of two or more page ids, each a list of (page id, similarity to the
+        cluster's first page) pairs, largest clusters first.
+    """
+    rows = MINHASH_SIZE // LSH_BANDS
+    signature_by_page = {
+        page_id: signature for page_id, signature in signatures if len(signature) == MINHASH_SIZE
+    }
+    parents = {}
+
+    def find(page_id):
+        root = page_id
+        while parents.get(root, root) != root:
+            root = parents[root]
+        while page_id != root:
+            parents[page_id], page_id = root, parents.get(page_id, page_id)
+        return root
+
+    # One band at a time, so only one bucket table is held in memory.
+    for band in range(LSH_BANDS):
+        first_in_bucket = {}
+        for page_id, signature in signature_by_page.items():
+            key = tuple(signature[band * rows:(band + 1) * rows])
+            first = first_in_bucket.setdefault(key, page_id)
+            if first == page_id or find(page_id) == find(first):
+                continue
+            if signature_similarity(signature_by_page[first], signature) >= threshold:
+                parents[find(page_id)] = find(first)
+
+    clusters = defaultdict(list)
+    for page_id in parents:
+        clusters[find(page_id)].append(page_id)
+
+    result = []
+    for root, members in clusters.items():
+        members = sorted(set(members) | {root})
+        anchor = signature_by_page[members[0]]
+        result.append([
+            (page_id, signature_similarity(anchor, signature_by_page[page_id]))
+            for page_id in members
+        ])
+    result.sort(key=lambda cluster: (-len(cluster), cluster[0][0]))
+    return result
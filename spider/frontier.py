@@ -0,0 +1,138 @@
+import os
+import socket
+from .storage import start_frontier, add_to_frontier, claim_frontier, renew_frontier_leases, finish_frontier_urls, \
+    release_frontier_leases, fetch_frontier_counts, resume_crawl_run, checkpoint_crawl_run, fetch_checked_links, \
+    fetch_page_versions
+
+DEFAULT_LEASE_SECONDS = 120.0
+
+
+def default_worker_id():
+    """Return an id for this crawl process that is unique across machines: host name and process id."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Frontier:
+    """
+    A project's crawl frontier, shared through the database by every worker crawling the project.
+
+    Each URL is queued once per crawl no matter how many workers discover it. Workers lease
+    batches of URLs, renew their leases while they work on them (the heartbeat) and mark each
+    URL done or failed when they finish it. A worker's leases expire if it stops
+    heartbeating, after which other workers reclaim its URLs.
+
+    Each crawl of a project is a run with an id. The frontier is the run's checkpoint: every
+    finished URL is recorded as soon as it is saved, and the heartbeat also stamps the run with
+    its progress. A run that was interrupted can be resumed by id, and continues with the
+    URLs that are still queued.
+
+    Each URL is queued with a score (see scheduler.CrawlScheduler) and workers claim the
+    highest scored URLs first, so a crawl stopped early has already done the pages that
+    matter most.
+
+    Every method does blocking database I/O; the crawl engine calls them off the event loop.
+
+    Usage:
+        frontier = Frontier(project_name)
+        frontier.start(crawl_input)
+        frontier.add([(url, 'sitemap', None, 10.0)])
+        for url, kind, lastmod in frontier.claim(50):
+            ...
+            frontier.finish([url])
+    """
+
+    def __init__(self, project_name: str, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=3):
+        self.project_name = project_name
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.project_id = None
+        self.run_id = None
+        self.run_started_at = None
+        self.writer = None  # The PageWriter that saves the crawl's pages and marks them done, if any
+
+    @property
+    def heartbeat_interval(self):
+        # Renew well before expiry so one slow database write never loses a lease.
+        return self.lease_seconds / 4
+
+    def start(self, crawl_input=None, join=False):
+        """
+        Start a new crawl run of the project, or with `join`, join the run in progress if there is one.
+
+        Returns:
+            dict: The run id, whether a run in progress was joined and the id of the unfinished
+            run a new run replaced, if any.
+
+        Raises:
+            ValueError: If a new run was asked for while another process is crawling the project.
+        """
+        started = start_frontier(self.project_name, crawl_input, join)
+        self.project_id, self.run_id = started['project_id'], started['run_id']
+        return started
+
+    def resume(self, run_id):
+        """
+        Resume an interrupted crawl run, queueing again the URLs it had leased but not finished.
+
+        Returns:
+            dict: The run, see storage.fetch_crawl_run.
+
+        Raises:
+            ValueError: If the run can't be resumed.
+        """
+        run = resume_crawl_run(run_id)
+        self.project_name, self.project_id, self.run_id = run['project_name'], run['project_id'], run['id']
+        self.run_started_at = run['started_at']
+        return run
+
+    def checked_links(self):
+        """Return the outcome of every link checked since the run started, to seed checked_links on resume."""
+        return fetch_checked_links(self.run_started_at) if self.run_started_at is not None else {}
+
+    def add(self, entries):
+        """Queue (url, kind, lastmod, score) entries that aren't in the frontier yet. Returns how many were new."""
+        entries = list(entries)
+        return add_to_frontier(self.project_id, entries) if entries else 0
+
+    def claim(self, limit):
+        """Lease up to `limit` URLs to this worker, highest score first. Returns (url, kind, lastmod) tuples."""
+        return claim_frontier(self.project_id, self.worker_id, limit, self.lease_seconds, self.max_attempts)
+
+    def page_versions(self, urls):
+        """Return the PageVersion of each URL the project already has a saved page for."""
+        return fetch_page_versions(self.project_id, list(urls)) if urls else {}
+
+    def heartbeat(self):
+        """Renew this worker's leases and checkpoint the run. Returns the number of leases held."""
+        leases = renew_frontier_leases(self.project_id, self.worker_id, self.lease_seconds)
+        self.checkpoint('running')
+        return leases
+
+    def checkpoint(self, status=None):
+        """Stamp the run with the time and its progress, and optionally a new status."""
+        if self.run_id is not None:
+            checkpoint_crawl_run(self.run_id, status)
+
+    def end_run(self, interrupted=False):
+        """Record that this worker stopped: the run is interrupted, or finished if its frontier is exhausted."""
+        self.checkpoint('interrupted' if interrupted or not self.is_finished() else 'finished')
+
+    def finish(self, urls, ok=True):
+        """Mark leased URLs as done, or failed if `ok` is False."""
+        urls = list(urls)
+        if urls:
+            finish_frontier_urls(self.project_id, self.worker_id, urls, ok)
+
+    def release(self):
+        """Hand every URL this worker still holds back to the queue. Returns how many were released."""
+        return release_frontier_leases(self.project_id, self.worker_id)
+
+    def counts(self):
+        """Return the number of queued, leased, done and failed URLs."""
+        return fetch_frontier_counts(self.project_id)
+
+    def is_finished(self):
+        """Return True once no URL of the crawl is queued or leased by any worker."""
+        counts = self.counts()
+        return counts['queued'] == 0 and counts['leased'] == 0
@@ -0,0 +1,218 @@
+import time
+from urllib.parse import urlparse
+import numpy as np
+from .storage import fetch_link_graph, save_page_graph
+
+DEFAULT_DAMPING = 0.85
+
+
+class LinkGraph:
+    """
+    The internal link graph of a project in compressed sparse row (CSR) form.
+
+    Nodes are the project's pages, numbered 0..n-1 in page id order. The links of node i
+    are `targets[offsets[i]:offsets[i + 1]]`. Repeated links between the same two pages and
+    links from a page to itself are dropped, so every edge is a distinct linking page.
+    """
+
+    def __init__(self, page_ids, offsets, targets):
+        self.page_ids = page_ids
+        self.offsets = offsets
+        self.targets = targets
+
+    @property
+    def size(self):
+        return len(self.page_ids)
+
+    @classmethod
+    def from_links(cls, page_ids, page_url_ids, link_sources, link_url_ids):
+        """
+        Build the graph from page ids and links to interned URL ids.
+
+        Args:
+            page_ids (array): The id of each page.
+            page_url_ids (array): The URL id of each page, or -1 if no page links to it.
+            link_sources (array): The id of the linking page of each link.
+            link_url_ids (array): The URL id each link points to.
+
+        Returns:
+            LinkGraph: The graph, keeping only links between pages of the project.
+        """
+        page_ids = np.asarray(page_ids, dtype=np.int64)
+        page_url_ids = np.asarray(page_url_ids, dtype=np.int64)
+        link_sources = np.asarray(link_sources, dtype=np.int64)
+        link_url_ids = np.asarray(link_url_ids, dtype=np.int64)
+        size = len(page_ids)
+
+        # Lookup tables from database ids to node numbers, -1 where there is no page.
+        node_by_page_id = np.full(int(page_ids.max(initial=-1)) + 1, -1, dtype=np.int64)
+        node_by_page_id[page_ids] = np.arange(size)
+        node_by_url_id = np.full(int(max(page_url_ids.max(initial=-1), link_url_ids.max(initial=-1))) + 1, -1,
+                                 dtype=np.int64)
+        linked = page_url_ids >= 0
+        node_by_url_id[page_url_ids[linked]] = np.flatnonzero(linked)
+
+        sources = node_by_page_id[link_sources]
+        targets = node_by_url_id[link_url_ids]
+        keep = (sources >= 0) & (targets >= 0) & (sources != targets)
+        edges = np.unique(sources[keep] * size + targets[keep])
+        sources, targets = np.divmod(edges, size) if size else (edges, edges)
+
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=size), out=offsets[1:])
+        return cls(page_ids, offsets, targets.astype(np.int64))
+
+    def sources(self):
+        """Return the linking node of every edge, aligned with `targets`."""
+        return np.repeat(np.arange(self.size), np.diff(self.offsets))
+
+    def outlinks(self):
+        return np.diff(self.offsets)
+
+    def inlinks(self):
+        return np.bincount(self.targets, minlength=self.size)
+
+    def pagerank(self, damping=DEFAULT_DAMPING, tolerance=1e-9, max_iterations=100):
+        """
+        Compute PageRank by power iteration.
+
+        Rank held by pages without outlinks is spread evenly over every page. The ranks sum to 1.
+
+        Returns:
+            ndarray: The rank of each node.
+        """
+        if not self.size:
+            return np.zeros(0)
+
+        sources = self.sources()
+        outlinks = self.outlinks()
+        dangling = outlinks == 0
+        share = np.zeros(self.size)
+        ranks = np.full(self.size, 1.0 / self.size)
+        for _ in range(max_iterations):
+            np.divide(ranks, outlinks, out=share, where=~dangling)
+            spread = (1.0 - damping + damping * ranks[dangling].sum()) / self.size
+            updated = spread + damping * np.bincount(self.targets, weights=share[sources], minlength=self.size)
+            converged = np.abs(updated - ranks).sum() < tolerance
+            ranks = updated
+            if converged:
+                break
+        return ranks
+
+    def click_depth(self, start):
+        """
+        Compute the number of clicks needed to reach each node from a start node.
+
+        Returns:
+            ndarray: The depth of each node, or -1 for nodes that can't be reached.
+        """
+        depths = np.full(self.size, -1, dtype=np.int64)
+        if not 0 <= start < self.size:
+            return depths
+
+        depths[start] = 0
+        frontier = np.array([start])
+        depth = 0
+        while frontier.size:
+            depth += 1
+            # Gather the links of every frontier node at once.
+            starts = self.offsets[frontier]
+            counts = self.offsets[frontier + 1] - starts
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbours = np.unique(self.targets[positions])
+            frontier = neighbours[depths[neighbours] < 0]
+            depths[frontier] = depth
+        return depths
+
+
+def normalize_graph_url(url):
+    """
+    Return the form a URL is matched by in the link graph.
+
+    The fragment and any trailing slash of the path are dropped, so links to '/page#section'
+    and '/page/' count as links to the page '/page'. This uses string operations rather
+    than urlsplit, which is several times slower on the many URLs of a large project.
+    """
+    path, question, query = url.partition('#')[0].partition('?')
+    return path.rstrip('/') + question + query
+
+
+def find_homepage(urls, start_url=None):
+    """
+    Return the index of the crawl's start page: start_url if given, otherwise the first
+    page at the root of its site, otherwise the page with the shortest URL.
+    """
+    if start_url is not None:
+        return urls.index(start_url) if start_url in urls else -1
+    for index, url in enumerate(urls):
+        if urlparse(url).path in ('', '/'):
+            return index
+    return min(range(len(urls)), key=lambda index: len(urls[index]), default=-1)
+
+
+def analyze_link_graph(project_name, start_url=None, damping=DEFAULT_DAMPING):
+    """
+    Compute and store the link graph metrics of every page of a project.
+
+    Loads the project's internal links into a LinkGraph, computes inlinks, outlinks, PageRank,
+    click depth from the homepage and orphan pages (pages no other page links to), and saves
+    them to the page_graph table. The start page is never counted as an orphan.
+
+    Args:
+        project_name (str): The project to analyze.
+        start_url (str, optional): The page click depth is measured from. Defaults to the homepage.
+        damping (float): The PageRank damping factor.
+
+    Returns:
+        dict: A summary with the number of pages, links and orphans, the start URL, the
+        number of unreachable pages and the elapsed seconds, or None if the project doesn't exist.
+    """
+    started = time.monotonic()
+    loaded = fetch_link_graph(project_name)
+    if loaded is None:
+        return None
+    pages, links, link_urls = loaded
+    if not pages:
+        return {'pages': 0, 'links': 0, 'orphans': 0, 'start_url': None, 'unreachable': 0, 'seconds': 0.0}
+
+    # Pages and links are matched by normalized URL: each distinct normalized URL gets an id,
+    # and the urls table ids of the links are mapped onto those.
+    normalized_ids = {}
+    page_ids = np.fromiter((page_id for page_id, _ in pages), dtype=np.int64, count=len(pages))
+    page_url_ids = np.fromiter(
+        (normalized_ids.setdefault(normalize_graph_url(url), len(normalized_ids)) for _, url in pages),
+        dtype=np.int64, count=len(pages),
+    )
+    normalized_by_url_id = np.zeros(max((url_id for url_id, _ in link_urls), default=-1) + 1, dtype=np.int64)
+    for url_id, url in link_urls:
+        normalized_by_url_id[url_id] = normalized_ids.setdefault(normalize_graph_url(url), len(normalized_ids))
+    link_sources = np.fromiter((source for source, _ in links), dtype=np.int64, count=len(links))
+    link_url_ids = normalized_by_url_id[np.fromiter((url_id for _, url_id in links), dtype=np.int64, count=len(links))]
+    urls = [url for _, url in pages]
+    del pages, links, link_urls, normalized_ids
+
+    graph = LinkGraph.from_links(page_ids, page_url_ids, link_sources, link_url_ids)
+    inlinks = graph.inlinks()
+    outlinks = graph.outlinks()
+    ranks = graph.pagerank(damping)
+    start = find_homepage(urls, start_url)
+    depths = graph.click_depth(start)
+    orphans = inlinks == 0
+    if start >= 0:
+        orphans[start] = False
+
+    save_page_graph(
+        (int(page_id), int(inlink_count), int(outlink_count), float(rank), int(depth) if depth >= 0 else None,
+         bool(orphan))
+        for page_id, inlink_count, outlink_count, rank, depth, orphan
+        in zip(graph.page_ids, inlinks, outlinks, ranks, depths, orphans)
+    )
+
+    return {
+        'pages': graph.size,
+        'links': len(graph.targets),
+        'orphans': int(orphans.sum()),
+        'start_url': urls[start] if start >= 0 else None,
+        'unreachable': int((depths < 0).sum()),
+        'seconds': time.monotonic() - started,
+    }
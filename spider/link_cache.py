@@ -0,0 +1,138 @@
+import threading
+import time
+from .storage import fetch_link_statuses, save_link_statuses
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# How long a link check stays valid, per status class.
+DEFAULT_LINK_CACHE_TTL = {
+    '2xx': 7 * 86400,
+    '3xx': 3 * 86400,
+    '4xx': 86400,
+    '5xx': 3600,
+    'error': 900,
+}
+
+
+def parse_duration(text):
+    """
+    Parse a duration such as '30m', '12h', '7d' or a plain number of seconds.
+
+    Args:
+        text (str): The duration to parse.
+
+    Returns:
+        float: The duration in seconds.
+    """
+    text = text.strip().lower()
+    if text and text[-1] in DURATION_UNITS:
+        return float(text[:-1]) * DURATION_UNITS[text[-1]]
+    return float(text)
+
+
+def parse_link_cache_ttl(spec):
+    """
+    Parse the --link-cache-ttl option into per status class TTLs.
+
+    A single duration applies to every status class (0 disables the cache). Otherwise the
+    spec is a comma separated list of CLASS=DURATION pairs, e.g. '2xx=14d,5xx=30m', that
+    override the defaults.
+
+    Args:
+        spec (str): The option value, or None for the defaults.
+
+    Returns:
+        dict: TTLs in seconds keyed by '2xx', '3xx', '4xx', '5xx' and 'error'.
+    """
+    ttl = dict(DEFAULT_LINK_CACHE_TTL)
+    if not spec:
+        return ttl
+
+    if '=' not in spec:
+        seconds = parse_duration(spec)
+        return {status_class: seconds for status_class in ttl}
+
+    for pair in spec.split(','):
+        status_class, _, duration = pair.partition('=')
+        status_class = status_class.strip().lower()
+        if status_class not in ttl:
+            raise ValueError(f"Unknown status class '{status_class}', expected one of {', '.join(ttl)}")
+        ttl[status_class] = parse_duration(duration)
+    return ttl
+
+
+def status_class(status):
+    """
+    Map an HTTP status code to its cache class.
+
+    Args:
+        status (int): The status code, or None if the request failed.
+
+    Returns:
+        str: '2xx', '3xx', '4xx', '5xx' or 'error'.
+    """
+    if status is None or not 200 <= status < 600:
+        return 'error'
+    return f"{status // 100}xx"
+
+
+class LinkStatusCache:
+    """
+    A cross-run cache of link check results backed by the link_status table.
+
+    Results older than the TTL of their status class are treated as stale. Stale entries
+    keep their ETag and Last-Modified values so the next check can be made conditional.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else dict(DEFAULT_LINK_CACHE_TTL)
+        self.enabled = any(seconds > 0 for seconds in self.ttl.values())
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def is_fresh(self, link_status, now=None):
+        now = now if now is not None else time.time()
+        return now - link_status.checked_at < self.ttl[status_class(link_status.status)]
+
+    def lookup(self, urls):
+        """
+        Split the given links into fresh cached results and stale entries to revalidate.
+
+        Args:
+            urls (list): The link URLs to look up.
+
+        Returns:
+            tuple: A dict of URL to fresh LinkStatus, and a dict of URL to stale LinkStatus.
+        """
+        if not self.enabled or not urls:
+            return {}, {}
+
+        now = time.time()
+        fresh = {}
+        stale = {}
+        for url, link_status in fetch_link_statuses(urls).items():
+            if self.is_fresh(link_status, now):
+                fresh[url] = link_status
+            else:
+                stale[url] = link_status
+
+        with self._lock:
+            self.hits += len(fresh)
+            self.misses += len(urls) - len(fresh)
+        return fresh, stale
+
+    def store(self, link_statuses):
+        """
+        Save new link check results.
+
+        Args:
+            link_statuses (list): LinkStatus objects to store.
+        """
+        if self.enabled:
+            save_link_statuses(link_statuses)
+
+    def report(self):
+        total = self.hits + self.misses
+        if self.enabled and total:
+            print(f"Link cache: {self.hits} of {total} link checks served from cache")
@@ -0,0 +1,181 @@
+import asyncio
+import time
+import aiohttp
+from .crawler import DEFAULT_HEADERS
+from .schemas import LinkStatus
+from .utils import is_valid_http_link
+
+# Statuses returned by servers that refuse HEAD but answer GET.
+HEAD_REJECTED_STATUSES = (405, 501)
+
+
+class LinkChecker:
+    """
+    Checks link statuses for a whole crawl through one pooled HTTP session.
+
+    The session keeps connections alive and caches DNS lookups. Its connector caps open
+    sockets at `concurrency` overall and `per_host` per host, so a page with hundreds of
+    links never opens hundreds of sockets. Links are checked with HEAD (falling back to GET
+    when the server rejects HEAD), redirects are followed and recorded, and timeouts or
+    connection errors are retried with exponential backoff. Concurrent checks of the same
+    link share a single request.
+    """
+
+    def __init__(self, concurrency=20, per_host=4, timeout=10, retries=2, backoff=0.5, link_cache=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.link_cache = link_cache
+        self.session = None
+        self.checks = 0
+        self.requests = 0
+        self._inflight = {}
+        self._started = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector)
+        self._started = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def check(self, url, cached=None):
+        """
+        Check a single link, sharing the request with any concurrent check of the same link.
+
+        Args:
+            url (str): The link to check.
+            cached (LinkStatus, optional): A stale cached result, used to make the request conditional.
+
+        Returns:
+            LinkStatus: The result of the check. Its status is None if every attempt failed.
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._check(url, cached))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _check(self, url, cached):
+        headers = {}
+        if cached is not None and cached.status is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        self.checks += 1
+        for attempt in range(self.retries + 1):
+            try:
+                link_status = await self._request('HEAD', url, headers)
+                if link_status.final_status in HEAD_REJECTED_STATUSES:
+                    link_status = await self._request('GET', url, headers)
+                if link_status.status == 304 and headers:
+                    link_status.status = cached.status
+                    link_status.final_status = cached.final_status
+                    link_status.final_url = cached.final_url
+                    link_status.redirect_chain = cached.redirect_chain
+                return link_status
+            except (aiohttp.ServerTimeoutError, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2 ** attempt)
+            except (aiohttp.ClientError, ValueError) as e:
+                print(f"Failed to check link {url}: {e}")
+                break
+
+        return LinkStatus(url=url, checked_at=time.time())
+
+    async def _request(self, method, url, headers):
+        self.requests += 1
+        async with self.session.request(
+            method,
+            url,
+            headers=headers,
+            allow_redirects=True,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as response:
+            history = list(response.history)
+            return LinkStatus(
+                url=url,
+                status=history[0].status if history else response.status,
+                final_status=response.status,
+                final_url=str(response.url),
+                redirect_chain=[str(hop.url) for hop in history[1:]] + [str(response.url)] if history else [],
+                checked_at=time.time(),
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+
+    async def validate(self, links, checked_links):
+        """
+        Validates the HTTP status of a page's links, ensuring that previously checked links are not rechecked.
+
+        Links checked earlier in this run are taken from checked_links; links checked in earlier
+        runs are taken from the persistent link cache while their results are still fresh.
+
+        Args:
+            links (list): A list of URLs to check.
+            checked_links (dict): A dictionary of previously checked links and their statuses.
+
+        Returns:
+            list: A list of non-200 status links for the current page.
+        """
+        unchecked_links = list(dict.fromkeys(
+            # The dict lookup rules out most links before the slower URL parse.
+            link for link in links if link not in checked_links and is_valid_http_link(link)
+        ))
+
+        stale = {}
+        if self.link_cache is not None and unchecked_links:
+            fresh, stale = await asyncio.to_thread(self.link_cache.lookup, unchecked_links)
+            for link, link_status in fresh.items():
+                checked_links[link] = "200" if link_status.status == 200 else "non-200"
+            unchecked_links = [link for link in unchecked_links if link not in fresh]
+
+        results = await asyncio.gather(*(self.check(link, stale.get(link)) for link in unchecked_links))
+        if self.link_cache is not None and results:
+            await asyncio.to_thread(self.link_cache.store, results)
+
+        for link_status in results:
+            checked_links[link_status.url] = "200" if link_status.status == 200 else "non-200"
+
+        return [link for link in links if checked_links.get(link) == "non-200"]
+
+    def report(self):
+        if not self.checks:
+            return
+        elapsed = time.monotonic() - self._started
+        rate = self.checks / elapsed if elapsed else 0.0
+        print(
+            f"Checked {self.checks} links with {self.requests} requests in {elapsed:.1f}s "
+            f"({rate:.2f} checks/sec, at most {self.concurrency} sockets)"
+        )
+
+
+def validate_link_statuses(links, checked_links, link_cache=None):
+    """
+    Validates the HTTP status of a list of links outside of a running crawl.
+
+    Args:
+        links (list): A list of URLs to check.
+        checked_links (dict): A dictionary of previously checked links and their statuses.
+        link_cache (LinkStatusCache, optional): The cross-run cache of link check results.
+
+    Returns:
+        list: A list of non-200 status links for the current page.
+    """
+    async def validate():
+        async with LinkChecker(link_cache=link_cache) as link_checker:
+            return await link_checker.validate(links, checked_links)
+
+    return asyncio.run(validate())
@@ -0,0 +1,238 @@
+from bs4 import BeautifulSoup
+from bs4.element import Tag, NavigableString, PreformattedString
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+START = 'start'
+TEXT = 'text'
+END = 'end'
+
+# HTML5's "special" elements: an open <li>, <dd> or <dt> is only closed implicitly if none of
+# these other than address, div and p lies between it and the new item.
+_SPECIAL_TAGS = frozenset((
+    'address', 'applet', 'area', 'article', 'aside', 'base', 'basefont', 'bgsound', 'blockquote', 'body', 'br',
+    'button', 'caption', 'center', 'col', 'colgroup', 'dd', 'details', 'dir', 'div', 'dl', 'dt', 'embed',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'frame', 'frameset', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'head', 'header', 'hgroup', 'hr', 'html', 'iframe', 'img', 'input', 'keygen', 'li', 'link', 'listing', 'main',
+    'marquee', 'menu', 'meta', 'nav', 'noembed', 'noframes', 'noscript', 'object', 'ol', 'p', 'param', 'plaintext',
+    'pre', 'script', 'search', 'section', 'select', 'source', 'style', 'summary', 'table', 'tbody', 'td', 'template',
+    'textarea', 'tfoot', 'th', 'thead', 'title', 'tr', 'track', 'ul', 'wbr', 'xmp',
+))
+# Elements whose start tag closes an open <p>, and the elements that hide it from them ("button scope").
+_CLOSES_P = frozenset((
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'details', 'dialog', 'dir', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup',
+    'hr', 'li', 'listing', 'main', 'menu', 'nav', 'ol', 'p', 'plaintext', 'pre', 'search', 'section', 'summary',
+    'table', 'ul', 'xmp',
+))
+_P_SCOPE = frozenset(('applet', 'button', 'caption', 'html', 'marquee', 'object', 'table', 'td', 'template', 'th'))
+# A new list item closes the open item of these kinds.
+_CLOSES_ITEMS = {'li': ('li',), 'dd': ('dd', 'dt'), 'dt': ('dd', 'dt')}
+
+
+def available_parsers():
+    """
+    List the HTML parser backends that can be used in this environment.
+
+    Returns:
+        list: Names of the installed parser backends.
+    """
+    available = ['html.parser']
+    if lxml_html is not None:
+        available.append('lxml')
+    if LexborHTMLParser is not None:
+        available.append('selectolax')
+    return available
+
+
+def iter_html_events(html, parser='html.parser'):
+    """
+    Walk an HTML document once, in document order, with the chosen parser backend.
+
+    Every backend produces the same event stream, so extraction logic only has to be
+    written once:
+
+    - (START, tag, attrs) when an element opens; attrs maps names to string values.
+    - (TEXT, None, text) for each text node.
+    - (END, tag, None) when an element closes.
+
+    Comments, doctypes and processing instructions are skipped, and so is the inert content
+    of <template> elements.
+
+    The backends don't build the same tree from malformed markup: html.parser nests an
+    unclosed <p> or <li> in the one before it, where lxml and selectolax close it. Every
+    stream therefore goes through _close_implied_end_tags, which ends open paragraphs and list
+    items where HTML5 implies their end tag.
+
+    Args:
+        html (str): The HTML document to walk.
+        parser (str): One of PARSER_BACKENDS.
+
+    Returns:
+        generator: The event tuples described above.
+    """
+    if parser == 'html.parser':
+        return _close_implied_end_tags(_iter_bs4_events(html))
+    if parser == 'lxml':
+        if lxml_html is None:
+            raise ImportError("The 'lxml' parser requires lxml. Install it using 'pip install lxml'.")
+        return _close_implied_end_tags(_iter_lxml_events(html))
+    if parser == 'selectolax':
+        if LexborHTMLParser is None:
+            raise ImportError("The 'selectolax' parser requires selectolax. Install it using 'pip install selectolax'.")
+        return _close_implied_end_tags(_iter_selectolax_events(html))
+    raise ValueError(f"Unknown parser '{parser}', expected one of {', '.join(PARSER_BACKENDS)}")
+
+
+def _close_implied_end_tags(events):
+    # Each open element is a one-item list holding its tag, or None once it was closed early;
+    # `parsed` follows the backend's nesting, `open_elements` the elements still open here.
+    parsed = []
+    open_elements = []
+    template_depth = 0
+
+    def close_through(element):
+        while True:
+            closed = open_elements.pop()
+            yield END, closed[0], None
+            if closed is element:
+                closed[0] = None
+                return
+            closed[0] = None
+
+    for event in events:
+        kind, tag, _ = event
+        if template_depth:
+            if kind == START and tag == 'template':
+                template_depth += 1
+            elif kind == END and tag == 'template':
+                template_depth -= 1
+            continue
+
+        if kind == END:
+            element = parsed.pop()
+            if element[0] is not None:
+                open_elements.pop()
+                yield event
+            continue
+        if kind == TEXT:
+            yield event
+            continue
+
+        if tag in _CLOSES_P:
+            for element in reversed(open_elements):
+                if element[0] == 'p':
+                    yield from close_through(element)
+                    break
+                if element[0] in _P_SCOPE:
+                    break
+        items = _CLOSES_ITEMS.get(tag)
+        if items:
+            for element in reversed(open_elements):
+                if element[0] in items:
+                    yield from close_through(element)
+                    break
+                if element[0] in _SPECIAL_TAGS and element[0] not in ('address', 'div', 'p'):
+                    break
+
+        element = [tag]
+        parsed.append(element)
+        open_elements.append(element)
+        yield event
+        if tag == 'template':
+            # Template content is inert: the template ends here, and its content and END are skipped above.
+            template_depth = 1
+            parsed.pop()
+            open_elements.pop()
+            yield END, tag, None
+
+
+def _normalize_attrs(attrs):
+    return {
+        name: ' '.join(value) if isinstance(value, list) else ('' if value is None else value)
+        for name, value in attrs.items()
+    }
+
+
+def _iter_bs4_events(html):
+    soup = BeautifulSoup(html, "html.parser")
+    children = [iter(soup.contents)]
+    open_tags = []
+    while children:
+        for node in children[-1]:
+            if isinstance(node, Tag):
+                yield START, node.name, _normalize_attrs(node.attrs)
+                children.append(iter(node.contents))
+                open_tags.append(node.name)
+                break
+            if isinstance(node, NavigableString) and not isinstance(node, PreformattedString):
+                yield TEXT, None, str(node)
+        else:
+            children.pop()
+            if open_tags:
+                yield END, open_tags.pop(), None
+
+
+def _iter_lxml_events(html):
+    try:
+        root = lxml_html.document_fromstring(
+            html.encode('utf-8'), parser=lxml_html.HTMLParser(encoding='utf-8')
+        )
+    except (etree.ParserError, ValueError):
+        return
+
+    # iterwalk only reports comments and processing instructions when asked to.
+    for event, element in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+        tag = element.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions still own the text that follows them.
+            if element.tail:
+                yield TEXT, None, element.tail
+            continue
+
+        if event == 'start':
+            yield START, tag, _normalize_attrs(dict(element.attrib))
+            if element.text:
+                yield TEXT, None, element.text
+        else:
+            yield END, tag, None
+            if element.tail:
+                yield TEXT, None, element.tail
+
+
+def _iter_selectolax_events(html):
+    node = LexborHTMLParser(html).root
+    depth = 0
+    while node is not None:
+        tag = node.tag
+        if tag == '-text':
+            yield TEXT, None, node.text(deep=False)
+        elif tag and not tag.startswith(('-', '!', '_')):
+            yield START, tag, _normalize_attrs(node.attributes)
+            if node.child is not None:
+                node = node.child
+                depth += 1
+                continue
+            yield END, tag, None
+
+        while node.next is None:
+            if depth == 0:
+                return
+            node = node.parent
+            depth -= 1
+            yield END, node.tag, None
+        if depth == 0:
+            return
+        node = node.next
@@ -0,0 +1,237 @@
+import re
+import threading
+from urllib.parse import urlparse
+from .parsers import iter_html_events, START, END
+from .extractor import extract_page_fields
+
+RENDER_MODES = ('never', 'auto', 'always')
+
+# Elements single-page apps mount into; when these are empty the content is built client-side.
+APP_ROOT_IDS = ('root', 'app', '__next', '__nuxt', 'svelte', 'main-app')
+
+# Markup left behind by client-side frameworks that only fill the page in the browser. Markers
+# that server-rendered pages carry too (__NEXT_DATA__, window.__NUXT__, data-server-rendered,
+# data-reactroot, ng-version) aren't listed: an SSR page is caught by the content checks if it
+# really is empty.
+FRAMEWORK_MARKERS = re.compile(
+    r'ng-app|You need to enable JavaScript|Please enable JavaScript',
+    re.IGNORECASE,
+)
+
+MIN_BODY_TEXT_LENGTH = 50
+
+
+def page_signals(html, parser='html.parser'):
+    """
+    Collect the fields that decide whether static and rendered HTML are equivalent for SEO purposes.
+
+    Args:
+        html (str): The HTML of a page.
+        parser (str): The HTML parser backend to extract with.
+
+    Returns:
+        dict: The title, meta description, canonical URL, H1 texts and link count of the page.
+    """
+    fields = extract_page_fields(html, '', parser)
+    return {
+        'title': fields['title'],
+        'meta_description': fields['meta_description'],
+        'canonical': fields['canonical'],
+        'h1': fields['headings']['h1'],
+        'link_count': len(fields['links']),
+    }
+
+
+def js_dependency_reason(html, parser='html.parser', weak_signals=True):
+    """
+    Check static HTML for signs that the page needs JavaScript to produce its content.
+
+    Args:
+        html (str): The static HTML of a page.
+        parser (str): The HTML parser backend to walk the document with.
+        weak_signals (bool): Also flag pages by weak signals: a missing title or h1, or client-side
+            framework markers. Without them only little body text or an empty mount point flags a page.
+
+    Returns:
+        str: A short reason if the page looks JavaScript-dependent, otherwise an empty string.
+    """
+    body_text_length = 0
+    has_title = False
+    has_h1 = False
+    skip_depth = 0
+    # Open elements as (tag, mount point id or None); mount points record whether they hold any text.
+    open_elements = []
+    mount_text = {}
+
+    for event, tag, value in iter_html_events(html, parser):
+        if event == START:
+            mount_id = value.get('id') if value.get('id') in APP_ROOT_IDS else None
+            if mount_id is not None:
+                mount_text.setdefault(mount_id, False)
+            open_elements.append((tag, mount_id))
+            if tag in ('head', 'script', 'style', 'template', 'noscript'):
+                skip_depth += 1
+            has_h1 = has_h1 or tag == 'h1'
+        elif event == END:
+            open_elements.pop()
+            if tag in ('head', 'script', 'style', 'template', 'noscript'):
+                skip_depth -= 1
+        else:
+            text = value.strip()
+            if not text:
+                continue
+            if open_elements and open_elements[-1][0] == 'title':
+                has_title = True
+            if skip_depth:
+                continue
+            body_text_length += len(text)
+            for _, mount_id in open_elements:
+                if mount_id is not None:
+                    mount_text[mount_id] = True
+
+    if body_text_length < MIN_BODY_TEXT_LENGTH:
+        return "little or no body text"
+
+    for mount_id, has_text in mount_text.items():
+        if not has_text:
+            return f"empty #{mount_id} mount point"
+
+    if not weak_signals:
+        return ""
+    if not has_title:
+        return "missing title"
+    if not has_h1:
+        return "missing h1"
+
+    if FRAMEWORK_MARKERS.search(html):
+        return "client-side framework markers"
+
+    return ""
+
+
+def signals_differ(static_signals, rendered_signals):
+    """
+    Decide whether rendering changed anything the extractor cares about.
+
+    Args:
+        static_signals (dict): Signals from the static HTML.
+        rendered_signals (dict): Signals from the rendered HTML.
+
+    Returns:
+        bool: True if the rendered page differs meaningfully from the static one.
+    """
+    for field in ('title', 'meta_description', 'canonical', 'h1'):
+        if static_signals[field] != rendered_signals[field]:
+            return True
+
+    static_links = static_signals['link_count']
+    rendered_links = rendered_signals['link_count']
+    return abs(rendered_links - static_links) > max(2, 0.2 * max(static_links, rendered_links))
+
+
+class RenderPolicy:
+    """
+    Decides per page whether static HTML is enough or the page must be rendered in a browser.
+
+    `never` and `always` are fixed. In `auto` mode the first `sample_size` pages of each host
+    are rendered and compared with their static HTML. If any sample differs, every page on
+    that host is rendered from then on; otherwise the host is marked static and its pages are
+    only rendered when they have little body text or an empty mount point. A host whose pages
+    fail to render `max_failures` times in a row is marked unrenderable and is not rendered
+    again. Decisions are cached per host for the lifetime of the policy, so sampling stops
+    after a few pages.
+    """
+
+    def __init__(self, mode='auto', sample_size=3, parser='html.parser', max_failures=3):
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode '{mode}', expected one of {', '.join(RENDER_MODES)}")
+        self.mode = mode
+        self.sample_size = sample_size
+        self.parser = parser
+        self.host_decisions = {}
+        self.host_samples = {}
+        self.host_failures = {}
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+
+    def should_render(self, result):
+        """
+        Decide whether a fetched HTML page needs rendering.
+
+        Args:
+            result (FetchResult): The static response of the page.
+
+        Returns:
+            bool: True if the page should be rendered in a browser.
+        """
+        if self.mode != 'auto':
+            return self.mode == 'always'
+
+        host = urlparse(result.url).netloc
+        decision = self.host_decisions.get(host)
+        if decision == 'render':
+            return True
+        if decision == 'unrenderable':
+            return False
+
+        # Sampling showed the host serves its content statically, so listing and legal pages
+        # without an h1 don't need a browser; only a page with no content of its own does.
+        reason = js_dependency_reason(result.text, self.parser, weak_signals=decision is None)
+        if reason:
+            print(f"Rendering {result.url}: {reason}")
+            return True
+
+        # Hosts without a decision yet are still being sampled.
+        return decision is None
+
+    def record(self, result):
+        """
+        Learn from a page that was rendered while its host was still being sampled.
+
+        Args:
+            result (FetchResult): A response holding both static and rendered HTML.
+        """
+        if self.mode != 'auto' or result.rendered is None:
+            return
+
+        host = urlparse(result.url).netloc
+        # A render that worked ends a run of failures.
+        self.host_failures.pop(host, None)
+        if host in self.host_decisions:
+            return
+
+        static_signals = page_signals(result.text, self.parser)
+        rendered_signals = page_signals(result.rendered, self.parser)
+        differs = signals_differ(static_signals, rendered_signals)
+
+        with self._lock:
+            if host in self.host_decisions:
+                return
+
+            if differs:
+                print(f"Rendered output differs from static HTML on {host}, rendering all of its pages")
+                self.host_decisions[host] = 'render'
+                return
+
+            self.host_samples[host] = self.host_samples.get(host, 0) + 1
+            if self.host_samples[host] >= self.sample_size:
+                print(f"Static HTML matches rendered output on {host}, skipping rendering for its pages")
+                self.host_decisions[host] = 'static'
+
+    def record_failure(self, result):
+        """
+        Learn from a page that failed to render, so a host that can't be rendered isn't tried forever.
+
+        Args:
+            result (FetchResult): The static response of the page.
+        """
+        if self.mode != 'auto':
+            return
+
+        host = urlparse(result.url).netloc
+        with self._lock:
+            failures = self.host_failures.get(host, 0) + 1
+            self.host_failures[host] = failures
+            if failures >= self.max_failures and self.host_decisions.get(host) != 'unrenderable':
+                print(f"Rendering failed {failures} times in a row on {host}, using static HTML for its pages")
+                self.host_decisions[host] = 'unrenderable'
@@ -0,0 +1,135 @@
+import time
+from urllib.parse import urlparse
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from .schemas import RenderProfile
+
+RENDER_WAITS = ('domcontentloaded', 'load', 'networkidle', 'stable')
+
+# Resource types Playwright reports for a request. Documents are never blocked by type.
+RESOURCE_TYPES = (
+    'stylesheet', 'image', 'media', 'font', 'script', 'texttrack', 'xhr', 'fetch', 'eventsource', 'websocket',
+    'manifest', 'other',
+)
+
+# Analytics, tag manager, ad and session recording hosts. None of them changes a page's content.
+DEFAULT_BLOCKED_HOSTS = (
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'googlesyndication.com',
+    'googleadservices.com', 'adservice.google.com', 'connect.facebook.net', 'hotjar.com', 'clarity.ms',
+    'bat.bing.com', 'segment.io', 'cdn.segment.com', 'mixpanel.com', 'amplitude.com', 'fullstory.com',
+    'static.ads-twitter.com', 'analytics.tiktok.com', 'snap.licdn.com', 'px.ads.linkedin.com',
+    'js.hs-analytics.net', 'adnxs.com', 'criteo.com', 'taboola.com', 'outbrain.com',
+)
+
+# Installs a MutationObserver on first call and reports whether the DOM's content has been
+# left alone for the given number of milliseconds. Attribute changes don't count, so carousels
+# and animations don't keep a page from settling.
+DOM_STABLE_SCRIPT = '''
+(quietMs) => {
+    if (!window.__seowayfinderDomStable) {
+        const state = {changedAt: performance.now()};
+        new MutationObserver(() => { state.changedAt = performance.now(); })
+            .observe(document, {childList: true, subtree: true, characterData: true});
+        window.__seowayfinderDomStable = state;
+    }
+    return performance.now() - window.__seowayfinderDomStable.changedAt >= quietMs;
+}
+'''
+
+
+def parse_resource_types(spec):
+    """
+    Parse a comma separated list of resource types to block, e.g. 'image,media,font'.
+
+    Args:
+        spec (str): The list, or 'none' to block no resource type.
+
+    Returns:
+        list: The resource types.
+    """
+    if spec.strip().lower() == 'none':
+        return []
+    types = [resource_type.strip().lower() for resource_type in spec.split(',') if resource_type.strip()]
+    unknown = [resource_type for resource_type in types if resource_type not in RESOURCE_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown resource type(s) {', '.join(unknown)}, expected any of {', '.join(RESOURCE_TYPES)}")
+    return types
+
+
+class RequestBlocker:
+    """
+    Decides which of a rendered page's requests are aborted, following a RenderProfile.
+
+    A request is blocked if its resource type is one of `profile.block_resources`, or if its
+    host is one of the blocked hosts or a subdomain of one.
+    """
+
+    def __init__(self, profile: RenderProfile):
+        self.resource_types = frozenset(profile.block_resources)
+        hosts = list(profile.block_hosts) + (list(DEFAULT_BLOCKED_HOSTS) if profile.default_blocklist else [])
+        self.hosts = frozenset(host.strip().lower().lstrip('.') for host in hosts if host.strip())
+
+    @property
+    def active(self):
+        return bool(self.resource_types or self.hosts)
+
+    def blocks_host(self, host):
+        host = host.lower()
+        while host:
+            if host in self.hosts:
+                return True
+            host = host.partition('.')[2]
+        return False
+
+    def blocks(self, url, resource_type):
+        if resource_type in self.resource_types:
+            return True
+        return bool(self.hosts) and self.blocks_host(urlparse(url).hostname or '')
+
+
+async def render_page(page, url, profile: RenderProfile):
+    """
+    Navigate a page to a URL and wait for it to render as the profile asks, within its budget.
+
+    With the 'stable' wait, the page is rendered once its DOM content stopped changing for
+    `profile.stable_ms` after DOMContentLoaded, which pages that poll or stream forever reach
+    long before 'networkidle'. With `profile.wait_for`, the selector must also be in the page.
+    If the budget runs out after the document was parsed, the HTML rendered so far is kept.
+
+    Args:
+        page (playwright.async_api.Page): The page to render in.
+        url (str): The URL to render.
+        profile (RenderProfile): How to wait, and for how long at most.
+
+    Returns:
+        tuple: The rendered HTML, and True if the budget ran out before the page was done.
+
+    Raises:
+        playwright.async_api.TimeoutError: If the budget ran out before the document was parsed.
+    """
+    deadline = time.monotonic() + profile.budget
+
+    def remaining_ms():
+        return max(1.0, (deadline - time.monotonic()) * 1000)
+
+    # Registered just before navigating, so it only fires for this URL's document.
+    parsed = []
+
+    def on_parsed(_):
+        parsed.append(True)
+
+    page.on('domcontentloaded', on_parsed)
+    try:
+        wait_until = 'domcontentloaded' if profile.wait == 'stable' else profile.wait
+        await page.goto(url, wait_until=wait_until, timeout=remaining_ms())
+        if profile.wait == 'stable':
+            await page.wait_for_function(DOM_STABLE_SCRIPT, arg=profile.stable_ms, polling=100, timeout=remaining_ms())
+        if profile.wait_for:
+            await page.wait_for_selector(profile.wait_for, state='attached', timeout=remaining_ms())
+        timed_out = False
+    except PlaywrightTimeoutError:
+        if not parsed:
+            raise
+        timed_out = True
+    finally:
+        page.remove_listener('domcontentloaded', on_parsed)
+    return await page.content(), timed_out
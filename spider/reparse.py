@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .crawler import get_base_url
+from .extractor import build_page_data, pack_page_data, unpack_page_data
+from .response_cache import RESPONSE_CACHE_DIR, read_blob
+from .schemas import PageVersion
+from .storage import PageWriter, fetch_cached_responses, fetch_link_statuses, fetch_page_versions
+from .utils import is_valid_http_link
+
+REPARSE_BATCH = 50  # Pages extracted per task sent to a worker process
+
+
+def extract_cached_pages(responses, root=RESPONSE_CACHE_DIR, parser='html.parser'):
+    """
+    Extract a batch of pages from their cached responses.
+
+    This is the entry point of the reparse process pool: each worker reads and decompresses
+    the blobs itself, so nothing but the response metadata and the packed pages cross
+    process boundaries.
+
+    Args:
+        responses (list): Cached responses, as returned by storage.fetch_cached_responses.
+        root (str): The directory of the blob store.
+        parser (str): The HTML parser backend to extract with.
+
+    Returns:
+        list: (response, packed PageData) pairs; the packed page is None, and the response
+        holds an 'error', if the page couldn't be extracted.
+    """
+    pages = []
+    for response in responses:
+        try:
+            if response['rendered_key'] is not None:
+                html = read_blob(response['rendered_key'], root).decode('utf-8')
+            else:
+                html = read_blob(response['body_key'], root).decode(response['encoding'] or 'utf-8', errors='replace')
+            base_url = get_base_url(response['final_url'] or response['url'])
+            pages.append((response, pack_page_data(build_page_data(html, response['url'], base_url, parser))))
+        except Exception as e:
+            pages.append(({**response, 'error': str(e)}, None))
+    return pages
+
+
+def _batched(items, size):
+    for offset in range(0, len(items), size):
+        yield items[offset:offset + size]
+
+
+def reparse_project(project_name: str, run_id=None, workers=None, parser='html.parser', root=RESPONSE_CACHE_DIR):
+    """
+    Extract every saved page of a project again from the response cache, without any network access.
+
+    Pages are extracted by a pool of `workers` processes, one per core by default, and saved
+    over the project's pages as they come back, in the order the project saved them. A page's
+    broken links are taken from the link checks saved by earlier crawls; links no crawl has
+    checked yet are not reported as broken. Pages keep their saved PageVersion, so the next
+    incremental crawl still recognizes them as unchanged.
+
+    Args:
+        project_name (str): The project to reparse.
+        run_id (int, optional): Reparse the responses as of this crawl run instead of the latest ones.
+        workers (int, optional): The number of extraction processes. Defaults to the number of cores.
+        parser (str): The HTML parser backend to extract with.
+        root (str): The directory of the blob store.
+
+    Returns:
+        dict: The number of pages reparsed, saved, failed and without a cached response, the
+        links without a saved check and the seconds it took, or None if the project doesn't exist.
+    """
+    started = time.monotonic()
+    cached = fetch_cached_responses(project_name, run_id)
+    if cached is None:
+        return None
+    responses = cached['responses']
+    summary = {
+        'pages': 0, 'saved': 0, 'failed': 0, 'uncached': cached['uncached'], 'unchecked_links': 0, 'seconds': 0.0,
+    }
+    if not responses:
+        summary['seconds'] = time.monotonic() - started
+        return summary
+
+    workers = max(1, min(workers or os.cpu_count() or 1, -(-len(responses) // REPARSE_BATCH)))
+    checked_links = {}
+    unchecked_links = set()
+
+    def save(pages, writer):
+        versions = fetch_page_versions(cached['project_id'], [response['url'] for response, _ in pages])
+        extracted = []
+        for response, packed in pages:
+            if packed is None:
+                print(f"Error reparsing {response['url']}: {response['error']}")
+                summary['failed'] += 1
+                continue
+            page_data = unpack_page_data(packed)
+            page_data.version = versions.get(page_data.url) or PageVersion(
+                etag=response['headers'].get('ETag'),
+                last_modified=response['headers'].get('Last-Modified'),
+                lastmod=response['lastmod'],
+                body_hash=response['body_key'],
+                rendered=response['rendered_key'] is not None,
+                crawled_at=response['fetched_at'],
+            )
+            extracted.append(page_data)
+
+        links = list({
+            link for page_data in extracted for link in page_data.links
+            if link not in checked_links and is_valid_http_link(link)
+        })
+        for link, link_status in fetch_link_statuses(links).items():
+            checked_links[link] = "200" if link_status.status == 200 else "non-200"
+        unchecked_links.update(link for link in links if link not in checked_links)
+        for page_data in extracted:
+            page_data.non_200_links = [link for link in page_data.links if checked_links.get(link) == "non-200"]
+            writer.write(page_data)
+        summary['pages'] += len(extracted)
+
+    # Spawned rather than forked, like the crawl's extraction processes.
+    with PageWriter(project_name) as writer, ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        # Keep two batches queued per process, and save batches in order as they come back.
+        pending = deque()
+        for batch in _batched(responses, REPARSE_BATCH):
+            pending.append(pool.submit(extract_cached_pages, batch, root, parser))
+            if len(pending) >= workers * 2:
+                save(pending.popleft().result(), writer)
+        while pending:
+            save(pending.popleft().result(), writer)
+
+    summary['saved'] = writer.rows_written
+    summary['unchecked_links'] = len(unchecked_links)
+    summary['seconds'] = time.monotonic() - started
+    return summary
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+import zlib
+from .crawler import hash_body
+from .schemas import FetchResult
+from .storage import DB_FILE, save_cached_responses, fetch_cached_blob_keys
+
+RESPONSE_CACHE_DIR = os.path.join(os.path.dirname(DB_FILE), 'responses')
+COMPRESSION_LEVEL = 6  # zlib level: most of the size reduction of 9 at a fraction of the time
+
+
+def blob_path(key, root=RESPONSE_CACHE_DIR):
+    """Return the file a blob is stored in, spread over 256 directories by the first byte of its key."""
+    return os.path.join(root, key[:2], key)
+
+
+def write_blob(data: bytes, root=RESPONSE_CACHE_DIR):
+    """
+    Store a body in the blob store unless it is already there.
+
+    The key is the hash of the uncompressed body, the same hash PageVersion.body_hash holds,
+    so a body fetched by several runs, or by several projects, is stored once.
+
+    Returns:
+        str: The blob's key.
+    """
+    key = hash_body(data)
+    path = blob_path(key, root)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed, so a reader never sees half a blob.
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(zlib.compress(data, COMPRESSION_LEVEL))
+        os.replace(temporary, path)
+    return key
+
+
+def read_blob(key, root=RESPONSE_CACHE_DIR) -> bytes:
+    """Return the uncompressed body stored under a key. Raises OSError if the blob is missing."""
+    with open(blob_path(key, root), 'rb') as file:
+        return zlib.decompress(file.read())
+
+
+def prune_blobs(root=RESPONSE_CACHE_DIR):
+    """
+    Delete the blobs no cached response refers to any more, e.g. after a project was removed.
+
+    Returns:
+        tuple: The number of blobs deleted and the bytes they freed.
+    """
+    if not os.path.isdir(root):
+        return 0, 0
+    referenced = fetch_cached_blob_keys()
+    deleted = freed = 0
+    for directory in os.scandir(root):
+        if not directory.is_dir():
+            continue
+        for blob in os.scandir(directory.path):
+            if blob.name not in referenced:
+                freed += blob.stat().st_size
+                os.remove(blob.path)
+                deleted += 1
+        if not any(os.scandir(directory.path)):
+            os.rmdir(directory.path)
+    return deleted, freed
+
+
+class ResponseCache:
+    """
+    Keeps the pages a crawl run fetched on disk, so they can be extracted again without the network.
+
+    The static body and the rendered HTML of each page are stored compressed in a
+    content-addressed blob store under RESPONSE_CACHE_DIR, and indexed by project, crawl run
+    and URL in the cached_responses table with the response's status, headers and encoding.
+    Index rows are written in batches of `batch_size`; `close` writes the rest.
+
+    `store` does blocking file and database I/O and compresses the body, which releases the
+    GIL; the crawl engine calls it on a thread.
+
+    Usage:
+        cache = ResponseCache(project_id, run_id)
+        cache.store(result)
+        cache.close()
+    """
+
+    def __init__(self, project_id: int, run_id: int, root=RESPONSE_CACHE_DIR, batch_size=200):
+        self.project_id = project_id
+        self.run_id = run_id
+        self.root = root
+        self.batch_size = batch_size
+        self.responses_stored = 0
+        self._rows = []
+        self._lock = threading.Lock()
+
+    def store(self, result: FetchResult):
+        """Store a fetched page's body, and its rendered HTML if it was rendered."""
+        body_key = write_blob(result.body, self.root)
+        rendered_key = write_blob(result.rendered.encode('utf-8'), self.root) if result.rendered is not None else None
+        row = (
+            self.project_id, self.run_id, result.url, result.final_url, result.status, json.dumps(result.headers),
+            result.encoding, body_key, rendered_key, result.lastmod, time.time(),
+        )
+        with self._lock:
+            self._rows.append(row)
+            self.responses_stored += 1
+            if len(self._rows) < self.batch_size:
+                return
+            rows, self._rows = self._rows, []
+        save_cached_responses(rows)
+
+    def close(self):
+        """Index the responses stored since the last batch."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+        try:
+            save_cached_responses(rows)
+        except Exception as e:
+            print(f"Error indexing {len(rows)} cached responses: {e}")
@@ -0,0 +1,160 @@
+import asyncio
+import re
+from urllib.parse import urlparse
+import aiohttp
+
+ROBOTS_USER_AGENT = 'SEOwayfinder'  # Product token matched against the User-agent lines of robots.txt
+USER_AGENT = f'Mozilla/5.0 (compatible; {ROBOTS_USER_AGENT}/0.0.1)'  # Sent with every request, so sites see the token they wrote rules for
+MAX_ROBOTS_BYTES = 500 * 1024  # Only the first 500 KiB of a robots.txt are read, as RFC 9309 allows
+
+
+def _compile_rule(pattern):
+    # '*' matches any run of characters and a trailing '$' anchors the rule at the end of the URL.
+    anchored = pattern.endswith('$')
+    if anchored:
+        pattern = pattern[:-1]
+    regex = '.*'.join(re.escape(part) for part in pattern.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+
+class RobotsRules:
+    """
+    The rules of one host's robots.txt that apply to this crawler.
+
+    Rules are matched against the path and query of a URL. As in RFC 9309, the longest
+    matching rule wins and Allow wins over Disallow when two rules are as long, so
+    `Allow: /shop/sale` opens one section of a disallowed `/shop/`.
+    """
+
+    def __init__(self, rules=(), crawl_delay=None, sitemaps=()):
+        # (allow, pattern length, compiled pattern), longest first and Allow first among equals.
+        self.rules = sorted(
+            ((allow, len(pattern), _compile_rule(pattern)) for allow, pattern in rules),
+            key=lambda rule: (-rule[1], not rule[0]),
+        )
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps)
+
+    @classmethod
+    def parse(cls, text, user_agent=ROBOTS_USER_AGENT):
+        """
+        Parse a robots.txt and keep the groups that apply to `user_agent`.
+
+        The groups naming the user agent apply; if there are none, the groups for '*' do.
+
+        Args:
+            text (str): The body of the robots.txt.
+            user_agent (str): The product token of the crawler.
+
+        Returns:
+            RobotsRules: The merged rules and Crawl-delay of the matching groups.
+        """
+        groups = []
+        sitemaps = []
+        group = None
+        in_agent_lines = False
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            key, value = (part.strip() for part in line.split(':', 1))
+            key = key.lower()
+            if key == 'user-agent':
+                if not in_agent_lines:
+                    group = {'agents': set(), 'rules': [], 'crawl_delay': None}
+                    groups.append(group)
+                group['agents'].add(value.lower())
+                in_agent_lines = True
+            elif key == 'sitemap':
+                sitemaps.append(value)
+            else:
+                in_agent_lines = False
+                if group is None:
+                    continue
+                if key in ('allow', 'disallow') and value:
+                    group['rules'].append((key == 'allow', value))
+                elif key == 'crawl-delay':
+                    try:
+                        group['crawl_delay'] = float(value)
+                    except ValueError:
+                        pass
+
+        token = user_agent.lower()
+        matching = [group for group in groups if token in group['agents']] or \
+            [group for group in groups if '*' in group['agents']]
+        delays = [group['crawl_delay'] for group in matching if group['crawl_delay'] is not None]
+        return cls(
+            [rule for group in matching for rule in group['rules']],
+            crawl_delay=max(delays) if delays else None,
+            sitemaps=sitemaps,
+        )
+
+    @classmethod
+    def disallow_all(cls):
+        return cls([(False, '/')])
+
+    def is_allowed(self, url):
+        """Return True if the rules allow crawling the URL."""
+        parsed = urlparse(url)
+        path = parsed.path or '/'
+        if path == '/robots.txt':
+            return True
+        target = f"{path}?{parsed.query}" if parsed.query else path
+        for allow, _, pattern in self.rules:
+            if pattern.match(target):
+                return allow
+        return True
+
+
+class RobotsCache:
+    """
+    Fetches each host's robots.txt once per crawl and answers allow/disallow checks from it.
+
+    Concurrent checks against a host whose robots.txt is still being fetched share the one
+    request. Following RFC 9309, a robots.txt that doesn't exist (4xx) allows everything and
+    one that can't be fetched (5xx or a network error) disallows everything.
+    """
+
+    def __init__(self, session, user_agent=ROBOTS_USER_AGENT):
+        self.session = session
+        self.user_agent = user_agent
+        self._rules = {}
+
+    async def rules(self, url):
+        """Return the RobotsRules of the URL's host, fetching its robots.txt on first use."""
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        task = self._rules.get(origin)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(origin))
+            self._rules[origin] = task
+        return await asyncio.shield(task)
+
+    async def is_allowed(self, url):
+        return (await self.rules(url)).is_allowed(url)
+
+    async def _fetch(self, origin):
+        robots_url = f"{origin}/robots.txt"
+        try:
+            async with self.session.get(robots_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status >= 500:
+                    print(f"{robots_url} returned HTTP {response.status}; not crawling {origin} "
+                          f"(pass --ignore-robots to crawl it anyway)")
+                    return RobotsRules.disallow_all()
+                if response.status >= 400:
+                    return RobotsRules()
+                # content.read(n) returns what is buffered so far; read chunks until EOF or the limit.
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    body += chunk[:MAX_ROBOTS_BYTES - len(body)]
+                    if len(body) >= MAX_ROBOTS_BYTES:
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Could not fetch {robots_url}: {e}; not crawling {origin} "
+                  f"(pass --ignore-robots to crawl it anyway)")
+            return RobotsRules.disallow_all()
+
+        rules = RobotsRules.parse(body.decode('utf-8', errors='replace'), self.user_agent)
+        crawl_delay = f", Crawl-delay {rules.crawl_delay:g}s" if rules.crawl_delay else ""
+        print(f"Read {robots_url}: {len(rules.rules)} rules apply{crawl_delay}")
+        return rules
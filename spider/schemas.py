@@ -7,6 +7,24 @@ class Image(BaseModel):
     alt: str
 
 
+class Fingerprint(BaseModel):
+    word_count: int = 0  # Number of words in the body text
+    content_hash: Optional[str] = None  # Hash of the normalized body text, None if there is none
+    title_hash: Optional[str] = None  # Hash of the normalized title
+    meta_description_hash: Optional[str] = None  # Hash of the normalized meta description
+    h1_hash: Optional[str] = None  # Hash of the normalized first H1
+    minhash: List[int] = Field(default_factory=list)  # MinHash signature of the body text shingles
+
+
+class PageVersion(BaseModel):
+    etag: Optional[str] = None  # ETag header of the page's last full response
+    last_modified: Optional[str] = None  # Last-Modified header of the page's last full response
+    lastmod: Optional[str] = None  # <lastmod> value of the page in its sitemap
+    body_hash: Optional[str] = None  # Hash of the static response body
+    rendered: bool = False  # True if the page was rendered in a browser
+    crawled_at: float = 0.0  # Unix timestamp of the last time the page was fetched
+
+
 class PageData(BaseModel):
     url: str = ""
     title: str = ""
@@ -28,3 +46,92 @@ class PageData(BaseModel):
     stylesheets: List[str] = Field(default_factory=list)  # CSS file links
     slug: str = ""  # Slug from URL
     url_parts: Dict[str, Optional[str]] = Field(default_factory=dict)  # Combination of params, query, and fragments on a URL
+    fingerprint: Optional[Fingerprint] = None  # Content fingerprints used to find duplicate pages
+    version: Optional[PageVersion] = None  # How the page was fetched, to recrawl it incrementally
+
+
+class RenderProfile(BaseModel):
+    wait: str = "stable"  # When a render is done: domcontentloaded, load, networkidle or stable
+    wait_for: Optional[str] = None  # CSS selector that must be in the page before its HTML is taken
+    stable_ms: int = 500  # Milliseconds without DOM changes after which a page counts as stable
+    budget: float = 15.0  # Seconds a page may take to render; the HTML rendered so far is kept when it runs out
+    block_resources: List[str] = Field(default_factory=lambda: ['image', 'media', 'font'])  # Resource types not loaded
+    block_hosts: List[str] = Field(default_factory=list)  # Hosts (and their subdomains) no request is sent to
+    default_blocklist: bool = True  # Also block the analytics and ad hosts of render_profile.DEFAULT_BLOCKED_HOSTS
+
+
+class CrawlOptions(BaseModel):
+    concurrency: int = 5  # Maximum number of URLs fetched at once across all hosts
+    per_host: int = 8  # Maximum number of in-flight requests to a single host
+    delay: float = 1.0  # Seconds a per-host slot stays idle after each request, to start with if the rate adapts
+    min_delay: float = 0.0  # Shortest per-host delay the adaptive rate may reach
+    adaptive: bool = True  # Adapt each host's rate to its latency and 429/503 responses
+    respect_robots: bool = True  # Skip pages robots.txt disallows and honor its Crawl-delay
+    link_concurrency: int = 20  # Maximum open connections for link checks across all hosts
+    link_per_host: int = 4  # Maximum open connections for link checks to a single host
+    browsers: int = 1  # Number of headless browsers kept open for rendering
+    pages_per_browser: int = 4  # Concurrent pages each browser may render
+    recycle_after: int = 50  # Navigations before a browser context is replaced
+    render: str = "auto"  # Render policy for HTML pages: never, auto or always
+    render_profile: RenderProfile = Field(default_factory=RenderProfile)  # How pages are rendered when they are
+    parser: str = "html.parser"  # HTML parser backend used for extraction
+    parse_workers: int = 0  # Processes used for HTML extraction; 0 extracts on threads of the crawl process
+    incremental: bool = True  # Skip pages that haven't changed since the project's last crawl
+    include: List[str] = Field(default_factory=list)  # URL patterns; if any, only page URLs matching one are crawled
+    exclude: List[str] = Field(default_factory=list)  # URL patterns of pages and sitemaps not to crawl
+    prefer: List[str] = Field(default_factory=list)  # URL patterns of pages to crawl before the others
+    max_pages: Optional[int] = None  # Stop the crawl after fetching this many pages
+    time_budget: Optional[float] = None  # Seconds after which the crawl stops fetching pages
+
+
+class FetchResult(BaseModel):
+    url: str  # URL that was requested
+    final_url: str = ""  # URL after following redirects
+    status: int = 0  # HTTP status code of the static response
+    headers: Dict[str, str] = Field(default_factory=dict)  # Response headers of the static response
+    body: bytes = b""  # Raw response body as received over the network
+    encoding: str = "utf-8"  # Character encoding used to decode the body
+    rendered: Optional[str] = None  # Browser-rendered HTML, if the page was rendered
+    unchanged: bool = False  # True if the page is unchanged since the previous crawl: a 304 or the same body
+    lastmod: Optional[str] = None  # <lastmod> value of the page in the sitemap that listed it, if any
+    elapsed: float = 0.0  # Seconds the static request took, until its body was read
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get('Content-Type', self.headers.get('content-type', ''))
+
+    def header(self, name: str) -> Optional[str]:
+        """Return a response header by case-insensitive name, or None."""
+        name = name.lower()
+        return next((value for key, value in self.headers.items() if key.lower() == name), None)
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    @property
+    def content(self) -> str:
+        """The rendered HTML when available, otherwise the decoded static body."""
+        return self.rendered if self.rendered is not None else self.text
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+class SitemapEntry(BaseModel):
+    loc: str  # URL of the page or nested sitemap
+    kind: str = "page"  # "page" for <url> entries, "sitemap" for <sitemap> entries
+    lastmod: Optional[str] = None  # <lastmod> value, if present
+    priority: Optional[float] = None  # <priority> value, if present
+
+
+class LinkStatus(BaseModel):
+    url: str  # Link that was checked
+    status: Optional[int] = None  # HTTP status code of the link itself, or None if the request failed
+    final_status: Optional[int] = None  # HTTP status code after following redirects
+    final_url: str = ""  # URL the response came from after following redirects
+    redirect_chain: List[str] = Field(default_factory=list)  # URLs visited while following redirects
+    checked_at: float = 0.0  # Unix timestamp of the check
+    etag: Optional[str] = None  # ETag header of the response
+    last_modified: Optional[str] = None  # Last-Modified header of the response
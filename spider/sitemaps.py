@@ -0,0 +1,208 @@
+import asyncio
+import zlib
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+import aiohttp
+from .schemas import SitemapEntry
+
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 64 * 1024
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def guess_sitemap_entry(url):
+    """
+    Build a frontier entry for a URL whose type is only known from its path.
+
+    Args:
+        url (str): A page or sitemap URL.
+
+    Returns:
+        SitemapEntry: A sitemap entry for .xml and .xml.gz URLs, otherwise a page entry.
+    """
+    path = urlparse(url).path.lower()
+    kind = 'sitemap' if path.endswith(('.xml', '.xml.gz')) else 'page'
+    return SitemapEntry(loc=url, kind=kind)
+
+
+class SitemapReader:
+    """
+    Incrementally parses a (possibly gzipped) XML sitemap fed in byte chunks.
+
+    Each <url> or <sitemap> element is turned into a SitemapEntry as soon as it closes and is
+    then dropped from the tree, so memory use stays flat no matter how large the sitemap is.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._decompressor = None
+        self._started = False
+        self._root = None
+        self._depth = 0
+        self.failed = False
+
+    def feed(self, chunk):
+        """
+        Feed the next chunk of the sitemap body.
+
+        Args:
+            chunk (bytes): Raw (or gzip-compressed) sitemap bytes.
+
+        Returns:
+            list: The SitemapEntry objects completed by this chunk.
+        """
+        if self.failed or not chunk:
+            return []
+
+        if not self._started:
+            self._started = True
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self._decompressor is not None:
+            try:
+                chunk = self._decompressor.decompress(chunk)
+            except zlib.error as e:
+                print(f"Failed to decompress sitemap: {e}")
+                self.failed = True
+                return []
+
+        try:
+            self._parser.feed(chunk)
+            return list(self._read_entries())
+        except ET.ParseError as e:
+            print(f"Failed to parse XML: {e}")
+            self.failed = True
+            return []
+
+    def close(self):
+        """
+        Signal the end of the sitemap body.
+
+        Returns:
+            list: Any SitemapEntry objects completed by the final bytes.
+        """
+        if self.failed:
+            return []
+
+        entries = []
+        if self._decompressor is not None:
+            entries.extend(self.feed(self._decompressor.flush()))
+        try:
+            self._parser.close()
+            entries.extend(self._read_entries())
+        except ET.ParseError as e:
+            print(f"Failed to parse XML: {e}")
+            self.failed = True
+        return entries
+
+    def _read_entries(self):
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                self._depth += 1
+                continue
+
+            self._depth -= 1
+            name = _local_name(elem.tag)
+            if self._depth == 1 and name in ('url', 'sitemap'):
+                entry = self._build_entry(elem, name)
+                self._root.clear()
+                if entry is not None:
+                    yield entry
+
+    @staticmethod
+    def _build_entry(elem, name):
+        values = {}
+        for child in elem:
+            if child.text:
+                values[_local_name(child.tag)] = child.text.strip()
+
+        loc = values.get('loc')
+        if not loc:
+            return None
+
+        priority = None
+        if values.get('priority'):
+            try:
+                priority = float(values['priority'])
+            except ValueError:
+                pass
+
+        return SitemapEntry(
+            loc=loc,
+            kind='sitemap' if name == 'sitemap' else 'page',
+            lastmod=values.get('lastmod'),
+            priority=priority,
+        )
+
+
+def iter_sitemap_bytes(body):
+    """
+    Parse a sitemap body that has already been fetched.
+
+    Args:
+        body (bytes): The raw (or gzip-compressed) sitemap.
+
+    Returns:
+        generator: SitemapEntry objects in document order.
+    """
+    reader = SitemapReader()
+    for offset in range(0, len(body), CHUNK_SIZE):
+        yield from reader.feed(body[offset:offset + CHUNK_SIZE])
+    yield from reader.close()
+
+
+def iter_sitemap_file(file_path):
+    """
+    Stream the entries of a local sitemap file, gzipped or not.
+
+    Args:
+        file_path (str): The path to the sitemap file.
+
+    Returns:
+        generator: SitemapEntry objects in document order.
+    """
+    reader = SitemapReader()
+    try:
+        with open(file_path, 'rb') as file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield from reader.feed(chunk)
+    except IOError as e:
+        print(f"Failed to read file: {e}")
+        return
+    yield from reader.close()
+
+
+async def stream_sitemap_entries(url, session):
+    """
+    Fetch a sitemap and yield its entries while the body is still downloading.
+
+    Args:
+        url (str): The sitemap URL, optionally gzipped (.xml.gz).
+        session (aiohttp.ClientSession): The shared HTTP session.
+
+    Returns:
+        async generator: SitemapEntry objects in document order.
+    """
+    print(f"Making request to: {url}")
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=None, sock_read=30)) as response:
+            if response.status >= 400:
+                print(f"Failed to fetch sitemap {url}: HTTP {response.status}")
+                return
+
+            reader = SitemapReader()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                for entry in reader.feed(chunk):
+                    yield entry
+                if reader.failed:
+                    return
+            for entry in reader.close():
+                yield entry
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"Failed to fetch sitemap {url}: {e}")
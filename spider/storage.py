@@ -1,16 +1,24 @@
 import sqlite3
 import json
-from .schemas import PageData
+import queue
+import threading
+import time
+from .schemas import PageData, PageVersion, LinkStatus
+from .fingerprints import fingerprint_page, pack_signature, unpack_signature, find_near_duplicates, \
+    DEFAULT_DUPLICATE_THRESHOLD
 from .utils import get_default_db_location
 
 DB_FILE = str(get_default_db_location())
 
 
 def create_tables():
-    """Create the projects and pages tables if they don't exist."""
+    """Create the projects, pages and page detail tables if they don't exist."""
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
 
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing_tables = {row[0] for row in cursor.fetchall()}
+
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS projects (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,50 +53,736 @@ def create_tables():
         FOREIGN KEY (project_id) REFERENCES projects(id)
     )
     ''')
-    print(f'Created database tables at {DB_FILE}')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS link_status (
+        url TEXT PRIMARY KEY,
+        status INTEGER,
+        final_url TEXT,
+        checked_at REAL NOT NULL,
+        etag TEXT,
+        last_modified TEXT
+    )
+    ''')
+    add_missing_columns(cursor, 'pages', {
+        'etag': 'TEXT',
+        'last_modified': 'TEXT',
+        'lastmod': 'TEXT',
+        'body_hash': 'TEXT',
+        'rendered': 'BOOLEAN',
+        'crawled_at': 'REAL',
+    })
+    add_missing_columns(cursor, 'link_status', {
+        'final_status': 'INTEGER',
+        'redirect_chain': 'TEXT',
+    })
+    create_page_detail_tables(cursor)
+    if 'pages' in existing_tables and 'page_links' not in existing_tables:
+        backfill_page_details(cursor)
+    create_project_stats_table(cursor)
+    if 'projects' in existing_tables and 'project_stats' not in existing_tables:
+        rebuild_project_stats(cursor)
+    create_search_index(cursor)
+    if 'pages' in existing_tables and 'pages_fts' not in existing_tables:
+        backfill_search_index(cursor)
+    create_fingerprints_table(cursor)
+    if 'pages' in existing_tables and 'page_fingerprints' not in existing_tables:
+        backfill_fingerprints(cursor)
+    create_page_graph_table(cursor)
+    create_frontier_table(cursor)
+    create_crawl_runs_table(cursor)
+    create_cached_responses_table(cursor)
+    create_unique_page_index(cursor)
+    if not existing_tables:
+        print(f'Created database tables at {DB_FILE}')
     conn.commit()
     conn.close()
 
 
-def save_page_data(project_name: str, page_data: PageData):
-    try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
+def add_missing_columns(cursor, table, columns):
+    """
+    Add columns introduced after a table was first created.
 
-        cursor.execute("INSERT OR IGNORE INTO projects (project_name) VALUES (?)", (project_name,))
-        cursor.execute("SELECT id FROM projects WHERE project_name = ?", (project_name,))
-        project_id = cursor.fetchone()[0]
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the migration with.
+        table (str): The table to migrate.
+        columns (dict): Column names mapped to their SQL type declarations.
+    """
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, declaration in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {declaration}')
 
-        cursor.execute('''
-        INSERT OR REPLACE INTO pages (project_id, url, title, meta_description, canonical, robots, noindex, 
-                                      non_200_links, missing_alt_images, structured_data, headings, links, 
-                                      internal_links, external_links, hreflang, images, paragraphs, scripts, 
-                                      stylesheets, slug, url_parts)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            project_id,
-            page_data.url,
-            page_data.title,
-            page_data.meta_description,
-            page_data.canonical,
-            page_data.robots,
-            page_data.noindex,
-            json.dumps(page_data.non_200_links),
-            json.dumps(page_data.missing_alt_images),
-            json.dumps(page_data.structured_data),
-            json.dumps(page_data.headings),
-            json.dumps(page_data.links),
-            json.dumps(page_data.internal_links),
-            json.dumps(page_data.external_links),
-            json.dumps(page_data.hreflang),
-            json.dumps([image.dict() for image in page_data.images]),
-            json.dumps(page_data.paragraphs),
-            json.dumps(page_data.scripts),
-            json.dumps(page_data.stylesheets),
-            page_data.slug,
-            json.dumps(page_data.url_parts)
+
+def create_page_detail_tables(cursor):
+    """
+    Create the normalized tables holding each page's links, images, headings and hreflang alternates.
+
+    URLs are interned once in the urls table and referenced by id, so looking up every page
+    that links to a URL is an index seek instead of a scan over the JSON columns of pages.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS urls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT UNIQUE NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_links (
+        page_id INTEGER NOT NULL,
+        url_id INTEGER NOT NULL,
+        internal BOOLEAN NOT NULL,
+        broken BOOLEAN NOT NULL,
+        FOREIGN KEY (page_id) REFERENCES pages(id),
+        FOREIGN KEY (url_id) REFERENCES urls(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_images (
+        page_id INTEGER NOT NULL,
+        url_id INTEGER NOT NULL,
+        alt TEXT,
+        FOREIGN KEY (page_id) REFERENCES pages(id),
+        FOREIGN KEY (url_id) REFERENCES urls(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_headings (
+        page_id INTEGER NOT NULL,
+        level TEXT NOT NULL,
+        text TEXT NOT NULL,
+        FOREIGN KEY (page_id) REFERENCES pages(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_hreflang (
+        page_id INTEGER NOT NULL,
+        lang TEXT NOT NULL,
+        url_id INTEGER NOT NULL,
+        FOREIGN KEY (page_id) REFERENCES pages(id),
+        FOREIGN KEY (url_id) REFERENCES urls(id)
+    )
+    ''')
+
+    # Sorting by title treats a missing (NULL) title as '', so keyset pagination never skips those pages.
+    cursor.execute('DROP INDEX IF EXISTS idx_pages_project_title')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_project_title_sort ON pages (project_id, COALESCE(title, ''))")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pages_url ON pages (url)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_links_page ON page_links (page_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_links_url ON page_links (url_id, broken)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_links_broken ON page_links (url_id, page_id) WHERE broken')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_images_page ON page_images (page_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_images_url ON page_images (url_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_headings_page ON page_headings (page_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_headings_text ON page_headings (level, text)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_hreflang_page ON page_hreflang (page_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_hreflang_url ON page_hreflang (url_id)')
+
+
+def backfill_page_details(cursor):
+    """Populate the page detail tables from the JSON columns of pages saved before they existed."""
+    cursor.execute('''
+    SELECT id, links, internal_links, non_200_links, images, headings, hreflang
+    FROM pages
+    ''')
+    rows = cursor.fetchall()
+    for offset in range(0, len(rows), 500):
+        batch = rows[offset:offset + 500]
+        insert_page_details(cursor, [
+            (page_id, PageData(
+                url='',
+                links=json.loads(links or '[]'),
+                internal_links=json.loads(internal_links or '[]'),
+                non_200_links=json.loads(non_200_links or '[]'),
+                images=json.loads(images or '[]'),
+                headings=json.loads(headings or '{}'),
+                hreflang=json.loads(hreflang or '{}'),
+            ))
+            for page_id, links, internal_links, non_200_links, images, headings, hreflang in batch
+        ])
+    if rows:
+        print(f'Indexed links, images and headings of {len(rows)} existing pages')
+
+
+def intern_urls(cursor, urls):
+    """
+    Return the ids of the given URLs in the urls table, adding the ones not seen before.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        urls (iterable): The URLs to intern.
+
+    Returns:
+        dict: A mapping of URL to its id.
+    """
+    urls = list(dict.fromkeys(urls))
+    cursor.executemany('INSERT OR IGNORE INTO urls (url) VALUES (?)', [(url,) for url in urls])
+    url_ids = {}
+    # Stay well below SQLite's limit on bound parameters per statement.
+    for offset in range(0, len(urls), 500):
+        batch = urls[offset:offset + 500]
+        placeholders = ', '.join('?' for _ in batch)
+        cursor.execute(f'SELECT url, id FROM urls WHERE url IN ({placeholders})', batch)
+        url_ids.update(cursor.fetchall())
+    return url_ids
+
+
+def insert_page_details(cursor, pages):
+    """
+    Insert the links, images, headings and hreflang alternates of saved pages.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        pages (list): (page id, PageData) pairs.
+    """
+    url_ids = intern_urls(cursor, (
+        url
+        for _, page_data in pages
+        for url in (
+            page_data.links
+            + [image.src for image in page_data.images]
+            + list(page_data.hreflang.values())
+        )
+    ))
+
+    link_rows, image_rows, heading_rows, hreflang_rows = [], [], [], []
+    for page_id, page_data in pages:
+        internal_links = set(page_data.internal_links)
+        broken_links = set(page_data.non_200_links)
+        for link in dict.fromkeys(page_data.links):
+            link_rows.append((page_id, url_ids[link], link in internal_links, link in broken_links))
+        for image in page_data.images:
+            image_rows.append((page_id, url_ids[image.src], image.alt))
+        for level, texts in page_data.headings.items():
+            heading_rows.extend((page_id, level, text) for text in texts)
+        for lang, href in page_data.hreflang.items():
+            hreflang_rows.append((page_id, lang, url_ids[href]))
+
+    cursor.executemany('INSERT INTO page_links (page_id, url_id, internal, broken) VALUES (?, ?, ?, ?)', link_rows)
+    cursor.executemany('INSERT INTO page_images (page_id, url_id, alt) VALUES (?, ?, ?)', image_rows)
+    cursor.executemany('INSERT INTO page_headings (page_id, level, text) VALUES (?, ?, ?)', heading_rows)
+    cursor.executemany('INSERT INTO page_hreflang (page_id, lang, url_id) VALUES (?, ?, ?)', hreflang_rows)
+
+
+def delete_page_details(cursor, page_filter, params=()):
+    """
+    Delete the detail, fingerprint, graph and search index rows of the pages selected by a WHERE clause on pages.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        page_filter (str): A WHERE clause selecting rows of pages, or '' for every page.
+        params (tuple): Parameters bound into page_filter.
+    """
+    for table in ('page_links', 'page_images', 'page_headings', 'page_hreflang'):
+        cursor.execute(f'DELETE FROM {table} WHERE page_id IN (SELECT id FROM pages {page_filter})', params)
+    cursor.execute(f'DELETE FROM page_fingerprints WHERE page_id IN (SELECT id FROM pages {page_filter})', params)
+    cursor.execute(f'DELETE FROM page_graph WHERE page_id IN (SELECT id FROM pages {page_filter})', params)
+    cursor.execute(f'DELETE FROM pages_fts WHERE rowid IN (SELECT id FROM pages {page_filter})', params)
+
+
+def create_unique_page_index(cursor):
+    """
+    Make (project_id, url) unique in pages so a recrawl updates each page's row in place.
+
+    Crawls used to add a new row for a URL every time it was crawled. Those duplicates are
+    removed first, keeping the most recently saved row of each URL, and the project totals
+    are recomputed.
+    """
+    cursor.execute('PRAGMA index_list(pages)')
+    if any(row[1] == 'idx_pages_project_url' and row[2] for row in cursor.fetchall()):
+        return
+
+    page_filter = 'WHERE id NOT IN (SELECT MAX(id) FROM pages GROUP BY project_id, url)'
+    cursor.execute(f'SELECT COUNT(*) FROM pages {page_filter}')
+    duplicates = cursor.fetchone()[0]
+    if duplicates:
+        delete_page_details(cursor, page_filter)
+        cursor.execute(f'DELETE FROM pages {page_filter}')
+        rebuild_project_stats(cursor)
+        print(f'Removed {duplicates} duplicate page rows left by earlier crawls')
+    cursor.execute('DROP INDEX IF EXISTS idx_pages_project_url')
+    cursor.execute('CREATE UNIQUE INDEX idx_pages_project_url ON pages (project_id, url)')
+
+
+PROJECT_STATS_COLUMNS = (
+    'total_pages',
+    'noindex_pages',
+    'missing_title_pages',
+    'missing_meta_description_pages',
+    'missing_h1_pages',
+    'broken_links',
+    'broken_link_pages',
+    'missing_alt_images',
+    'missing_alt_pages',
+)
+
+
+def create_project_stats_table(cursor):
+    """
+    Create the project_stats table holding each project's report totals.
+
+    The totals are kept up to date as pages are saved and removed, so summaries are a
+    single-row lookup. rebuild_project_stats recomputes them from the pages.
+    """
+    columns = ',\n        '.join(f'{column} INTEGER NOT NULL DEFAULT 0' for column in PROJECT_STATS_COLUMNS)
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS project_stats (
+        project_id INTEGER PRIMARY KEY,
+        {columns},
+        last_crawled_at REAL,
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    )
+    ''')
+
+
+def page_stats(page_data: PageData):
+    """Return the contribution of one page to its project's totals."""
+    broken = set(page_data.non_200_links)
+    broken_links = sum(1 for link in dict.fromkeys(page_data.links) if link in broken)
+    return {
+        'total_pages': 1,
+        'noindex_pages': int(bool(page_data.noindex)),
+        'missing_title_pages': int(not page_data.title),
+        'missing_meta_description_pages': int(not page_data.meta_description),
+        'missing_h1_pages': int(not page_data.headings.get('h1')),
+        'broken_links': broken_links,
+        'broken_link_pages': int(broken_links > 0),
+        'missing_alt_images': len(page_data.missing_alt_images),
+        'missing_alt_pages': int(bool(page_data.missing_alt_images)),
+    }
+
+
+def update_project_stats(cursor, project_id: int, pages, sign=1):
+    """
+    Add the totals of saved pages to a project's stats, or subtract them with sign=-1.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        project_id (int): The project the pages belong to.
+        pages (list): PageData objects that were saved or removed.
+        sign (int): 1 when the pages were saved, -1 when they were removed.
+    """
+    totals = dict.fromkeys(PROJECT_STATS_COLUMNS, 0)
+    for page_data in pages:
+        for column, value in page_stats(page_data).items():
+            totals[column] += value
+
+    cursor.execute('INSERT OR IGNORE INTO project_stats (project_id) VALUES (?)', (project_id,))
+    assignments = ', '.join(f'{column} = {column} + ?' for column in PROJECT_STATS_COLUMNS)
+    params = [sign * totals[column] for column in PROJECT_STATS_COLUMNS]
+    if sign > 0:
+        assignments += ', last_crawled_at = ?'
+        params.append(time.time())
+    cursor.execute(f'UPDATE project_stats SET {assignments} WHERE project_id = ?', (*params, project_id))
+
+
+PROJECT_STATS_SQL = '''
+SELECT
+    projects.id AS project_id,
+    COUNT(pages.id) AS total_pages,
+    COALESCE(SUM(pages.noindex = 1), 0) AS noindex_pages,
+    COALESCE(SUM(pages.title IS NULL OR pages.title = ''), 0) AS missing_title_pages,
+    COALESCE(SUM(pages.meta_description IS NULL OR pages.meta_description = ''), 0)
+        AS missing_meta_description_pages,
+    COALESCE(SUM(NOT EXISTS (
+        SELECT 1 FROM page_headings WHERE page_headings.page_id = pages.id AND page_headings.level = 'h1'
+    )), 0) AS missing_h1_pages,
+    COALESCE(SUM((
+        SELECT COUNT(*) FROM page_links WHERE page_links.page_id = pages.id AND page_links.broken
+    )), 0) AS broken_links,
+    COALESCE(SUM(EXISTS (
+        SELECT 1 FROM page_links WHERE page_links.page_id = pages.id AND page_links.broken
+    )), 0) AS broken_link_pages,
+    COALESCE(SUM(json_array_length(pages.missing_alt_images)), 0) AS missing_alt_images,
+    COALESCE(SUM(json_array_length(pages.missing_alt_images) > 0), 0) AS missing_alt_pages
+FROM projects
+LEFT JOIN pages ON pages.project_id = projects.id
+{where}
+GROUP BY projects.id
+'''
+
+
+def compute_project_stats(cursor, project_id=None):
+    """
+    Recompute project totals from the pages with SQL aggregates.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the query with.
+        project_id (int, optional): The project to compute; every project if omitted.
+
+    Returns:
+        dict: A mapping of project id to a dictionary of PROJECT_STATS_COLUMNS.
+    """
+    if project_id is None:
+        cursor.execute(PROJECT_STATS_SQL.format(where=''))
+    else:
+        cursor.execute(PROJECT_STATS_SQL.format(where='WHERE projects.id = ?'), (project_id,))
+    return {row[0]: dict(zip(PROJECT_STATS_COLUMNS, row[1:])) for row in cursor.fetchall()}
+
+
+def rebuild_project_stats(cursor, project_id=None):
+    """
+    Replace the stored totals of one or every project with freshly computed ones.
+
+    The last crawl time of each project is kept.
+
+    Returns:
+        dict: The recomputed totals, as returned by compute_project_stats.
+    """
+    computed = compute_project_stats(cursor, project_id)
+    if project_id is None:
+        cursor.execute('DELETE FROM project_stats WHERE project_id NOT IN (SELECT id FROM projects)')
+    for stats_project_id, totals in computed.items():
+        cursor.execute('INSERT OR IGNORE INTO project_stats (project_id) VALUES (?)', (stats_project_id,))
+        assignments = ', '.join(f'{column} = ?' for column in PROJECT_STATS_COLUMNS)
+        cursor.execute(
+            f'UPDATE project_stats SET {assignments} WHERE project_id = ?',
+            (*(totals[column] for column in PROJECT_STATS_COLUMNS), stats_project_id),
+        )
+    return computed
+
+
+def create_search_index(cursor):
+    """
+    Create the pages_fts full-text index over each page's title, meta description, headings and paragraphs.
+
+    Rows share their rowid with pages, so search results join back to pages by primary key.
+    The project id is indexed as well, so restricting a search to one project is part of the
+    full-text match rather than a lookup of every matching page.
+    """
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+        title,
+        meta_description,
+        headings,
+        paragraphs,
+        project,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    ''')
+
+
+def search_row(project_id: int, page_id: int, page_data: PageData):
+    """Serialize a PageData object into a row of pages_fts."""
+    return (
+        page_id,
+        page_data.title,
+        page_data.meta_description,
+        '\n'.join(text for texts in page_data.headings.values() for text in texts),
+        '\n'.join(page_data.paragraphs),
+        str(project_id),
+    )
+
+
+def insert_search_rows(cursor, project_id: int, pages):
+    """
+    Add saved pages to the full-text index.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        project_id (int): The project the pages belong to.
+        pages (list): (page id, PageData) pairs.
+    """
+    cursor.executemany(
+        'INSERT INTO pages_fts (rowid, title, meta_description, headings, paragraphs, project) VALUES (?, ?, ?, ?, ?, ?)',
+        [search_row(project_id, page_id, page_data) for page_id, page_data in pages],
+    )
+
+
+def backfill_search_index(cursor):
+    """Add pages saved before the full-text index existed to it."""
+    cursor.execute('SELECT project_id, id, title, meta_description, headings, paragraphs FROM pages')
+    rows = cursor.fetchall()
+    for project_id, page_id, title, meta_description, headings, paragraphs in rows:
+        insert_search_rows(cursor, project_id, [(page_id, PageData(
+            title=title or '',
+            meta_description=meta_description or '',
+            headings=json.loads(headings or '{}'),
+            paragraphs=json.loads(paragraphs or '[]'),
+        ))])
+    if rows:
+        print(f'Added {len(rows)} existing pages to the search index')
+
+
+def create_fingerprints_table(cursor):
+    """Create the page_fingerprints table holding each page's duplicate-detection fingerprints."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_fingerprints (
+        page_id INTEGER PRIMARY KEY,
+        word_count INTEGER NOT NULL,
+        content_hash TEXT,
+        title_hash TEXT,
+        meta_description_hash TEXT,
+        h1_hash TEXT,
+        minhash BLOB,
+        FOREIGN KEY (page_id) REFERENCES pages(id)
+    )
+    ''')
+
+
+def insert_fingerprints(cursor, pages):
+    """
+    Store the fingerprints of saved pages, computing them for pages extracted without any.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        pages (list): (page id, PageData) pairs.
+    """
+    rows = []
+    for page_id, page_data in pages:
+        fingerprint = page_data.fingerprint or fingerprint_page(page_data)
+        rows.append((
+            page_id,
+            fingerprint.word_count,
+            fingerprint.content_hash,
+            fingerprint.title_hash,
+            fingerprint.meta_description_hash,
+            fingerprint.h1_hash,
+            pack_signature(fingerprint.minhash) if fingerprint.minhash else None,
         ))
+    cursor.executemany('''
+    INSERT OR REPLACE INTO page_fingerprints (page_id, word_count, content_hash, title_hash,
+                                              meta_description_hash, h1_hash, minhash)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+
+
+def backfill_fingerprints(cursor):
+    """Fingerprint pages saved before the page_fingerprints table existed."""
+    cursor.execute('SELECT id, title, meta_description, headings, paragraphs FROM pages')
+    rows = cursor.fetchall()
+    for offset in range(0, len(rows), 500):
+        insert_fingerprints(cursor, [
+            (page_id, PageData(
+                title=title or '',
+                meta_description=meta_description or '',
+                headings=json.loads(headings or '{}'),
+                paragraphs=json.loads(paragraphs or '[]'),
+            ))
+            for page_id, title, meta_description, headings, paragraphs in rows[offset:offset + 500]
+        ])
+    if rows:
+        print(f'Fingerprinted {len(rows)} existing pages')
+
+
+def create_page_graph_table(cursor):
+    """Create the page_graph table holding each page's internal link graph metrics."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS page_graph (
+        page_id INTEGER PRIMARY KEY,
+        inlinks INTEGER NOT NULL,
+        outlinks INTEGER NOT NULL,
+        pagerank REAL NOT NULL,
+        click_depth INTEGER,
+        orphan BOOLEAN NOT NULL,
+        FOREIGN KEY (page_id) REFERENCES pages(id)
+    )
+    ''')
+
+
+def create_frontier_table(cursor):
+    """
+    Create the frontier table holding the page and sitemap URLs of a project's crawl.
+
+    Crawl workers claim URLs by taking a time-limited lease on them, so several processes can
+    share one crawl, and URLs leased by a worker that stopped are picked up again once the
+    lease expires.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS frontier (
+        id INTEGER PRIMARY KEY,
+        project_id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        kind TEXT NOT NULL DEFAULT 'page',
+        state TEXT NOT NULL DEFAULT 'queued',
+        lease_owner TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        UNIQUE (project_id, url),
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    )
+    ''')
+    add_missing_columns(cursor, 'frontier', {'lastmod': 'TEXT', 'score': 'REAL NOT NULL DEFAULT 0'})
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_frontier_claim ON frontier(project_id, state, lease_expires)')
+    # Queued URLs are claimed highest score first; this index hands them out without sorting the frontier.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_frontier_score ON frontier(project_id, state, score DESC, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_frontier_owner ON frontier(lease_owner) WHERE lease_owner IS NOT NULL')
+
+
+PAGE_COLUMNS = (
+    'url', 'title', 'meta_description', 'canonical', 'robots', 'noindex', 'non_200_links', 'missing_alt_images',
+    'structured_data', 'headings', 'links', 'internal_links', 'external_links', 'hreflang', 'images', 'paragraphs',
+    'scripts', 'stylesheets', 'slug', 'url_parts', 'etag', 'last_modified', 'lastmod', 'body_hash', 'rendered',
+    'crawled_at',
+)
+
+UPSERT_PAGE_SQL = f'''
+INSERT INTO pages (project_id, {', '.join(PAGE_COLUMNS)})
+VALUES (?, {', '.join('?' for _ in PAGE_COLUMNS)})
+ON CONFLICT (project_id, url) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in PAGE_COLUMNS[1:])}
+RETURNING id
+'''
+
+
+def resolve_project_id(cursor, project_name: str):
+    """Return the id of a project, creating the project if it doesn't exist yet."""
+    cursor.execute("INSERT OR IGNORE INTO projects (project_name) VALUES (?)", (project_name,))
+    cursor.execute("SELECT id FROM projects WHERE project_name = ?", (project_name,))
+    return cursor.fetchone()[0]
+
+
+def page_row(project_id: int, page_data: PageData):
+    """Serialize a PageData object into a row for UPSERT_PAGE_SQL."""
+    version = page_data.version or PageVersion()
+    return (
+        project_id,
+        page_data.url,
+        page_data.title,
+        page_data.meta_description,
+        page_data.canonical,
+        page_data.robots,
+        page_data.noindex,
+        json.dumps(page_data.non_200_links),
+        json.dumps(page_data.missing_alt_images),
+        json.dumps(page_data.structured_data),
+        json.dumps(page_data.headings),
+        json.dumps(page_data.links),
+        json.dumps(page_data.internal_links),
+        json.dumps(page_data.external_links),
+        json.dumps(page_data.hreflang),
+        json.dumps([image.dict() for image in page_data.images]),
+        json.dumps(page_data.paragraphs),
+        json.dumps(page_data.scripts),
+        json.dumps(page_data.stylesheets),
+        page_data.slug,
+        json.dumps(page_data.url_parts),
+        version.etag,
+        version.last_modified,
+        version.lastmod,
+        version.body_hash,
+        version.rendered,
+        version.crawled_at or time.time(),
+    )
+
+
+def fetch_saved_pages(cursor, project_id: int, urls):
+    """
+    Fetch the ids and report fields of the saved pages of a project with the given URLs.
+
+    Returns:
+        list: (page id, PageData) pairs holding the fields page_stats needs.
+    """
+    saved = []
+    for offset in range(0, len(urls), 500):
+        batch = urls[offset:offset + 500]
+        placeholders = ', '.join('?' for _ in batch)
+        cursor.execute(f'''
+        SELECT id, url, title, meta_description, noindex, headings, links, non_200_links, missing_alt_images
+        FROM pages
+        WHERE project_id = ? AND url IN ({placeholders})
+        ''', (project_id, *batch))
+        for page_id, url, title, meta_description, noindex, headings, links, non_200_links, missing_alt_images \
+                in cursor.fetchall():
+            saved.append((page_id, PageData(
+                url=url,
+                title=title or '',
+                meta_description=meta_description or '',
+                noindex=bool(noindex),
+                headings=json.loads(headings or '{}'),
+                links=json.loads(links or '[]'),
+                non_200_links=json.loads(non_200_links or '[]'),
+                missing_alt_images=json.loads(missing_alt_images or '[]'),
+            )))
+    return saved
+
+
+def insert_pages(cursor, project_id: int, pages):
+    """
+    Save a batch of PageData objects with their detail, search, fingerprint and stats rows for a project.
+
+    A page whose URL the project already has replaces it in place, keeping its id: the old
+    page's detail, search, fingerprint and graph rows are deleted and its totals subtracted
+    from the project stats before the new ones are added.
+    """
+    # The last version of a URL crawled twice in one batch wins.
+    pages = list({page_data.url: page_data for page_data in pages}.values())
+    replaced = fetch_saved_pages(cursor, project_id, [page_data.url for page_data in pages])
+    if replaced:
+        update_project_stats(cursor, project_id, [page_data for _, page_data in replaced], sign=-1)
+        page_ids = [page_id for page_id, _ in replaced]
+        for offset in range(0, len(page_ids), 500):
+            batch = page_ids[offset:offset + 500]
+            delete_page_details(cursor, f"WHERE id IN ({', '.join('?' for _ in batch)})", batch)
 
+    saved = []
+    for page_data in pages:
+        cursor.execute(UPSERT_PAGE_SQL, page_row(project_id, page_data))
+        saved.append((cursor.fetchone()[0], page_data))
+    insert_page_details(cursor, saved)
+    insert_search_rows(cursor, project_id, saved)
+    insert_fingerprints(cursor, saved)
+    update_project_stats(cursor, project_id, pages)
+
+
+def touch_pages(cursor, project_id: int, versions):
+    """
+    Record that saved pages were crawled again and found unchanged, updating only their versions.
+
+    Args:
+        cursor (sqlite3.Cursor): The cursor to run the statements with.
+        project_id (int): The project the pages belong to.
+        versions (list): (url, PageVersion) pairs.
+    """
+    cursor.executemany('''
+    UPDATE pages SET etag = ?, last_modified = ?, lastmod = ?, crawled_at = ?
+    WHERE project_id = ? AND url = ?
+    ''', [
+        (version.etag, version.last_modified, version.lastmod, version.crawled_at, project_id, url)
+        for url, version in versions
+    ])
+    cursor.execute('UPDATE project_stats SET last_crawled_at = ? WHERE project_id = ?', (time.time(), project_id))
+
+
+def fetch_page_versions(project_id: int, urls):
+    """
+    Fetch how the saved pages of a project with the given URLs were last fetched.
+
+    Returns:
+        dict: A mapping of URL to PageVersion for every URL the project has a page for.
+    """
+    conn = sqlite3.connect(DB_FILE, timeout=60)
+    versions = {}
+    try:
+        cursor = conn.cursor()
+        for offset in range(0, len(urls), 500):
+            batch = urls[offset:offset + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            cursor.execute(f'''
+            SELECT url, etag, last_modified, lastmod, body_hash, rendered, crawled_at
+            FROM pages
+            WHERE project_id = ? AND url IN ({placeholders})
+            ''', (project_id, *batch))
+            for url, etag, last_modified, lastmod, body_hash, rendered, crawled_at in cursor.fetchall():
+                versions[url] = PageVersion(
+                    etag=etag,
+                    last_modified=last_modified,
+                    lastmod=lastmod,
+                    body_hash=body_hash,
+                    rendered=bool(rendered),
+                    crawled_at=crawled_at or 0.0,
+                )
+    finally:
+        conn.close()
+    return versions
+
+
+def save_page_data(project_name: str, page_data: PageData):
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        project_id = resolve_project_id(cursor, project_name)
+        insert_pages(cursor, project_id, [page_data])
         conn.commit()
     except Exception as e:
         print(f"Error saving data: {e}")
@@ -96,6 +790,152 @@ def save_page_data(project_name: str, page_data: PageData):
         conn.close()
 
 
+class PageWriter:
+    """
+    Saves crawl results for one project through a single long-lived SQLite connection.
+
+    Pages are handed to a background thread through a bounded queue, so the crawl never
+    waits on disk unless the writer falls far behind. The thread resolves the project id
+    once, switches the database to WAL mode and saves pages with insert_pages in one
+    transaction per `batch_size` pages, or every `flush_interval` seconds, whichever
+    comes first. Each page row is upserted on its own to get its id back (RETURNING id);
+    its link, image, heading, search and fingerprint rows are inserted with executemany.
+
+    Pages found unchanged by a recrawl are handed over with `touch` instead, which only
+    updates their saved version.
+
+    Given the Frontier of the crawl, each page's URL is marked done in the same transaction
+    that saves the page, so a crawl stopped at any point never counts a page as crawled that
+    wasn't saved.
+
+    Usage:
+        with PageWriter(project_name) as writer:
+            writer.write(page_data)
+    """
+
+    _STOP = object()
+    _FLUSH = object()
+
+    def __init__(self, project_name: str, batch_size=200, flush_interval=2.0, max_queued=1000, frontier=None):
+        self.project_name = project_name
+        self.frontier = frontier
+        if frontier is not None:
+            frontier.writer = self
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.rows_touched = 0
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=self._run, name='seowayfinder-page-writer', daemon=True)
+        self._started = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self._thread.start()
+
+    def write(self, page_data: PageData):
+        """Queue a page to be saved. Blocks only when the queue is full."""
+        self._queue.put(page_data)
+
+    def touch(self, url: str, version: PageVersion):
+        """Queue an update of the version of a saved page that was crawled again and found unchanged."""
+        self._queue.put((url, version))
+
+    def flush(self):
+        """Ask the writer to save the pages queued so far now, without waiting for a full batch."""
+        if self._started:
+            self._queue.put(self._FLUSH)
+
+    def close(self):
+        """Flush every queued page and stop the writer thread."""
+        if self._started:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._started = False
+
+    def _run(self):
+        conn = sqlite3.connect(DB_FILE, timeout=60 if self.frontier is not None else 5)
+        stopping = False
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-20000')
+            cursor = conn.cursor()
+            project_id = resolve_project_id(cursor, self.project_name)
+            conn.commit()
+
+            batch = []
+            last_flush = time.monotonic()
+            while not stopping:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                flushing = False
+                try:
+                    item = self._queue.get(timeout=timeout)
+                    if item is self._STOP:
+                        stopping = True
+                    elif item is self._FLUSH:
+                        flushing = True
+                    else:
+                        batch.append(item)
+                except queue.Empty:
+                    pass
+
+                if batch and (stopping or flushing or len(batch) >= self.batch_size
+                              or time.monotonic() - last_flush >= self.flush_interval):
+                    self._flush(conn, cursor, project_id, batch)
+                    batch = []
+                if not batch:
+                    last_flush = time.monotonic()
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            if not stopping:
+                self._drain()
+        finally:
+            conn.close()
+
+    def _flush(self, conn, cursor, project_id, batch):
+        pages = [item for item in batch if isinstance(item, PageData)]
+        touched = [item for item in batch if not isinstance(item, PageData)]
+        urls = [page.url for page in pages] + [url for url, _ in touched]
+        try:
+            if pages:
+                insert_pages(cursor, project_id, pages)
+            if touched:
+                touch_pages(cursor, project_id, touched)
+            if self.frontier is not None:
+                # Pages still queued after the crawl stopped and released its leases are saved now.
+                mark_frontier_urls(cursor, project_id, self.frontier.worker_id, urls, requeued=True)
+            conn.commit()
+            self.rows_written += len(pages)
+            self.rows_touched += len(touched)
+        except Exception as e:
+            conn.rollback()
+            if len(batch) > 1:
+                # One bad page rolls back the whole batch; save the pages one at a time, each in
+                # its own transaction, so only that page is lost.
+                for item in batch:
+                    self._flush(conn, cursor, project_id, [item])
+                return
+            print(f"Error saving {urls[0]}: {e}")
+            if self.frontier is not None:
+                # Otherwise the page would stay leased, and be renewed, for as long as the crawl runs.
+                self.frontier.finish(urls, ok=False)
+
+    def _drain(self):
+        # Keep consuming after a fatal error so producers never block on a full queue.
+        while self._queue.get() is not self._STOP:
+            pass
+
+
 def fetch_all_project_names():
     """Fetch all project names from the database."""
     conn = sqlite3.connect(DB_FILE)
@@ -109,32 +949,243 @@ def fetch_all_project_names():
     return [name[0] for name in project_names]
 
 
-def fetch_pages_by_project(project_name: str):
+JSON_PAGE_COLUMNS = ('non_200_links', 'missing_alt_images', 'structured_data', 'headings', 'links', 'internal_links',
+                     'external_links', 'hreflang', 'images', 'paragraphs', 'scripts', 'stylesheets', 'url_parts')
+
+EXPORT_FIELDS = {
+    'id': 'pages.id',
+    'url': 'pages.url',
+    'title': 'pages.title',
+    'meta_description': 'pages.meta_description',
+    'canonical': 'pages.canonical',
+    'robots': 'pages.robots',
+    'noindex': 'pages.noindex',
+    'slug': 'pages.slug',
+    **{column: f'pages.{column}' for column in JSON_PAGE_COLUMNS},
+    'word_count': 'page_fingerprints.word_count',
+    'inlinks': 'page_graph.inlinks',
+    'outlinks': 'page_graph.outlinks',
+    'pagerank': 'page_graph.pagerank',
+    'click_depth': 'page_graph.click_depth',
+    'orphan': 'page_graph.orphan',
+}
+
+
+def check_export_fields(fields):
+    """Raise ValueError if any of the fields isn't one of EXPORT_FIELDS."""
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}, expected any of {', '.join(EXPORT_FIELDS)}")
+
+
+def iter_project_pages(project_name: str, fields=None, chunk_size=1000, decode_json=True):
     """
-    Fetch all pages for a specific project from the database.
+    Stream the pages of a project from the database in id order.
+
+    Only the requested columns are selected, and rows are pulled from a single cursor
+    `chunk_size` at a time, so memory use does not grow with the size of the project.
+    Boolean columns are converted.
+
+    Args:
+        project_name (str): The project to read.
+        fields (list, optional): The EXPORT_FIELDS to select, in order. Defaults to all of them.
+        chunk_size (int): The number of rows fetched at a time.
+        decode_json (bool): Decode JSON_PAGE_COLUMNS; if False they are yielded as stored JSON text.
+
+    Yields:
+        dict: One page, keyed by field name.
     """
+    fields = list(fields or EXPORT_FIELDS)
+    check_export_fields(fields)
+
+    expressions = [EXPORT_FIELDS[field] for field in fields]
+    joins = ['JOIN projects ON projects.id = pages.project_id']
+    for table in ('page_fingerprints', 'page_graph'):
+        if any(expression.startswith(f'{table}.') for expression in expressions):
+            joins.append(f'LEFT JOIN {table} ON {table}.page_id = pages.id')
+    json_fields = [index for index, field in enumerate(fields) if decode_json and field in JSON_PAGE_COLUMNS]
+    bool_fields = [index for index, field in enumerate(fields) if field in ('noindex', 'orphan')]
+
     conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT {', '.join(expressions)}
+        FROM pages
+        {' '.join(joins)}
+        WHERE projects.project_name = ?
+        ORDER BY pages.id
+        ''', (project_name,))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                row = list(row)
+                for index in json_fields:
+                    row[index] = json.loads(row[index]) if row[index] is not None else None
+                for index in bool_fields:
+                    row[index] = bool(row[index]) if row[index] is not None else None
+                yield dict(zip(fields, row))
+    finally:
+        conn.close()
 
-    cursor.execute('''
-    SELECT *
+
+PAGE_SORT_COLUMNS = ('url', 'title')
+# What each sort column orders by. NULL never compares greater or less than a keyset value, so
+# titles are sorted with NULL as ''.
+_PAGE_SORT_EXPRESSIONS = {'url': 'pages.url', 'title': "COALESCE(pages.title, '')"}
+
+
+def fetch_project_pages(project_name: str, sort='url', descending=False, after=None, limit=100,
+                        url_contains=None, noindex=None):
+    """
+    Fetch one page of a project's page list with only the columns a listing needs.
+
+    Pages are paginated by keyset: pass the `next_after` value of one result to `after` to
+    fetch the following page. Each query is an index range scan on (project_id, sort column),
+    so its cost does not depend on how deep into the listing it is.
+
+    Args:
+        project_name (str): The project to list.
+        sort (str): One of PAGE_SORT_COLUMNS.
+        descending (bool): Sort in descending order.
+        after (tuple, optional): The (sort value, page id) of the last page already shown.
+        limit (int): The maximum number of pages to return.
+        url_contains (str, optional): Only list pages whose URL contains this text.
+        noindex (bool, optional): Only list pages with (True) or without (False) noindex.
+
+    Returns:
+        dict: `pages`, a list of dictionaries with the id, url, title, noindex flag and link graph
+        metrics (None until the graph is analyzed) of each page, and `next_after`, the keyset of
+        the following page or None on the last page.
+    """
+    if sort not in PAGE_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort column '{sort}', expected one of {', '.join(PAGE_SORT_COLUMNS)}")
+
+    direction = 'DESC' if descending else 'ASC'
+    sort_expression = _PAGE_SORT_EXPRESSIONS[sort]
+    conditions = ['projects.project_name = ?']
+    params = [project_name]
+    if after is not None:
+        # SQLite only seeks an expression index by the row value with the extra single-column bound.
+        operator = '<' if descending else '>'
+        conditions.append(f"{sort_expression} {operator}= ? AND ({sort_expression}, pages.id) {operator} (?, ?)")
+        params.extend((after[0], *after))
+    if url_contains:
+        conditions.append("pages.url LIKE ? ESCAPE '\\'")
+        escaped = url_contains.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params.append(f'%{escaped}%')
+    if noindex is not None:
+        conditions.append('pages.noindex = ?')
+        params.append(bool(noindex))
+
+    pages = _fetch_page_rows(f'''
+    SELECT pages.id, pages.url, pages.title, pages.noindex,
+           page_graph.inlinks, page_graph.pagerank, page_graph.click_depth, page_graph.orphan
     FROM pages
     JOIN projects ON projects.id = pages.project_id
+    LEFT JOIN page_graph ON page_graph.page_id = pages.id
+    WHERE {' AND '.join(conditions)}
+    ORDER BY {sort_expression} {direction}, pages.id {direction}
+    LIMIT ?
+    ''', (*params, limit + 1))
+
+    next_after = None
+    if len(pages) > limit:
+        pages = pages[:limit]
+        next_after = (pages[-1][sort] or '', pages[-1]['id'])
+    return {'pages': pages, 'next_after': next_after}
+
+
+def fetch_project_summary(project_name: str):
+    """
+    Fetch a project's report totals from project_stats.
+
+    Returns:
+        dict: PROJECT_STATS_COLUMNS and last_crawled_at, or None if the project doesn't exist.
+    """
+    rows = _fetch_page_rows(f'''
+    SELECT projects.project_name, {', '.join(f'COALESCE(project_stats.{column}, 0) AS {column}' for column in PROJECT_STATS_COLUMNS)},
+           project_stats.last_crawled_at
+    FROM projects
+    LEFT JOIN project_stats ON project_stats.project_id = projects.id
     WHERE projects.project_name = ?
     ''', (project_name,))
+    return rows[0] if rows else None
 
-    rows = cursor.fetchall()
-    conn.close()
 
-    return rows
+def fetch_project_summaries():
+    """
+    Fetch the report totals of every project from project_stats.
+
+    Returns:
+        list: Dictionaries with the project_name, PROJECT_STATS_COLUMNS and last_crawled_at of each project.
+    """
+    return _fetch_page_rows(f'''
+    SELECT projects.project_name, {', '.join(f'COALESCE(project_stats.{column}, 0) AS {column}' for column in PROJECT_STATS_COLUMNS)},
+           project_stats.last_crawled_at
+    FROM projects
+    LEFT JOIN project_stats ON project_stats.project_id = projects.id
+    ORDER BY projects.project_name
+    ''', ())
+
+
+def check_project_stats(project_name=None, rebuild=False):
+    """
+    Compare the stored project totals with totals recomputed from the pages.
+
+    Args:
+        project_name (str, optional): The project to check; every project if omitted.
+        rebuild (bool): Replace the stored totals with the recomputed ones.
+
+    Returns:
+        dict: A mapping of project name to {column: (stored, computed)} for every column that
+        differs, or None if the named project doesn't exist.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        project_id = None
+        if project_name is not None:
+            cursor.execute('SELECT id FROM projects WHERE project_name = ?', (project_name,))
+            project = cursor.fetchone()
+            if not project:
+                return None
+            project_id = project[0]
+
+        cursor.execute('SELECT id, project_name FROM projects')
+        names = dict(cursor.fetchall())
+        cursor.execute(f'SELECT project_id, {", ".join(PROJECT_STATS_COLUMNS)} FROM project_stats')
+        stored = {row[0]: dict(zip(PROJECT_STATS_COLUMNS, row[1:])) for row in cursor.fetchall()}
+
+        computed = rebuild_project_stats(cursor, project_id) if rebuild else compute_project_stats(cursor, project_id)
+        conn.commit()
+
+        mismatches = {}
+        for computed_project_id, totals in computed.items():
+            stored_totals = stored.get(computed_project_id, dict.fromkeys(PROJECT_STATS_COLUMNS, 0))
+            differences = {
+                column: (stored_totals[column], totals[column])
+                for column in PROJECT_STATS_COLUMNS
+                if stored_totals[column] != totals[column]
+            }
+            if differences:
+                mismatches[names[computed_project_id]] = differences
+        return mismatches
+    finally:
+        conn.close()
 
 
 def clear_all_data():
-    """Remove all data from the projects and pages tables."""
+    """Remove all data from the projects, pages, page detail and project stats tables."""
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
 
     try:
+        for table in ('page_links', 'page_images', 'page_headings', 'page_hreflang', 'urls', 'project_stats',
+                      'pages_fts', 'page_fingerprints', 'page_graph', 'frontier', 'crawl_runs', 'cached_responses'):
+            cursor.execute(f'DELETE FROM {table}')
         cursor.execute('DELETE FROM pages')
         cursor.execute('DELETE FROM projects')
 
@@ -152,8 +1203,9 @@ def fetch_page_data_by_id(page_id: int):
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
 
-    cursor.execute('''
-    SELECT pages.*, projects.project_name
+    cursor.execute(f'''
+    SELECT pages.id, pages.project_id, {', '.join(f'pages.{column}' for column in PAGE_COLUMNS[:20])},
+           projects.project_name
     FROM pages
     JOIN projects ON pages.project_id = projects.id
     WHERE pages.id = ?
@@ -205,7 +1257,12 @@ def remove_project_by_name(project_name: str):
 
         project_id = project[0]
 
+        delete_page_details(cursor, 'WHERE project_id = ?', (project_id,))
         cursor.execute('DELETE FROM pages WHERE project_id = ?', (project_id,))
+        cursor.execute('DELETE FROM project_stats WHERE project_id = ?', (project_id,))
+        cursor.execute('DELETE FROM frontier WHERE project_id = ?', (project_id,))
+        cursor.execute('DELETE FROM crawl_runs WHERE project_id = ?', (project_id,))
+        cursor.execute('DELETE FROM cached_responses WHERE project_id = ?', (project_id,))
         cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
 
         conn.commit()
@@ -215,3 +1272,1036 @@ def remove_project_by_name(project_name: str):
         return False
     finally:
         conn.close()
+
+
+def _fetch_page_rows(query, params):
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def fetch_inlinks(project_name: str, url: str, broken_only=False):
+    """
+    Fetch the pages of a project that link to a URL.
+
+    Args:
+        project_name (str): The project to search.
+        url (str): The link target.
+        broken_only (bool): Only return pages on which the link was recorded as non-200.
+
+    Returns:
+        list: Dictionaries with the id, url and title of each linking page.
+    """
+    return _fetch_page_rows(f'''
+    SELECT pages.id, pages.url, pages.title
+    FROM urls
+    JOIN page_links ON page_links.url_id = urls.id
+    JOIN pages ON pages.id = page_links.page_id
+    JOIN projects ON projects.id = pages.project_id
+    WHERE urls.url = ? AND projects.project_name = ?{' AND page_links.broken' if broken_only else ''}
+    ORDER BY pages.url
+    ''', (url, project_name))
+
+
+def fetch_outlinks(page_id: int):
+    """
+    Fetch the links of a page along with whether each one is internal and broken.
+
+    Returns:
+        list: Dictionaries with the url, internal and broken flags of each link.
+    """
+    return _fetch_page_rows('''
+    SELECT urls.url, page_links.internal, page_links.broken
+    FROM page_links
+    JOIN urls ON urls.id = page_links.url_id
+    WHERE page_links.page_id = ?
+    ORDER BY urls.url
+    ''', (page_id,))
+
+
+def fetch_broken_links(project_name: str):
+    """
+    Fetch every non-200 link target of a project with the number of pages linking to it.
+
+    The CROSS JOIN makes SQLite start from the few broken links instead of every page of the project.
+
+    Returns:
+        list: Dictionaries with the url and inlinks count of each broken link, most linked first.
+    """
+    return _fetch_page_rows('''
+    SELECT urls.url, COUNT(*) AS inlinks
+    FROM page_links
+    CROSS JOIN pages ON pages.id = page_links.page_id
+    JOIN projects ON projects.id = pages.project_id
+    JOIN urls ON urls.id = page_links.url_id
+    WHERE projects.project_name = ? AND page_links.broken
+    GROUP BY page_links.url_id
+    ORDER BY inlinks DESC, urls.url
+    ''', (project_name,))
+
+
+def fetch_pages_by_heading(project_name: str, text: str, level='h1'):
+    """
+    Fetch the pages of a project that have a heading with the given text.
+
+    Returns:
+        list: Dictionaries with the id, url and title of each matching page.
+    """
+    return _fetch_page_rows('''
+    SELECT DISTINCT pages.id, pages.url, pages.title
+    FROM page_headings
+    JOIN pages ON pages.id = page_headings.page_id
+    JOIN projects ON projects.id = pages.project_id
+    WHERE page_headings.level = ? AND page_headings.text = ? AND projects.project_name = ?
+    ORDER BY pages.url
+    ''', (level, text, project_name))
+
+
+def fetch_shared_headings(project_name: str, level='h1'):
+    """
+    Fetch the headings of a level that appear on more than one page of a project.
+
+    Returns:
+        list: Dictionaries with the heading text and the number of pages using it, most shared first.
+    """
+    return _fetch_page_rows('''
+    SELECT page_headings.text, COUNT(DISTINCT page_headings.page_id) AS pages
+    FROM page_headings
+    JOIN pages ON pages.id = page_headings.page_id
+    JOIN projects ON projects.id = pages.project_id
+    WHERE page_headings.level = ? AND projects.project_name = ?
+    GROUP BY page_headings.text
+    HAVING pages > 1
+    ORDER BY pages DESC, page_headings.text
+    ''', (level, project_name))
+
+
+def fetch_pages_by_image(project_name: str, src: str):
+    """
+    Fetch the pages of a project that embed an image.
+
+    Returns:
+        list: Dictionaries with the id, url, title and image alt text of each page.
+    """
+    return _fetch_page_rows('''
+    SELECT pages.id, pages.url, pages.title, page_images.alt
+    FROM urls
+    JOIN page_images ON page_images.url_id = urls.id
+    JOIN pages ON pages.id = page_images.page_id
+    JOIN projects ON projects.id = pages.project_id
+    WHERE urls.url = ? AND projects.project_name = ?
+    ORDER BY pages.url
+    ''', (src, project_name))
+
+
+def fetch_hreflang_referrers(project_name: str, url: str):
+    """
+    Fetch the pages of a project that declare a URL as an hreflang alternate.
+
+    Returns:
+        list: Dictionaries with the id, url and declared language of each page.
+    """
+    return _fetch_page_rows('''
+    SELECT pages.id, pages.url, page_hreflang.lang
+    FROM urls
+    JOIN page_hreflang ON page_hreflang.url_id = urls.id
+    JOIN pages ON pages.id = page_hreflang.page_id
+    JOIN projects ON projects.id = pages.project_id
+    WHERE urls.url = ? AND projects.project_name = ?
+    ORDER BY pages.url
+    ''', (url, project_name))
+
+
+# Duplicate report fields mapped to their fingerprint column, a SQL expression for their text and a label.
+DUPLICATE_FIELDS = {
+    'title': ('title_hash', 'pages.title', 'Titles'),
+    'meta_description': ('meta_description_hash', 'pages.meta_description', 'Meta Descriptions'),
+    'h1': ('h1_hash', "(SELECT text FROM page_headings WHERE page_headings.page_id = pages.id AND level = 'h1' LIMIT 1)", 'H1s'),
+    'content': ('content_hash', 'pages.url', 'Body Text'),
+}
+
+
+def fetch_exact_duplicates(project_name: str, field: str, limit=100):
+    """
+    Fetch groups of pages of a project whose title, meta description, first H1 or body text is identical.
+
+    Texts are compared after normalizing case, punctuation and whitespace.
+
+    Args:
+        project_name (str): The project to search.
+        field (str): One of DUPLICATE_FIELDS.
+        limit (int): The maximum number of groups to return.
+
+    Returns:
+        list: Dictionaries with a sample text of the group, the number of pages and their ids,
+        largest groups first.
+    """
+    column, sample, _ = DUPLICATE_FIELDS[field]
+    groups = _fetch_page_rows(f'''
+    SELECT MIN({sample}) AS sample, COUNT(*) AS pages, GROUP_CONCAT(pages.id) AS page_ids
+    FROM pages
+    JOIN projects ON projects.id = pages.project_id
+    JOIN page_fingerprints ON page_fingerprints.page_id = pages.id
+    WHERE projects.project_name = ? AND page_fingerprints.{column} IS NOT NULL
+    GROUP BY page_fingerprints.{column}
+    HAVING pages > 1
+    ORDER BY pages DESC, sample
+    LIMIT ?
+    ''', (project_name, limit))
+    for group in groups:
+        group['page_ids'] = [int(page_id) for page_id in group['page_ids'].split(',')]
+    return groups
+
+
+def fetch_thin_pages(project_name: str, max_words=200, limit=100):
+    """
+    Fetch the pages of a project with fewer body text words than max_words.
+
+    Returns:
+        dict: `total`, the number of thin pages, and `pages`, dictionaries with the id, url,
+        title and word_count of the thinnest pages.
+    """
+    params = (project_name, max_words)
+    condition = '''
+    FROM pages
+    JOIN projects ON projects.id = pages.project_id
+    JOIN page_fingerprints ON page_fingerprints.page_id = pages.id
+    WHERE projects.project_name = ? AND page_fingerprints.word_count < ?
+    '''
+    total = _fetch_page_rows(f'SELECT COUNT(*) AS total {condition}', params)[0]['total']
+    pages = _fetch_page_rows(f'''
+    SELECT pages.id, pages.url, pages.title, page_fingerprints.word_count
+    {condition}
+    ORDER BY page_fingerprints.word_count, pages.url
+    LIMIT ?
+    ''', (*params, limit))
+    return {'total': total, 'pages': pages}
+
+
+def fetch_near_duplicates(project_name: str, threshold=DEFAULT_DUPLICATE_THRESHOLD, min_words=0):
+    """
+    Find clusters of pages of a project with near-identical body text.
+
+    Only the MinHash signatures are loaded; candidate pairs come from an LSH index, so the
+    work grows roughly linearly with the size of the project.
+
+    Args:
+        project_name (str): The project to search.
+        threshold (float): The minimum estimated Jaccard similarity of pages in a cluster.
+        min_words (int): Ignore pages with fewer body text words than this.
+
+    Returns:
+        list: Clusters, largest first, each a list of dictionaries with the id, url, title,
+        word_count and estimated similarity to the first page of the cluster.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+        SELECT page_fingerprints.page_id, page_fingerprints.minhash
+        FROM page_fingerprints
+        JOIN pages ON pages.id = page_fingerprints.page_id
+        JOIN projects ON projects.id = pages.project_id
+        WHERE projects.project_name = ? AND page_fingerprints.minhash IS NOT NULL
+              AND page_fingerprints.word_count >= ?
+        ''', (project_name, min_words))
+        clusters = find_near_duplicates(
+            ((page_id, unpack_signature(minhash)) for page_id, minhash in cursor),
+            threshold,
+        )
+
+        page_ids = [page_id for cluster in clusters for page_id, _ in cluster]
+        pages = {}
+        for offset in range(0, len(page_ids), 500):
+            batch = page_ids[offset:offset + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            cursor.execute(f'''
+            SELECT pages.id, pages.url, pages.title, page_fingerprints.word_count
+            FROM pages
+            JOIN page_fingerprints ON page_fingerprints.page_id = pages.id
+            WHERE pages.id IN ({placeholders})
+            ''', batch)
+            for page_id, url, title, word_count in cursor.fetchall():
+                pages[page_id] = {'id': page_id, 'url': url, 'title': title, 'word_count': word_count}
+    finally:
+        conn.close()
+
+    return [
+        [dict(pages[page_id], similarity=similarity) for page_id, similarity in cluster]
+        for cluster in clusters
+    ]
+
+
+def fetch_pages_by_ids(page_ids):
+    """
+    Fetch the id, url and title of the given pages.
+
+    Returns:
+        dict: A mapping of page id to a dictionary with its id, url and title.
+    """
+    page_ids = list(page_ids)
+    pages = {}
+    for offset in range(0, len(page_ids), 500):
+        batch = page_ids[offset:offset + 500]
+        placeholders = ', '.join('?' for _ in batch)
+        for page in _fetch_page_rows(f'SELECT id, url, title FROM pages WHERE id IN ({placeholders})', batch):
+            pages[page['id']] = page
+    return pages
+
+
+def fetch_link_graph(project_name: str):
+    """
+    Fetch the pages and internal links of a project as id pairs for building its link graph.
+
+    Returns:
+        tuple: `pages`, a list of (page id, url) for every page, `links`, a list of (linking page
+        id, linked url id) for every internal link, and `link_urls`, a list of (url id, url) for
+        every URL those links point to. None if the project doesn't exist.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM projects WHERE project_name = ?', (project_name,))
+        project = cursor.fetchone()
+        if not project:
+            return None
+
+        cursor.execute('SELECT id, url FROM pages WHERE project_id = ? ORDER BY id', project)
+        pages = cursor.fetchall()
+
+        cursor.execute('''
+        SELECT page_links.page_id, page_links.url_id
+        FROM pages
+        JOIN page_links ON page_links.page_id = pages.id
+        WHERE pages.project_id = ? AND page_links.internal
+        ''', project)
+        links = cursor.fetchall()
+
+        cursor.execute('''
+        SELECT urls.id, urls.url
+        FROM urls
+        WHERE urls.id IN (
+            SELECT page_links.url_id
+            FROM pages
+            JOIN page_links ON page_links.page_id = pages.id
+            WHERE pages.project_id = ? AND page_links.internal
+        )
+        ''', project)
+        link_urls = cursor.fetchall()
+        return pages, links, link_urls
+    finally:
+        conn.close()
+
+
+def save_page_graph(rows):
+    """
+    Store the link graph metrics of pages, replacing earlier results.
+
+    Args:
+        rows (iterable): (page id, inlinks, outlinks, pagerank, click depth, orphan) tuples.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.executemany('''
+        INSERT OR REPLACE INTO page_graph (page_id, inlinks, outlinks, pagerank, click_depth, orphan)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    except Exception as e:
+        print(f"Error saving link graph: {e}")
+    finally:
+        conn.close()
+
+
+PAGE_GRAPH_ORDERS = {
+    'pagerank': 'page_graph.pagerank DESC',
+    'inlinks': 'page_graph.inlinks DESC',
+    'click_depth': 'page_graph.click_depth IS NULL DESC, page_graph.click_depth DESC',
+}
+
+
+def fetch_page_graph(project_name: str, order_by='pagerank', orphans_only=False, limit=20):
+    """
+    Fetch pages of a project with their stored link graph metrics.
+
+    Args:
+        project_name (str): The project to list.
+        order_by (str): One of PAGE_GRAPH_ORDERS; click_depth lists unreachable and deepest pages first.
+        orphans_only (bool): Only list pages no other page links to.
+        limit (int): The maximum number of pages to return.
+
+    Returns:
+        list: Dictionaries with the id, url, inlinks, outlinks, pagerank, click_depth and orphan flag of each page.
+    """
+    return _fetch_page_rows(f'''
+    SELECT pages.id, pages.url, page_graph.inlinks, page_graph.outlinks, page_graph.pagerank,
+           page_graph.click_depth, page_graph.orphan
+    FROM pages
+    JOIN projects ON projects.id = pages.project_id
+    JOIN page_graph ON page_graph.page_id = pages.id
+    WHERE projects.project_name = ?{' AND page_graph.orphan' if orphans_only else ''}
+    ORDER BY {PAGE_GRAPH_ORDERS[order_by]}, pages.url
+    LIMIT ?
+    ''', (project_name, limit))
+
+
+FRONTIER_STATES = ('queued', 'leased', 'done', 'failed')
+
+
+def _connect_frontier():
+    # Many crawl processes write the frontier at once; wait for the write lock instead of failing.
+    conn = sqlite3.connect(DB_FILE, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+def create_crawl_runs_table(cursor):
+    """
+    Create the crawl_runs table recording each crawl of a project and its last checkpoint.
+
+    A run's progress lives in the project's frontier: its done URLs are the visited set, its
+    queued URLs what is left to crawl and its sitemap rows how far nested sitemaps were read.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS crawl_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        input TEXT,
+        status TEXT NOT NULL DEFAULT 'running',
+        started_at REAL NOT NULL,
+        checkpoint_at REAL,
+        finished_at REAL,
+        pages_done INTEGER NOT NULL DEFAULT 0,
+        urls_failed INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (project_id) REFERENCES projects(id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crawl_runs_project ON crawl_runs(project_id)')
+
+
+CRAWL_RUN_STATUSES = ('running', 'interrupted', 'finished', 'abandoned')
+
+CRAWL_RUN_COLUMNS = '''
+crawl_runs.id, projects.project_name, crawl_runs.project_id, crawl_runs.input, crawl_runs.status,
+crawl_runs.started_at, crawl_runs.checkpoint_at, crawl_runs.finished_at, crawl_runs.pages_done, crawl_runs.urls_failed
+'''
+
+
+def _fetch_crawl_run(cursor, run_id):
+    cursor.execute(f'''
+    SELECT {CRAWL_RUN_COLUMNS}
+    FROM crawl_runs JOIN projects ON projects.id = crawl_runs.project_id
+    WHERE crawl_runs.id = ?
+    ''', (run_id,))
+    row = cursor.fetchone()
+    return dict(zip([column[0] for column in cursor.description], row)) if row else None
+
+
+def _latest_crawl_run_id(cursor, project_id):
+    cursor.execute('SELECT MAX(id) FROM crawl_runs WHERE project_id = ?', (project_id,))
+    return cursor.fetchone()[0]
+
+
+def start_frontier(project_name: str, crawl_input=None, join=False):
+    """
+    Prepare a project's frontier for a crawl worker, starting a new crawl run or joining one.
+
+    With `join`, the worker joins the run in progress if the frontier still has queued or leased
+    URLs. Otherwise a new run is recorded and the frontier is cleared so the crawl starts from
+    scratch, abandoning any unfinished run, unless another process still holds live leases.
+    A worker joining without a `crawl_input` never starts a new run.
+
+    Returns:
+        dict: The project id, the run id (None if there was no run to join), whether the worker
+        joined a run in progress, and the id of the unfinished run that was abandoned, if any.
+
+    Raises:
+        ValueError: If a new run was asked for while another process is still crawling the project.
+    """
+    now = time.time()
+    conn = _connect_frontier()
+    try:
+        # Check and reset in one write transaction so two workers starting at once agree.
+        conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.cursor()
+        project_id = resolve_project_id(cursor, project_name)
+        run_id = _latest_crawl_run_id(cursor, project_id)
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM frontier WHERE project_id = ? AND state IN ('queued', 'leased'))",
+            (project_id,)
+        )
+        in_progress = bool(cursor.fetchone()[0])
+        if join and in_progress and run_id is not None:
+            cursor.execute("UPDATE crawl_runs SET status = 'running' WHERE id = ? AND status = 'interrupted'",
+                           (run_id,))
+            conn.commit()
+            return {'project_id': project_id, 'run_id': run_id, 'joined': True, 'abandoned_run_id': None}
+        if join and crawl_input is None:
+            conn.rollback()
+            return {'project_id': project_id, 'run_id': None, 'joined': False, 'abandoned_run_id': None}
+
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM frontier WHERE project_id = ? AND state = 'leased' AND lease_expires >= ?)",
+            (project_id, now)
+        )
+        if cursor.fetchone()[0]:
+            raise ValueError(
+                f"Run {run_id} of project '{project_name}' is still being crawled by another process. "
+                f"Join it with --worker, or wait for it to stop."
+            )
+
+        abandoned_run_id = None
+        if in_progress and run_id is not None:
+            cursor.execute(
+                "UPDATE crawl_runs SET status = 'abandoned' WHERE id = ? AND status IN ('running', 'interrupted')",
+                (run_id,)
+            )
+            abandoned_run_id = run_id if cursor.rowcount else None
+        cursor.execute('DELETE FROM frontier WHERE project_id = ?', (project_id,))
+        cursor.execute(
+            'INSERT INTO crawl_runs (project_id, input, started_at, checkpoint_at) VALUES (?, ?, ?, ?)',
+            (project_id, crawl_input, now, now)
+        )
+        run_id = cursor.lastrowid
+        conn.commit()
+        return {'project_id': project_id, 'run_id': run_id, 'joined': False, 'abandoned_run_id': abandoned_run_id}
+    finally:
+        conn.close()
+
+
+def resume_crawl_run(run_id: int):
+    """
+    Take over an unfinished crawl run so it continues from its last checkpoint.
+
+    URLs still leased in the run's frontier are queued again at once, since the process that
+    leased them is taken to be gone, instead of waiting for their leases to expire. Done URLs
+    and fully read sitemaps are not crawled again.
+
+    Returns:
+        dict: The run, as returned by fetch_crawl_run.
+
+    Raises:
+        ValueError: If the run doesn't exist, already finished or was replaced by a newer run.
+    """
+    now = time.time()
+    conn = _connect_frontier()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.cursor()
+        run = _fetch_crawl_run(cursor, run_id)
+        if run is None:
+            raise ValueError(f"No crawl run {run_id} found")
+        if run['status'] == 'finished':
+            raise ValueError(f"Run {run_id} of project '{run['project_name']}' already finished")
+        if run['status'] == 'abandoned' or _latest_crawl_run_id(cursor, run['project_id']) != run_id:
+            raise ValueError(f"Run {run_id} of project '{run['project_name']}' was replaced by a newer run")
+
+        cursor.execute('''
+        UPDATE frontier SET state = 'queued', lease_owner = NULL, lease_expires = NULL, attempts = attempts - 1
+        WHERE project_id = ? AND state = 'leased'
+        ''', (run['project_id'],))
+        cursor.execute("UPDATE crawl_runs SET status = 'running', checkpoint_at = ? WHERE id = ?", (now, run_id))
+        conn.commit()
+        return {**run, 'status': 'running', 'checkpoint_at': now}
+    finally:
+        conn.close()
+
+
+def checkpoint_crawl_run(run_id: int, status=None):
+    """
+    Record a crawl run's progress: the time, its done pages and failed URLs, and optionally a new status.
+
+    Finished and abandoned runs are left as they are.
+    """
+    now = time.time()
+    conn = _connect_frontier()
+    try:
+        conn.execute('''
+        UPDATE crawl_runs
+        SET checkpoint_at = ?,
+            status = COALESCE(?, status),
+            finished_at = CASE WHEN ? = 'finished' THEN ? ELSE finished_at END,
+            pages_done = (SELECT COUNT(*) FROM frontier
+                          WHERE project_id = crawl_runs.project_id AND state = 'done' AND kind = 'page'),
+            urls_failed = (SELECT COUNT(*) FROM frontier WHERE project_id = crawl_runs.project_id AND state = 'failed')
+        WHERE id = ? AND status IN ('running', 'interrupted')
+        ''', (now, status, status, now, run_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_crawl_run(run_id: int):
+    """
+    Fetch one crawl run.
+
+    Returns:
+        dict: The run's id, project_name, project_id, input, status, started_at, checkpoint_at,
+        finished_at, pages_done and urls_failed, or None if there is no such run.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        return _fetch_crawl_run(conn.cursor(), run_id)
+    finally:
+        conn.close()
+
+
+def fetch_crawl_runs(project_name=None, limit=20):
+    """Fetch the most recent crawl runs of one project, or of every project, newest first."""
+    return _fetch_page_rows(f'''
+    SELECT {CRAWL_RUN_COLUMNS}
+    FROM crawl_runs JOIN projects ON projects.id = crawl_runs.project_id
+    WHERE ? IS NULL OR projects.project_name = ?
+    ORDER BY crawl_runs.id DESC
+    LIMIT ?
+    ''', (project_name, project_name, limit))
+
+
+def create_cached_responses_table(cursor):
+    """
+    Create the cached_responses table indexing the page bodies kept in the response cache.
+
+    Each row is one page fetched by one crawl run: its response metadata and the keys of its
+    static body and rendered HTML in the content-addressed blob store (see
+    spider.response_cache), which holds each distinct body once however many runs fetched it.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS cached_responses (
+        id INTEGER PRIMARY KEY,
+        project_id INTEGER NOT NULL,
+        run_id INTEGER NOT NULL,
+        url TEXT NOT NULL,
+        final_url TEXT,
+        status INTEGER,
+        headers TEXT,
+        encoding TEXT,
+        body_key TEXT,
+        rendered_key TEXT,
+        lastmod TEXT,
+        fetched_at REAL NOT NULL,
+        UNIQUE (project_id, url, run_id),
+        FOREIGN KEY (project_id) REFERENCES projects(id),
+        FOREIGN KEY (run_id) REFERENCES crawl_runs(id)
+    )
+    ''')
+
+
+def save_cached_responses(rows):
+    """
+    Index page bodies stored in the response cache, replacing the row of a URL fetched twice in a run.
+
+    Args:
+        rows (list): (project_id, run_id, url, final_url, status, headers JSON, encoding, body_key,
+            rendered_key, lastmod, fetched_at) tuples.
+    """
+    if not rows:
+        return
+    conn = _connect_frontier()
+    try:
+        conn.executemany('''
+        INSERT OR REPLACE INTO cached_responses (project_id, run_id, url, final_url, status, headers, encoding,
+                                                 body_key, rendered_key, lastmod, fetched_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def fetch_cached_responses(project_name: str, run_id=None):
+    """
+    Fetch the latest cached response of every saved page of a project.
+
+    A page that a later incremental run found unchanged keeps the response of the run that
+    last fetched it in full. With `run_id`, responses cached by later runs are ignored.
+
+    Returns:
+        dict: The project id and its cached responses, a list of dicts with the url, run_id,
+        final_url, status, headers, encoding, body_key, rendered_key, lastmod and fetched_at
+        of each page; and how many saved pages have no cached response. None if the project
+        doesn't exist.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM projects WHERE project_name = ?', (project_name,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        project_id = row[0]
+        # With MAX(), SQLite takes the other columns from the row holding the maximum.
+        cursor.execute('''
+        SELECT cached_responses.url, MAX(cached_responses.run_id) AS run_id, final_url, status, headers, encoding,
+               body_key, rendered_key, cached_responses.lastmod, fetched_at
+        FROM cached_responses
+        JOIN pages ON pages.project_id = cached_responses.project_id AND pages.url = cached_responses.url
+        WHERE cached_responses.project_id = ? AND (? IS NULL OR run_id <= ?)
+        GROUP BY cached_responses.url
+        ORDER BY pages.id
+        ''', (project_id, run_id, run_id))
+        columns = [column[0] for column in cursor.description]
+        responses = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for response in responses:
+            response['headers'] = json.loads(response['headers'] or '{}')
+        cursor.execute('SELECT COUNT(*) FROM pages WHERE project_id = ?', (project_id,))
+        return {
+            'project_id': project_id,
+            'responses': responses,
+            'uncached': cursor.fetchone()[0] - len(responses),
+        }
+    finally:
+        conn.close()
+
+
+def fetch_cached_blob_keys():
+    """Return the key of every body and rendered HTML the response cache index still refers to."""
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.execute('''
+        SELECT body_key FROM cached_responses WHERE body_key IS NOT NULL
+        UNION
+        SELECT rendered_key FROM cached_responses WHERE rendered_key IS NOT NULL
+        ''')
+        return {key for key, in cursor}
+    finally:
+        conn.close()
+
+
+def add_to_frontier(project_id: int, entries):
+    """
+    Queue page and sitemap URLs in a project's frontier, ignoring URLs it already holds.
+
+    Args:
+        project_id (int): The project being crawled.
+        entries (iterable): (url, kind, lastmod, score) tuples, kind being 'page' or 'sitemap',
+            lastmod the entry's <lastmod> in its sitemap, if any, and score its crawl priority
+            (see scheduler.CrawlScheduler).
+
+    Returns:
+        int: The number of URLs that were new to the frontier.
+    """
+    conn = _connect_frontier()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(
+            'INSERT OR IGNORE INTO frontier (project_id, url, kind, lastmod, score) VALUES (?, ?, ?, ?, ?)',
+            ((project_id, url, kind, lastmod, score) for url, kind, lastmod, score in entries)
+        )
+        added = cursor.rowcount
+        conn.commit()
+        return added
+    finally:
+        conn.close()
+
+
+def claim_frontier(project_id: int, owner: str, limit: int, lease_seconds: float, max_attempts=3):
+    """
+    Lease up to `limit` URLs of a project's frontier to a worker.
+
+    Queued URLs are claimed first, highest score first, then URLs whose lease has expired.
+    Claiming is one UPDATE statement, so no two workers can lease the same URL. URLs whose lease expired
+    `max_attempts` times are marked failed rather than handed out again.
+
+    Returns:
+        list: (url, kind, lastmod) tuples of the leased URLs.
+    """
+    now = time.time()
+    conn = _connect_frontier()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE frontier SET state = 'failed', lease_owner = NULL, lease_expires = NULL
+        WHERE project_id = ? AND state = 'leased' AND lease_expires < ? AND attempts >= ?
+        ''', (project_id, now, max_attempts))
+        cursor.execute('''
+        UPDATE frontier
+        SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id FROM frontier WHERE project_id = ? AND state = 'queued'
+                ORDER BY score DESC, id LIMIT ?
+            )
+            UNION ALL
+            SELECT id FROM (
+                SELECT id FROM frontier WHERE project_id = ? AND state = 'leased' AND lease_expires < ?
+                ORDER BY id LIMIT ?
+            )
+            LIMIT ?
+        )
+        RETURNING url, kind, lastmod, score
+        ''', (owner, now + lease_seconds, project_id, limit, project_id, now, limit, limit))
+        claimed = cursor.fetchall()
+        conn.commit()
+        # RETURNING gives rows in no particular order.
+        return [(url, kind, lastmod) for url, kind, lastmod, score in sorted(claimed, key=lambda row: -row[3])]
+    finally:
+        conn.close()
+
+
+def renew_frontier_leases(project_id: int, owner: str, lease_seconds: float):
+    """Extend every lease a worker holds in a project's frontier. Returns the number of leases renewed."""
+    conn = _connect_frontier()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE frontier SET lease_expires = ? WHERE project_id = ? AND lease_owner = ? AND state = 'leased'",
+            (time.time() + lease_seconds, project_id, owner)
+        )
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def mark_frontier_urls(cursor, project_id: int, owner: str, urls, ok=True, requeued=False):
+    """
+    Mark URLs a worker leased as done, or failed if `ok` is False, within the cursor's transaction.
+
+    URLs whose lease the worker lost, because it expired and another worker claimed them,
+    are left alone. With `requeued`, URLs the worker released back to the queue are marked
+    too, e.g. pages that were saved after the worker was stopped.
+    """
+    cursor.executemany(
+        f'''
+        UPDATE frontier SET state = ?, lease_owner = NULL, lease_expires = NULL
+        WHERE project_id = ? AND url = ?
+          AND ((state = 'leased' AND lease_owner = ?){" OR state = 'queued'" if requeued else ''})
+        ''',
+        (('done' if ok else 'failed', project_id, url, owner) for url in urls)
+    )
+
+
+def finish_frontier_urls(project_id: int, owner: str, urls, ok=True):
+    """Mark URLs a worker leased as done, or failed if `ok` is False. See mark_frontier_urls."""
+    conn = _connect_frontier()
+    try:
+        mark_frontier_urls(conn.cursor(), project_id, owner, urls, ok)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def release_frontier_leases(project_id: int, owner: str):
+    """Return every URL a worker still holds to the queue, e.g. when the worker is stopped."""
+    conn = _connect_frontier()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE frontier SET state = 'queued', lease_owner = NULL, lease_expires = NULL, attempts = attempts - 1
+        WHERE project_id = ? AND lease_owner = ? AND state = 'leased'
+        ''', (project_id, owner))
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+
+def fetch_frontier_counts(project_id: int):
+    """Return the number of URLs in each of FRONTIER_STATES in a project's frontier."""
+    conn = sqlite3.connect(DB_FILE, timeout=60)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT state, COUNT(*) FROM frontier WHERE project_id = ? GROUP BY state', (project_id,))
+        return {**dict.fromkeys(FRONTIER_STATES, 0), **dict(cursor.fetchall())}
+    finally:
+        conn.close()
+
+
+SEARCH_COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 1.0, 0.0)  # title, meta_description, headings, paragraphs, project
+SEARCH_CONTENT_COLUMNS = ('title', 'meta_description', 'headings', 'paragraphs')  # The columns a query searches
+
+
+def to_search_query(text: str):
+    """Turn free text into an FTS5 query matching pages that contain every word of it."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def has_balanced_parentheses(query: str):
+    """Check that the parentheses of an FTS5 query, outside its quoted strings, all pair up."""
+    depth = 0
+    quoted = False
+    for char in query:
+        if char == '"':
+            # A doubled quote inside a string toggles twice and stays inside it.
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                return False
+    return depth == 0 and not quoted
+
+
+def search_pages(project_name: str, query: str, limit=20, offset=0, marks=('[', ']')):
+    """
+    Full-text search a project's titles, meta descriptions, headings and paragraphs.
+
+    The query may use FTS5 syntax (phrases, OR, NOT, prefix*, column filters). If it isn't
+    valid FTS5, or its parentheses don't pair up, it is searched as plain words instead.
+    Only SEARCH_CONTENT_COLUMNS are searched. Results are ranked by BM25, weighting title
+    matches above meta description, heading and paragraph matches.
+
+    Args:
+        project_name (str): The project to search.
+        query (str): The search query.
+        limit (int): The maximum number of results to return.
+        offset (int): The number of results to skip.
+        marks (tuple): The strings placed before and after each matched term.
+
+    Returns:
+        dict: `total`, the number of matching pages, and `results`, a list of dictionaries with
+        the id, url, highlighted title and snippet of each page, best match first.
+    """
+    if not query.strip():
+        return {'total': 0, 'results': []}
+
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM projects WHERE project_name = ?', (project_name,))
+        project = cursor.fetchone()
+        if not project:
+            return {'total': 0, 'results': []}
+
+        # Unbalanced parentheses could close the group the query is scoped to the project by.
+        if has_balanced_parentheses(query):
+            try:
+                return _search_project(cursor, project[0], query, limit, offset, marks)
+            except sqlite3.OperationalError:
+                pass
+        return _search_project(cursor, project[0], to_search_query(query), limit, offset, marks)
+    finally:
+        conn.close()
+
+
+def _search_project(cursor, project_id, match, limit, offset, marks):
+    open_mark, close_mark = marks
+    # The query is confined to the content columns, so neither a term equal to the project id
+    # nor a 'project:' filter of its own can match the project column: nested column filters
+    # only narrow the outer one.
+    match = f'project : "{project_id}" AND {{{" ".join(SEARCH_CONTENT_COLUMNS)}}} : ({match})'
+    cursor.execute('SELECT COUNT(*) FROM pages_fts WHERE pages_fts MATCH ?', (match,))
+    total = cursor.fetchone()[0]
+
+    # Rank every match by score alone, then highlight only the requested results.
+    weights = ', '.join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+    cursor.execute(f'''
+    WITH ranked AS (
+        SELECT rowid, bm25(pages_fts, {weights}) AS score
+        FROM pages_fts
+        WHERE pages_fts MATCH ?3
+        ORDER BY score
+        LIMIT ?4 OFFSET ?5
+    )
+    SELECT pages.id, pages.url,
+           highlight(pages_fts, 0, ?1, ?2) AS title,
+           snippet(pages_fts, 1, ?1, ?2, '...', 24),
+           snippet(pages_fts, 2, ?1, ?2, '...', 24),
+           snippet(pages_fts, 3, ?1, ?2, '...', 24)
+    FROM ranked
+    CROSS JOIN pages_fts ON pages_fts.rowid = ranked.rowid
+    CROSS JOIN pages ON pages.id = ranked.rowid
+    WHERE pages_fts MATCH ?3
+    ORDER BY ranked.score
+    ''', (open_mark, close_mark, match, limit, offset))
+    results = []
+    for page_id, url, title, *snippets in cursor.fetchall():
+        # snippet() with column -1 could pick the project column, which the project filter
+        # matches; take the content column with the most highlighted terms, paragraphs on a tie.
+        snippet = max(reversed(snippets), key=lambda text: (text or '').count(open_mark)) or ''
+        results.append({'id': page_id, 'url': url, 'title': title, 'snippet': snippet})
+    return {'total': total, 'results': results}
+
+
+def fetch_link_statuses(urls):
+    """
+    Fetch the cached link checks for the given URLs.
+
+    Args:
+        urls (list): The link URLs to look up.
+
+    Returns:
+        dict: A mapping of URL to LinkStatus for every URL found in the cache.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    cursor = conn.cursor()
+    link_statuses = {}
+
+    try:
+        # Stay well below SQLite's limit on bound parameters per statement.
+        for offset in range(0, len(urls), 500):
+            batch = urls[offset:offset + 500]
+            placeholders = ', '.join('?' for _ in batch)
+            cursor.execute(f'''
+            SELECT url, status, final_status, final_url, redirect_chain, checked_at, etag, last_modified
+            FROM link_status
+            WHERE url IN ({placeholders})
+            ''', batch)
+            for row in cursor.fetchall():
+                url, status, final_status, final_url, redirect_chain, checked_at, etag, last_modified = row
+                link_statuses[url] = LinkStatus(
+                    url=url,
+                    status=status,
+                    final_status=final_status,
+                    final_url=final_url or "",
+                    redirect_chain=json.loads(redirect_chain) if redirect_chain else [],
+                    checked_at=checked_at,
+                    etag=etag,
+                    last_modified=last_modified,
+                )
+    finally:
+        conn.close()
+
+    return link_statuses
+
+
+def save_link_statuses(link_statuses):
+    """
+    Store link check results in the cache, replacing older results for the same URLs.
+
+    Args:
+        link_statuses (list): LinkStatus objects to store.
+    """
+    if not link_statuses:
+        return
+
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.executemany('''
+        INSERT OR REPLACE INTO link_status (url, status, final_status, final_url, redirect_chain,
+                                            checked_at, etag, last_modified)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (link.url, link.status, link.final_status, link.final_url, json.dumps(link.redirect_chain),
+             link.checked_at, link.etag, link.last_modified)
+            for link in link_statuses
+        ])
+        conn.commit()
+    except Exception as e:
+        print(f"Error saving link statuses: {e}")
+    finally:
+        conn.close()
+
+
+def fetch_checked_links(since: float):
+    """
+    Fetch the outcome of every link checked since a point in time, e.g. the start of a crawl run.
+
+    Returns:
+        dict: A mapping of URL to "200" or "non-200", the values LinkChecker keeps in checked_links.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        cursor = conn.execute('SELECT url, status FROM link_status WHERE checked_at >= ?', (since,))
+        return {url: "200" if status == 200 else "non-200" for url, status in cursor}
+    finally:
+        conn.close()
@@ -0,0 +1,204 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+THROTTLE_STATUSES = (429, 503)  # Responses of a server asking the crawler to slow down
+INITIAL_CONCURRENCY = 2  # In-flight requests a host starts with when the rate adapts
+MAX_DELAY = 60.0  # Longest delay after each request that backing off can reach
+MAX_RETRY_AFTER = 600.0  # Longest Retry-After that is honored
+STEADY_FACTOR = 1.2  # The rate only grows while responses are at most this many times slower than usual
+SLOW_FACTOR = 1.5  # Responses this many times slower than the host's usual latency count as a slowdown
+MIN_SLOW_LATENCY = 0.05  # Latencies below this never count as a slowdown, whatever the jitter
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+
+    Returns:
+        float: The seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at - (now if now is not None else time.time()), 0.0)
+
+
+class HostThrottle:
+    """
+    The request rate of a single host, adapted to how the host copes with it.
+
+    The rate is a number of in-flight requests (`limit`) and a pause after each request
+    (`delay`). While responses come back about as fast as usual, the delay shrinks towards its
+    floor and then the limit grows by about one request per round trip, up to its ceiling.
+    Backing off goes the other way round: the limit comes down first, and only once it is
+    down to one request does the delay grow. A 429 or 503 response halves the limit (or
+    doubles the delay), and a Retry-After header pauses the host for as long as it asks.
+    Responses that get much slower than the host's usual latency, and failed requests, cut
+    the limit by a quarter (or raise the delay, up to the host's latency).
+
+    Without `adaptive`, the limit and delay stay as configured; Retry-After and a robots.txt
+    Crawl-delay are honored either way.
+    """
+
+    def __init__(self, max_concurrency, delay, min_delay=0.0, adaptive=True):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_delay = min_delay
+        self.adaptive = adaptive
+        self.limit = float(min(INITIAL_CONCURRENCY, self.max_concurrency) if adaptive else self.max_concurrency)
+        self.delay = max(delay, min_delay)
+        self.crawl_delay = None
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.latency = None  # Smoothed latency of recent responses
+        self.usual_latency = None  # The host's usual latency, the baseline slowdowns are measured against
+        self.backoffs = 0
+        self._since_decrease = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def delay_floor(self):
+        return max(self.min_delay, self.crawl_delay or 0.0)
+
+    def set_crawl_delay(self, crawl_delay):
+        """Apply a robots.txt Crawl-delay: one request at a time, at least `crawl_delay` seconds apart."""
+        if crawl_delay and crawl_delay != self.crawl_delay:
+            self.crawl_delay = crawl_delay
+            self.max_concurrency = 1
+            self.limit = 1.0
+            self.delay = max(self.delay, crawl_delay)
+
+    async def acquire(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        pause = self.paused_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def release(self):
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def record(self, status, latency, retry_after=None):
+        """
+        Adapt the rate to one response.
+
+        Args:
+            status (int): The HTTP status, or None if the request failed.
+            latency (float): Seconds the request took.
+            retry_after (float, optional): Seconds the server asked to wait before the next request.
+        """
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(retry_after, MAX_RETRY_AFTER))
+
+        if status in THROTTLE_STATUSES:
+            self.backoffs += 1
+            if self.adaptive:
+                if self.limit > 1:
+                    self.limit = max(1.0, self.limit / 2)
+                else:
+                    self.delay = min(MAX_DELAY, max(self.delay * 2, 0.25))
+                self._since_decrease = 0
+            return
+
+        if status is not None:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.usual_latency is None or self.latency < self.usual_latency:
+                self.usual_latency = self.latency
+            else:
+                # Follow lasting changes in the host's latency slowly.
+                self.usual_latency += 0.01 * (self.latency - self.usual_latency)
+        if not self.adaptive:
+            return
+
+        self._since_decrease += 1
+        slow = status is None or (
+            self.latency > MIN_SLOW_LATENCY and self.latency > SLOW_FACTOR * self.usual_latency
+        )
+        if slow:
+            # Back off once per round of in-flight requests, not once for every slow response in it.
+            if self._since_decrease >= self.limit:
+                self.backoffs += 1
+                self._since_decrease = 0
+                if self.limit > 1:
+                    self.limit = max(1.0, self.limit * 0.75)
+                else:
+                    # Up to the host's latency: it then spends at least half its time idle. Only
+                    # 429/503 responses push the delay further.
+                    self.delay = min(MAX_DELAY, max(self.delay * 1.5, 0.1), max(self.delay, self.latency or 0.0))
+        elif status is not None and self.latency > STEADY_FACTOR * self.usual_latency:
+            pass  # Slower than usual but not by much: hold the rate
+        elif self.delay > self.delay_floor:
+            self.delay = max(self.delay_floor, self.delay * 0.8 if self.delay * 0.8 > 0.01 else 0.0)
+        elif self.limit < self.max_concurrency:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    def describe(self):
+        return f"{int(self.limit)} requests at a time, {self.delay:.2f}s apart"
+
+
+class HostLimiter:
+    """
+    Limits how many requests may be in flight against each host and how fast they follow
+    each other, with one HostThrottle per host.
+
+    After each request its slot stays reserved for the host's current delay, which spaces
+    requests out without blocking the event loop the way `time.sleep` would. The caller sets
+    the slot's `result` to the FetchResult (or leaves it None if the request failed) so the
+    host's rate adapts to it. A slot that ends up unused (its `used` attribute set to False)
+    is given back without the delay.
+    """
+
+    def __init__(self, per_host, delay, min_delay=0.0, adaptive=True):
+        self.per_host = per_host
+        self.delay = delay
+        self.min_delay = min_delay
+        self.adaptive = adaptive
+        self.throttles = {}
+
+    def throttle(self, host):
+        if host not in self.throttles:
+            self.throttles[host] = HostThrottle(self.per_host, self.delay, self.min_delay, self.adaptive)
+        return self.throttles[host]
+
+    @asynccontextmanager
+    async def slot(self, url, crawl_delay=None):
+        throttle = self.throttle(urlparse(url).netloc)
+        throttle.set_crawl_delay(crawl_delay)
+        await throttle.acquire()
+        slot = SimpleNamespace(used=True, result=None)
+        started = time.monotonic()
+        try:
+            yield slot
+        finally:
+            try:
+                if slot.used:
+                    result = slot.result
+                    if result is None:
+                        throttle.record(None, time.monotonic() - started)
+                    else:
+                        throttle.record(result.status, result.elapsed or time.monotonic() - started,
+                                        parse_retry_after(result.header('Retry-After')))
+                    if throttle.delay:
+                        await asyncio.sleep(throttle.delay)
+            finally:
+                await throttle.release()
+
+    def report(self):
+        """Print the hosts that had to be slowed down, with the rate they ended at."""
+        for host, throttle in sorted(self.throttles.items()):
+            if throttle.backoffs or throttle.crawl_delay:
+                reason = f"Crawl-delay {throttle.crawl_delay:g}s" if throttle.crawl_delay else \
+                    f"backed off {throttle.backoffs} times"
+                print(f"Rate for {host}: {throttle.describe()} ({reason})")
@@ -1,28 +1,9 @@
+import json
 import pyperclip
 from urllib.parse import urlparse
-import aiohttp
-import asyncio
 from pathlib import Path
 
 
-def read_xml_file(file_path):
-    """
-    Reads the content of an XML file from the specified file path.
-
-    Args:
-        file_path (str): The path to the XML file to be read.
-
-    Returns:
-        str or None: The content of the file as a string if successful, otherwise None.
-    """
-    try:
-        with open(file_path, 'r') as file:
-            return file.read()
-    except IOError as e:
-        print(f"Failed to read file: {e}")
-        return None
-
-
 def save_json_to_file(page_data, output_file):
     """
     Saves the provided page data to a specified output file in JSON format.
@@ -33,7 +14,7 @@ def save_json_to_file(page_data, output_file):
     """
     if page_data:
         with open(output_file, "w", encoding="utf-8") as file:
-            file.write(str(page_data))
+            json.dump(page_data, file, indent=4, ensure_ascii=False, default=str)
         print(f"File saved to: {output_file}")
 
 
@@ -85,67 +66,3 @@ def is_valid_http_link(link):
     """
     parsed_url = urlparse(link)
     return parsed_url.scheme in ['http', 'https']
-
-
-async def fetch_status(session, url):
-    """
-    Asynchronously fetches the HTTP status code of a given URL.
-
-    Args:
-        session (aiohttp.ClientSession): An aiohttp session for making requests.
-        url (str): The URL to check the status of.
-
-    Returns:
-        tuple: The URL and its status code, or None if the request failed.
-    """
-    try:
-        async with session.head(url, timeout=10) as response:
-            return url, response.status
-    except:
-        return url, None
-
-
-async def check_link_status_async(links):
-    """
-    Asynchronously checks the HTTP status of a list of links.
-
-    Args:
-        links (list): A list of URLs to check.
-
-    Returns:
-        list: A list of URLs with non-200 status codes.
-    """
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_status(session, link) for link in links]
-        results = await asyncio.gather(*tasks)
-    non_200_links = [url for url, status in results if status != 200 or status is None]
-    return non_200_links
-
-
-def validate_link_statuses(links, checked_links):
-    """
-    Validates the HTTP status of a list of links, ensuring that previously checked links are not rechecked.
-
-    Args:
-        links (list): A list of URLs to check.
-        checked_links (dict): A dictionary of previously checked links and their statuses.
-
-    Returns:
-        list: A list of non-200 status links for the current page.
-    """
-    http_links = [link for link in links if is_valid_http_link(link)]
-    unchecked_links = [link for link in http_links if link not in checked_links]
-
-    new_non_200_links = asyncio.run(check_link_status_async(unchecked_links))
-
-    for link in unchecked_links:
-        if link in new_non_200_links:
-            checked_links[link] = "non-200"
-        else:
-            checked_links[link] = "200"
-
-    non_200_links_for_current_page = [
-        link for link in links if checked_links.get(link) == "non-200"
-    ]
-
-    return non_200_links_for_current_page
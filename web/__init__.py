@@ -1,3 +1,4 @@
+import time
 from flask import Flask
 from web.routes import init_routes
 from spider.storage import create_tables
@@ -7,6 +8,10 @@ create_tables()
 def create_app():
     app = Flask(__name__)
 
+    @app.template_filter('timestamp')
+    def format_timestamp(value):
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(value)) if value else '-'
+
     init_routes(app)
 
     return app
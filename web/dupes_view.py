@@ -0,0 +1,48 @@
+from flask import render_template, request
+from spider.fingerprints import DEFAULT_DUPLICATE_THRESHOLD
+from spider.storage import fetch_project_summary, fetch_near_duplicates, fetch_exact_duplicates, fetch_thin_pages, \
+    fetch_pages_by_ids, DUPLICATE_FIELDS
+
+CLUSTERS_SHOWN = 100
+THIN_PAGE_WORDS = 200
+
+
+def show_duplicates_report(project_name):
+    """
+    Render the near-duplicate clusters, exact duplicate groups and thin pages of a project.
+
+    The query string arguments `threshold` and `min_words` tune near-duplicate detection and
+    `thin` sets the word count below which pages are reported as thin.
+
+    Args:
+        project_name (str): The name of the project to audit.
+
+    Returns:
+        Rendered HTML or error page.
+    """
+    if not fetch_project_summary(project_name):
+        return "Project not found", 404
+
+    threshold = request.args.get('threshold', DEFAULT_DUPLICATE_THRESHOLD, type=float)
+    min_words = request.args.get('min_words', 20, type=int)
+    thin_words = request.args.get('thin', THIN_PAGE_WORDS, type=int)
+
+    clusters = fetch_near_duplicates(project_name, threshold, min_words)
+    exact = {label: fetch_exact_duplicates(project_name, field, limit=20) for field, (_, _, label) in DUPLICATE_FIELDS.items()}
+    pages = fetch_pages_by_ids(
+        page_id for groups in exact.values() for group in groups for page_id in group['page_ids'][:10]
+    )
+
+    return render_template(
+        'dupes_template.html',
+        project_name=project_name,
+        threshold=threshold,
+        min_words=min_words,
+        thin_words=thin_words,
+        cluster_count=len(clusters),
+        clustered_pages=sum(len(cluster) for cluster in clusters),
+        clusters=clusters[:CLUSTERS_SHOWN],
+        exact=exact,
+        pages=pages,
+        thin=fetch_thin_pages(project_name, thin_words),
+    )
@@ -1,10 +1,16 @@
-from flask import render_template
-from cli.commands import handle_get_command
+from flask import render_template, request
+from spider.storage import fetch_project_pages, fetch_project_summary, PAGE_SORT_COLUMNS
+
+PAGES_PER_REPORT_PAGE = 100
 
 
 def show_project_report(project_name):
     """
-    Fetch the project data and render it using an HTML template.
+    Fetch the project summary and one page of its page list and render them using an HTML template.
+
+    The list is paginated by keyset and sorted and filtered in SQL using the query string
+    arguments `sort`, `order`, `q` (URL contains), `noindex` (yes/no) and `after`/`after_id`
+    (the last row of the previous page), so the report stays fast regardless of project size.
 
     Args:
         project_name (str): The name of the project to fetch data for.
@@ -12,6 +18,44 @@ def show_project_report(project_name):
     Returns:
         Rendered HTML or error page.
     """
-    pages = handle_get_command(project_name)
+    summary = fetch_project_summary(project_name)
+    if not summary:
+        return "Project not found", 404
+
+    sort = request.args.get('sort', 'url')
+    if sort not in PAGE_SORT_COLUMNS:
+        sort = 'url'
+    descending = request.args.get('order') == 'desc'
+    url_contains = request.args.get('q', '').strip()
+    noindex = {'yes': True, 'no': False}.get(request.args.get('noindex'))
+
+    after = None
+    after_id = request.args.get('after_id', type=int)
+    if after_id is not None:
+        after = (request.args.get('after', ''), after_id)
+
+    listing = fetch_project_pages(
+        project_name,
+        sort=sort,
+        descending=descending,
+        after=after,
+        limit=PAGES_PER_REPORT_PAGE,
+        url_contains=url_contains or None,
+        noindex=noindex,
+    )
 
-    return render_template('report_template.html', project_name=project_name, pages=pages)
+    filters = {
+        'sort': sort,
+        'order': 'desc' if descending else 'asc',
+        'q': url_contains,
+        'noindex': request.args.get('noindex', ''),
+    }
+    return render_template(
+        'report_template.html',
+        project_name=project_name,
+        summary=summary,
+        pages=listing['pages'],
+        next_after=listing['next_after'],
+        filters=filters,
+        sort_columns=PAGE_SORT_COLUMNS,
+    )
@@ -1,18 +1,26 @@
 from flask import render_template
-from spider.storage import fetch_all_project_names, fetch_pages_by_project, fetch_page_data_by_id
-from web import report_view
+from spider.storage import fetch_project_summaries, fetch_page_data_by_id
+from web import report_view, search_view, dupes_view
 
 
 def init_routes(app):
     @app.route('/')
     def index():
-        project_names = fetch_all_project_names()
-        return render_template('index.html', project_names=project_names)
+        projects = fetch_project_summaries()
+        return render_template('index.html', projects=projects)
 
     @app.route('/report/<project_name>')
     def show_report(project_name):
         return report_view.show_project_report(project_name)
 
+    @app.route('/report/<project_name>/search')
+    def search_project(project_name):
+        return search_view.show_search_results(project_name)
+
+    @app.route('/report/<project_name>/dupes')
+    def show_duplicates(project_name):
+        return dupes_view.show_duplicates_report(project_name)
+
     @app.route('/page/<int:page_id>')
     def show_page_data(page_id):
         """
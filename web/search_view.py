@@ -0,0 +1,52 @@
+from flask import render_template, request
+from markupsafe import Markup, escape
+from spider.storage import search_pages
+
+RESULTS_PER_PAGE = 20
+
+# Control characters never appear in extracted text, so they can mark matches before escaping.
+MATCH_MARKS = ('\x02', '\x03')
+
+
+def highlight(text):
+    """Escape indexed text and wrap its matched terms in <mark> tags."""
+    return Markup(
+        str(escape(text or ''))
+        .replace(MATCH_MARKS[0], Markup('<mark>'))
+        .replace(MATCH_MARKS[1], Markup('</mark>'))
+    )
+
+
+def show_search_results(project_name):
+    """
+    Full-text search a project and render one page of ranked, highlighted results.
+
+    Args:
+        project_name (str): The name of the project to search.
+
+    Returns:
+        Rendered HTML.
+    """
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    found = search_pages(
+        project_name,
+        query,
+        limit=RESULTS_PER_PAGE,
+        offset=(page - 1) * RESULTS_PER_PAGE,
+        marks=MATCH_MARKS,
+    )
+    results = [
+        dict(result, title=highlight(result['title']), snippet=highlight(result['snippet']))
+        for result in found['results']
+    ]
+
+    return render_template(
+        'search_results.html',
+        project_name=project_name,
+        query=query,
+        page=page,
+        total=found['total'],
+        results=results,
+        has_next=page * RESULTS_PER_PAGE < found['total'],
+    )